@@ -1,19 +1,160 @@
-from flask import Flask, jsonify, make_response, Response, request
+import json
+import math
+import os
+import time
+from types import ModuleType
+from typing import Any, Iterator, List, Optional
+
+import click
+from flask import (
+    Blueprint, Flask, current_app, g, jsonify, make_response, Response, request, stream_with_context
+)
+from sqlalchemy import inspect, text
 
 from game_cart.db import db
+from game_cart.db_config import get_database_config, install_sqlite_pragmas
 from game_cart.models.user_model import User
-from game_cart.models.game_model import Games
-from game_cart.utils.cheapsharkapi import search_for_games, get_game_info
+from game_cart.models.game_model import CartVersion, Games
+from game_cart.models.catalog_model import CatalogGame
+from game_cart.models.session_model import SessionToken
+from game_cart.utils.circuit_breaker import CircuitOpenError
+from game_cart.utils.compression import COMPRESSION_ENCODINGS, compress
+from game_cart.utils.event_loop import run_on_thread_loop
+from game_cart.utils.json_provider import OrjsonProvider, dumps_bytes
+from game_cart.utils.keywords import normalize_keyword
+from game_cart.utils.logger import configure_logger
+from game_cart.utils.metrics import observe_request, render_metrics, server_timing_header
+from game_cart.utils.session_tokens import TokenStore
+from game_cart.utils.title_index import SORT_ORDERS, TitleIndex
 
-app = Flask(__name__)
+bp = Blueprint("game_cart", __name__, cli_group=None)
 
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:////app/db/app.db"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+MAX_PAGE_SIZE = 1000
 
-db.init_app(app)
+# The most ids one /add-games or /delete-games request may name
+MAX_BULK_IDS = 500
 
-with app.app_context():
-    db.create_all()
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+token_store = TokenStore(
+    max_entries=int(os.getenv("SESSION_TOKEN_MAX_ENTRIES", "10000")),
+    ttl=float(os.getenv("SESSION_TOKEN_TTL", "3600")),
+    persistence=SessionToken if os.getenv("SESSION_TOKEN_PERSIST", "true").lower() == "true" else None,
+    recheck_after=float(os.getenv("SESSION_TOKEN_RECHECK_SECONDS", "5"))
+)
+
+# Lets the cart routes and /update-password name a user without a session
+# token. Anyone can then act as any user, so it is only for local development.
+ALLOW_USERNAME_AUTH = os.getenv("ALLOW_USERNAME_AUTH", "false").lower() == "true"
+
+title_index = TitleIndex(max_entries=int(os.getenv("SUGGEST_MAX_ENTRIES", "20000")))
+
+MAX_SUGGESTIONS = 50
+
+def cheapshark() -> ModuleType:
+    """
+        The requests-based CheapShark client, imported on first use so that
+        importing the app, running its CLI and collecting tests do not load it
+        and its HTTP stack.
+    """
+    from game_cart.utils import cheapsharkapi
+    return cheapsharkapi
+
+def async_cheapshark() -> ModuleType:
+    """The async CheapShark client, imported on first use like cheapshark()."""
+    from game_cart.utils import async_cheapsharkapi
+    return async_cheapsharkapi
+
+# Routes whose responses can be large enough to be worth compressing
+COMPRESSED_ROUTES = {"/get-games", "/search-games/<keyword>"}
+
+def get_token_user() -> Optional[tuple[int, str]]:
+    """
+        Resolves the session token sent as "Authorization: Bearer <token>".
+
+        Returns:
+            Optional[tuple[int, str]]: The id and username of the token's user,
+                or None if the request has no Authorization header.
+        Raises:
+            PermissionError: If the token is malformed, unknown or expired.
+    """
+    header = request.headers.get("Authorization")
+    if not header:
+        return None
+
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise PermissionError("The Authorization header must be a Bearer token.")
+
+    user = token_store.resolve(token.strip())
+    if user is None:
+        raise PermissionError("Invalid or expired session token.")
+    return user
+
+####################################################
+#
+# Compression
+#
+####################################################
+
+@bp.after_app_request
+def compress_response(response: Response) -> Response:
+    """
+    Compress successful responses of COMPRESSED_ROUTES with the client's
+    preferred encoding in RESPONSE_COMPRESSION, once they reach
+    COMPRESSION_MIN_SIZE bytes. Streamed responses are sent as is.
+    """
+    if not COMPRESSION_ENCODINGS or request.url_rule is None or request.url_rule.rule not in COMPRESSED_ROUTES:
+        return response
+    if response.status_code != 200 or response.is_streamed or "Content-Encoding" in response.headers:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    body, encoding = compress(response.get_data(), request.headers.get("Accept-Encoding", ""))
+    if encoding is not None:
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        # The compressed bytes differ from the identity ones, so the tag is only a weak match
+        etag, weak = response.get_etag()
+        if etag is not None and not weak:
+            response.set_etag(etag, weak=True)
+    return response
+
+####################################################
+#
+# Metrics
+#
+####################################################
+
+@bp.before_app_request
+def start_request_timer() -> None:
+    """Remember when the request started so its latency can be recorded."""
+    g.request_start = time.perf_counter()
+
+@bp.after_app_request
+def record_request_metrics(response: Response) -> Response:
+    """
+    Record the count and latency of the request under its route template and,
+    when SERVER_TIMING is enabled, add a Server-Timing header that separates
+    upstream time from the app's own time.
+    """
+    elapsed = time.perf_counter() - g.request_start
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    observe_request(request.method, route, response.status_code, elapsed)
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = server_timing_header(elapsed)
+    return response
+
+@bp.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    """
+    Route to expose request counts and latency histograms.
+
+    Returns:
+        Prometheus text format response with the metrics of every worker.
+    """
+    payload, content_type = render_metrics()
+    return Response(payload, 200, content_type=content_type)
 
 ####################################################
 #
@@ -21,7 +162,7 @@ with app.app_context():
 #
 ####################################################
 
-@app.route("/health", methods=["GET"])
+@bp.route("/health", methods=["GET"])
 def healthcheck() -> Response:
     """
     Health check route to verify the service is running.
@@ -29,16 +170,32 @@ def healthcheck() -> Response:
     Returns: 
         JSON response indicating the health status of the service.
     """
-    app.logger.info("Health check")
+    current_app.logger.info("Health check")
     return make_response(jsonify({"status": "healthy"}), 200)
 
+@bp.route("/cache-stats", methods=["GET"])
+def cache_stats() -> Response:
+    """
+    Route to inspect the hit, miss and eviction counters of the upstream caches.
+
+    Returns:
+        JSON response with the counters of each cache.
+    """
+    current_app.logger.info("Cache stats")
+    return make_response(jsonify({
+        "search": cheapshark().search_cache.stats(),
+        "game_info": cheapshark().game_info_cache.stats(),
+        "suggest": title_index.stats(),
+        "cheapshark_circuit": cheapshark().breaker.state
+    }), 200)
+
 ####################################################
 #
 # User management
 #
 ####################################################
 
-@app.route("/create-account", methods=["POST"])
+@bp.route("/create-account", methods=["POST"])
 def create_user() -> Response:
     """
     Route to create a new user.
@@ -53,7 +210,7 @@ def create_user() -> Response:
         400 error if input validation fails.
         500 error if there is an issue adding the user to the database.
     """
-    app.logger.info("Creating new user")
+    current_app.logger.info("Creating new user")
     try:
         data = request.get_json()
 
@@ -63,16 +220,16 @@ def create_user() -> Response:
         if not username or not password:
             return make_response(jsonify({"error": "Invalid input, both username and password are required"}), 400)
         
-        app.logger.info("Adding user: %s", username)
+        current_app.logger.info("Adding user: %s", username)
         User.create_user(username, password)
 
-        app.logger.info("User added: %s", username)
+        current_app.logger.info("User added: %s", username)
         return make_response(jsonify({"status": "user added", "username": username}), 201)
     except Exception as e:
-        app.logger.error("Failed to add user: %s", str(e))
+        current_app.logger.error("Failed to add user: %s", str(e))
         return make_response(jsonify({"error": str(e)}), 500)
     
-@app.route("/login", methods=["POST"])
+@bp.route("/login", methods=["POST"])
 def login() -> Response:
     """
     Route to log in a user.
@@ -82,7 +239,8 @@ def login() -> Response:
         - password (str): The user's password.
 
     Returns:
-        JSON response indicating the success of the login.
+        JSON response indicating the success of the login, with a session token
+        to send as "Authorization: Bearer <token>" on later requests.
 
     Raises:
         400 error if input validation fails.
@@ -91,7 +249,7 @@ def login() -> Response:
     """
     data = request.get_json()
     if not data or "username" not in data or "password" not in data:
-        app.logger.error("Invalid request payload for login.")
+        current_app.logger.error("Invalid request payload for login.")
         return make_response(jsonify({"error": "Invalid input, both username and password are required"}), 400)
 
     username = data["username"]
@@ -99,23 +257,54 @@ def login() -> Response:
 
     try:
         if not User.check_password(username, password):
-            app.logger.warning("Login failed for username: %s", username)
+            current_app.logger.warning("Login failed for username: %s", username)
             return make_response(jsonify({"error": "Invalid username or password"}), 401)
         
-        app.logger.info("User %s logged in successfully.", username)
-        return make_response(jsonify({"message": f"User {username} logged in successfully."}), 200)
+        token = token_store.issue(User.get_id_by_username(username), username)
+
+        current_app.logger.info("User %s logged in successfully.", username)
+        return make_response(jsonify({
+            "message": f"User {username} logged in successfully.",
+            "token": token,
+            "expires_in": token_store.ttl
+        }), 200)
     
     except Exception as e:
-        app.logger.error("Error during login for username %s: %s", username, str(e))
+        current_app.logger.error("Error during login for username %s: %s", username, str(e))
         return make_response(jsonify({"error", "An unexpected error occurred."}), 500)
     
-@app.route("/update-password", methods=["POST"])
+@bp.route("/logout", methods=["POST"])
+def logout() -> Response:
+    """
+    Route to revoke the session token sent in the Authorization header.
+
+    Returns:
+        JSON response indicating the token was revoked.
+
+    Raises:
+        401 error if no valid session token was sent.
+    """
+    try:
+        if get_token_user() is None:
+            raise PermissionError("A session token must be specified.")
+
+        token_store.revoke(request.headers["Authorization"].split(" ", 1)[1].strip())
+
+        current_app.logger.info("Session token revoked")
+        return make_response(jsonify({"status": "logged out"}), 200)
+    except PermissionError as e:
+        current_app.logger.error("Logout failed: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 401)
+
+@bp.route("/update-password", methods=["POST"])
 def update_password() -> Response:
     """
-    Route to change a user's password. 
+    Route to change the password of the user of the session token in the
+    Authorization header. Every session token of the user is revoked.
 
     Expected JSON Input: 
-        - username (str): The username of the account whose password will change.
+        - username (str): The username of the account whose password will
+          change, only read without a token when ALLOW_USERNAME_AUTH is set.
         - newPassword (str): The new password.
 
     Returns: 
@@ -123,29 +312,38 @@ def update_password() -> Response:
 
     Raises:
         400 error if input validation fails.
-        401 error if authentication fails (username does not exist).
+        401 error if authentication fails (username does not exist or invalid token).
         500 error for any unexpected server-side issues.
     """
-    app.logger.info("Chaninger a user's password")
+    current_app.logger.info("Chaninger a user's password")
+    username = None
     try:
+        token_user = get_token_user()
+        if token_user is None and not ALLOW_USERNAME_AUTH:
+            raise PermissionError("A session token must be specified.")
+
         data = request.get_json()
 
-        username = data.get("username")
+        username = token_user[1] if token_user else data.get("username")
         new_password = data.get("newPassword")
 
         if not username or not new_password:
             return make_response(jsonify({"error": "Invalid input, both username and new password are required"}), 400)
         
-        app.logger.info("Changing user %s's password", username)
+        current_app.logger.info("Changing user %s's password", username)
         User.update_password(username, new_password)
+        token_store.revoke_user(token_user[0] if token_user else User.get_id_by_username(username))
 
-        app.logger.info("Password changed for %s", username)
+        current_app.logger.info("Password changed for %s", username)
         return make_response(jsonify({"status": "password changed", "username": username}), 201)
+    except PermissionError as e:
+        current_app.logger.error("Invalid session token: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 401)
     except ValueError:
-        app.logger.error("User %s does not exist", username)
+        current_app.logger.error("User %s does not exist", username)
         return make_response(jsonify({"error": f"user {username} does not exist"}), 401)
     except Exception as e:
-        app.logger.error("Failed to update password: %s", str(e))
+        current_app.logger.error("Failed to update password: %s", str(e))
         return make_response(jsonify({"error": str(e)}), 500)
     
 ####################################################
@@ -154,8 +352,88 @@ def update_password() -> Response:
 #
 ####################################################
 
-@app.route("/search-games/<keyword>", methods=["GET"])
-def search_games(keyword: str) -> Response:
+def get_cart_owner() -> int:
+    """
+        Resolves the user whose cart the current request operates on from the
+        session token. With ALLOW_USERNAME_AUTH set, a request without a token
+        may instead name the user in the "username" field of the JSON body or
+        the "username" query parameter.
+
+        Returns:
+            int: The id of the user who owns the cart.
+        Raises:
+            PermissionError: If no valid session token is sent, or, with
+                ALLOW_USERNAME_AUTH, no user is given or the user does not exist.
+    """
+    token_user = get_token_user()
+    if token_user is not None:
+        return token_user[0]
+
+    if not ALLOW_USERNAME_AUTH:
+        raise PermissionError("A session token must be specified.")
+
+    data = request.get_json(silent=True) or {}
+    username = data.get("username") or request.args.get("username")
+
+    if not username:
+        raise PermissionError("A username must be specified.")
+
+    try:
+        return User.get_id_by_username(username)
+    except ValueError:
+        raise PermissionError(f"user {username} does not exist")
+
+def cart_etag(user_id: int) -> str:
+    """
+        Builds the entity tag of a user's cart from its version, which every
+        change to the cart bumps. Read it before the cart itself, so a change
+        in between can only make the tag older than the data, never newer.
+
+        Args:
+            user_id (int): The id of the user who owns the cart.
+
+        Returns:
+            str: The entity tag, without quotes.
+    """
+    return f"{user_id}-{CartVersion.get(user_id)}"
+
+def not_modified(etag: str) -> Optional[Response]:
+    """
+        Answers a conditional GET whose If-None-Match still matches the cart.
+
+        Args:
+            etag (str): The current entity tag of the cart.
+
+        Returns:
+            Optional[Response]: An empty 304 response, or None if the client's copy is outdated.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = make_response("", 304)
+    return with_etag(response, etag)
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Tags a cart response and asks clients to revalidate it before reuse."""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+def remember_in_catalog(store, *args: Any) -> None:
+    """
+        Write upstream results to the local catalog. The catalog is only a
+        copy, so a failed write is logged and the request carries on.
+
+        Args:
+            store: The CatalogGame method that writes the results.
+            *args: The arguments of the method.
+    """
+    try:
+        store(*args)
+    except Exception as e:
+        current_app.logger.warning("Could not update the game catalog: %s", str(e))
+
+@bp.route("/search-games/<keyword>", methods=["GET"])
+async def search_games(keyword: str) -> Response:
     """
         Route to search for games given a keyword.
 
@@ -165,21 +443,144 @@ def search_games(keyword: str) -> Response:
         Returns:
             JSON response with the list of games matching the search.
         Raises:
+            503 error if cheapshark.com is unavailable and nothing is known about the keyword.
             500 error if there is an issue retrieving the games from the api.
     """
-    app.logger.info(f"Searching for games with keyword {keyword}")
+    current_app.logger.info(f"Searching for games with keyword {keyword}")
     try:
-        games = search_for_games(keyword)
+        max_num_games = cheapshark().MAX_NUM_GAMES
+        search_cache = cheapshark().search_cache
+        normalized = normalize_keyword(keyword)
+        games = None
+        if not search_cache.can_serve(normalized):
+            games = CatalogGame.search(keyword, max_num_games)
+        if games is None:
+            known = search_cache.peek(normalized)
+            try:
+                games = await async_cheapshark().search_for_games(keyword, limit=None)
+            except RuntimeError as e:
+                games = CatalogGame.search(keyword, max_num_games, max_age=math.inf)
+                if games is None:
+                    raise
+                current_app.logger.warning("Serving stale catalog results for %s: %s", keyword, str(e))
+            else:
+                # Cached results, including the last known ones served when
+                # cheapshark.com fails, are the very list that was cached
+                if games is not known:
+                    remember_in_catalog(CatalogGame.add_search_results, keyword, games)
+        title_index.add(games)
+        games = games[:max_num_games]
 
         return make_response(jsonify({"games": games}), 200)
+    except CircuitOpenError as e:
+        current_app.logger.error(f"Error searching for games: {e}")
+        return make_response(jsonify({"error": str(e)}), 503)
     except Exception as e:
-        app.logger.error(f"Error searching for games: {e}")
+        current_app.logger.error(f"Error searching for games: {e}")
         return make_response(jsonify({"error": str(e)}), 500)
 
-@app.route("/add-game", methods=["POST"])
-def add_game() -> Response:
+@bp.route("/suggest", methods=["GET"])
+def suggest() -> Response:
+    """
+        Route to suggest games whose title has a word starting with the text
+        typed so far. Only titles already seen in searches and lookups are
+        suggested, and cheapshark.com is never called.
+
+        Query Parameters:
+            - q (str): The text typed so far.
+            - limit (int, optional): The maximum number of suggestions, 10 by default.
+            - sort (str, optional): "popularity" (default) or "price".
+
+        Returns:
+            JSON response with the list of suggested games.
+        Raises:
+            400 error if input validation fails.
+    """
+    try:
+        limit = request.args.get("limit", 10, type=int)
+        if limit is None or not 0 < limit <= MAX_SUGGESTIONS:
+            raise ValueError(f"limit must be between 1 and {MAX_SUGGESTIONS}")
+
+        sort = request.args.get("sort", "popularity")
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_ORDERS)}")
+
+        suggestions = title_index.suggest(request.args.get("q", ""), limit, sort)
+        return make_response(jsonify({"suggestions": suggestions}), 200)
+    except ValueError as e:
+        current_app.logger.error("Invalid suggest parameters: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 400)
+
+# The add routes run in three steps so asgi.py can serve them natively: the
+# request is read and the games are saved in a request or app context, while
+# the upstream lookup in between only awaits.
+
+def read_add_game() -> tuple[int, int]:
+    """
+        Reads an /add-game request.
+
+        Returns:
+            tuple[int, int]: The id of the cart owner and the id of the game.
+        Raises:
+            PermissionError: If the cart owner cannot be resolved.
+            ValueError: If no valid id is given.
+    """
+    user_id = get_cart_owner()
+
+    data = request.get_json()
+
+    id = data.get("id")
+
+    if not id:
+        raise ValueError("An id must be specified.")
+
+    return user_id, int(id)
+
+def save_game(user_id: int, id: int, info: dict[str, Any]) -> tuple[dict[str, Any], int]:
+    """
+        Adds a looked up game to the user's cart.
+
+        Args:
+            user_id (int): The id of the cart owner.
+            id (int): The requested game id.
+            info (dict[str, Any]): The game info, {} if the id has no game.
+
+        Returns:
+            tuple[dict[str, Any], int]: The response payload and status.
+    """
+    if info == {}:
+        current_app.logger.info("Game with id %d does not exist", id)
+        return {"error": f"id {id} does not correspond to a game"}, 404
+
+    # Not written to the catalog: a lookup's price is the all-time low, not the current one
+    title_index.add([info])
+
+    game_id, name, price = info["id"], info["name"], info["price"]
+
+    current_app.logger.info("Adding game: %d, %s, %.2f", game_id, name, price)
+    Games.create_game(user_id, game_id, name, price)
+
+    current_app.logger.info("Game added: %s", name)
+    return {"status": "game added", "game": name}, 201
+
+def add_game_error(e: Exception) -> tuple[dict[str, Any], int]:
+    """Logs a failed /add-game request and picks its response payload and status."""
+    if isinstance(e, PermissionError):
+        current_app.logger.error("Could not resolve cart owner: %s", str(e))
+        return {"error": str(e)}, 401
+    if isinstance(e, ValueError):
+        current_app.logger.error("Error with input id: %s", str(e))
+        return {"error": str(e)}, 400
+    if isinstance(e, CircuitOpenError):
+        current_app.logger.error("Could not look up game: %s", str(e))
+        return {"error": str(e)}, 503
+    current_app.logger.error("Failed to add game to database: %s", str(e))
+    return {"error": str(e)}, 500
+
+@bp.route("/add-game", methods=["POST"])
+async def add_game() -> Response:
     """
-        Route to add a game to the cart.
+        Route to add a game to the user's cart.
 
         Expected JSON Input:
             - id (int): The id of the game that will be added.
@@ -188,61 +589,148 @@ def add_game() -> Response:
             JSON response indicating the success of adding the game.
         Raises:
             400 error if input validation fails.
+            401 error if no valid session token is sent.
             404 error if id does not correspond to a game.
+            503 error if cheapshark.com is unavailable and the game is unknown.
             500 error if there is an issue adding the game to the database.
     """
 
-    app.logger.info("Adding game to cart")
+    current_app.logger.info("Adding game to cart")
 
     try:
-        data = request.get_json()
+        user_id, id = read_add_game()
+        info = await async_cheapshark().get_game_info(id)
+        payload, status = save_game(user_id, id, info)
+    except Exception as e:
+        payload, status = add_game_error(e)
+    return make_response(jsonify(payload), status)
 
-        id = data.get("id")
-        
-        if not id:
-            raise ValueError("An id must be specified.")
-        
-        id = int(id)
+def read_add_games() -> tuple[int, list[int]]:
+    """
+        Reads an /add-games request.
 
-        info = get_game_info(id)
+        Returns:
+            tuple[int, list[int]]: The id of the cart owner and the ids of the games.
+        Raises:
+            PermissionError: If the cart owner cannot be resolved.
+            ValueError: If no valid list of ids is given.
+    """
+    user_id = get_cart_owner()
 
-        if info == {}:
-            app.logger.info("Game with id %d does not exist", id)
-            return make_response(jsonify({"error": f"id {id} does not correspond to a game"}), 404)
-        
-        game_id, name, price = info["id"], info["name"], info["price"]
+    data = request.get_json()
 
-        app.logger.info("Adding game: %d, %s, %.2f", game_id, name, price)
-        Games.create_game(game_id, name, price)
+    ids = data.get("ids")
 
-        app.logger.info("Game added: %s", name)
-        return make_response(jsonify({"status": "game added", "game": name}), 201)
-    except ValueError as e:
-        app.logger.error("Error with input id: %s", str(e))
-        return make_response(jsonify({"error": str(e)}), 400)
+    if not ids or not isinstance(ids, list):
+        raise ValueError("A non-empty list of ids must be specified.")
+
+    if len(ids) > MAX_BULK_IDS:
+        raise ValueError(f"At most {MAX_BULK_IDS} ids can be specified.")
+
+    try:
+        return user_id, [int(id) for id in ids]
+    except TypeError as e:
+        raise ValueError(str(e))
+
+def save_games(user_id: int, ids: list[int], infos: dict[int, dict[str, Any]]) -> tuple[dict[str, Any], int]:
+    """
+        Adds the looked up games that exist to the user's cart.
+
+        Args:
+            user_id (int): The id of the cart owner.
+            ids (list[int]): The requested game ids.
+            infos (dict[int, dict[str, Any]]): The info of each id, {} for ids without a game.
+
+        Returns:
+            tuple[dict[str, Any], int]: The response payload and status.
+    """
+    found = [info for info in infos.values() if info]
+    title_index.add(found)
+    statuses = Games.create_games(user_id, found)
+
+    results = [
+        {"id": id, "status": statuses.get(id, "not found")} for id in dict.fromkeys(ids)
+    ]
+
+    current_app.logger.info("Added %d of %d games", len([s for s in statuses.values() if s == "added"]), len(results))
+    return {"results": results}, 200
+
+def read_add_games_error(e: Exception) -> tuple[dict[str, Any], int]:
+    """Logs an /add-games request that could not be read and picks its response payload and status."""
+    if isinstance(e, PermissionError):
+        current_app.logger.error("Could not resolve cart owner: %s", str(e))
+        return {"error": str(e)}, 401
+    current_app.logger.error("Error with input ids: %s", str(e))
+    return {"error": str(e)}, 400
+
+def add_games_error(e: Exception) -> tuple[dict[str, Any], int]:
+    """Logs an /add-games request that failed after it was read and picks its response payload and status."""
+    if isinstance(e, ValueError):
+        current_app.logger.error("Conflict adding games: %s", str(e))
+        return {"error": str(e)}, 409
+    if isinstance(e, CircuitOpenError):
+        current_app.logger.error("Could not look up games: %s", str(e))
+        return {"error": str(e)}, 503
+    current_app.logger.error("Failed to add games to database: %s", str(e))
+    return {"error": str(e)}, 500
+
+@bp.route("/add-games", methods=["POST"])
+async def add_games() -> Response:
+    """
+        Route to add several games to the user's cart at once.
+
+        Expected JSON Input:
+            - ids (List[int]): The ids of the games that will be added, at most MAX_BULK_IDS.
+
+        Returns:
+            JSON response with the status of each id: "added", "duplicate"
+            or "not found".
+        Raises:
+            400 error if input validation fails.
+            401 error if no valid session token is sent.
+            409 error if one of the games was added concurrently.
+            503 error if cheapshark.com is unavailable and some games are unknown.
+            500 error if there is an issue adding the games to the database.
+    """
+
+    current_app.logger.info("Adding games to cart")
+
+    try:
+        user_id, ids = read_add_games()
+    except (PermissionError, ValueError) as e:
+        payload, status = read_add_games_error(e)
+        return make_response(jsonify(payload), status)
+
+    try:
+        infos = await async_cheapshark().get_games_info(ids)
+        payload, status = save_games(user_id, ids, infos)
     except Exception as e:
-        app.logger.error("Failed to add game to database: %s", str(e))
-        return make_response(jsonify({"error": str(e)}), 500)
+        payload, status = add_games_error(e)
+    return make_response(jsonify(payload), status)
 
-@app.route("/delete-game", methods=["DELETE"])
+@bp.route("/delete-game", methods=["DELETE"])
 def delete_game() -> Response:
     """
-        Route to delete a game from the cart by it's game id.
+        Route to delete a game from the user's cart by it's game id.
 
         Expected JSON Input:
+            - username (str): The user whose cart the game is deleted from.
             - id (int): The id of the game that you want to delete.
 
         Returns:
             JSON response indicating the success of deleting the game.
         Raises:
             400 error if input validation fails. 
+            401 error if the user does not exist.
             404 error if game with id does not exist.
             500 if there is an issue deleting the game from the database.
     """
 
-    app.logger.info("Deleting a game from the cart")
+    current_app.logger.info("Deleting a game from the cart")
 
     try:
+        user_id = get_cart_owner()
+
         data = request.get_json()
 
         id = data.get("id")
@@ -252,67 +740,408 @@ def delete_game() -> Response:
         
         id = int(id)
 
-        app.logger.info("Deleting game with id %d", id)
+        current_app.logger.info("Deleting game with id %d", id)
 
-        Games.delete_game(id)
+        Games.delete_game(user_id, id)
 
-        app.logger.info("Game successfully deleted")
+        current_app.logger.info("Game successfully deleted")
 
         return make_response({"status": "game deleted"}, 200)
+    except PermissionError as e:
+        current_app.logger.error("Could not resolve cart owner: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 401)
     except ValueError as e:
-        app.logger.error("Value error: %s", str(e))
+        current_app.logger.error("Value error: %s", str(e))
         if str(e) == f"Game with id {id} not found":
             return make_response(jsonify({"error": str(e)}), 404)
         return make_response(jsonify({"error": str(e)}), 400)
     except Exception as e:
-        app.logger.error("Internal error: %s", str(e))
+        current_app.logger.error("Internal error: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 500)
+
+@bp.route("/delete-games", methods=["DELETE"])
+def delete_games() -> Response:
+    """
+        Route to delete several games from the user's cart at once.
+
+        Expected JSON Input:
+            - username (str): The user whose cart the games are deleted from.
+            - ids (List[int]): The ids of the games that you want to delete, at most MAX_BULK_IDS.
+
+        Returns:
+            JSON response with the ids that were deleted and the ids that were not in the cart.
+        Raises:
+            400 error if input validation fails.
+            401 error if the user does not exist.
+            500 if there is an issue deleting the games from the database.
+    """
+
+    current_app.logger.info("Deleting games from the cart")
+
+    try:
+        user_id = get_cart_owner()
+
+        data = request.get_json()
+
+        ids = data.get("ids")
+
+        if not ids or not isinstance(ids, list):
+            return make_response(jsonify({"error": "A non-empty list of ids must be specified."}), 400)
+
+        if len(ids) > MAX_BULK_IDS:
+            return make_response(jsonify({"error": f"At most {MAX_BULK_IDS} ids can be specified."}), 400)
+
+        ids = [int(id) for id in ids]
+    except PermissionError as e:
+        current_app.logger.error("Could not resolve cart owner: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 401)
+    except (ValueError, TypeError) as e:
+        current_app.logger.error("Error with input ids: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 400)
+
+    try:
+        deleted = Games.delete_games(user_id, ids)
+
+        not_found = sorted(set(ids) - set(deleted))
+
+        current_app.logger.info("Deleted %d games", len(deleted))
+        return make_response(jsonify({"status": "games deleted", "deleted": deleted, "not_found": not_found}), 200)
+    except Exception as e:
+        current_app.logger.error("Internal error: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 500)
+
+@bp.route("/clear-cart", methods=["DELETE"])
+def clear_cart() -> Response:
+    """
+        Route to delete every game from the user's cart.
+
+        Expected JSON Input:
+            - username (str): The user whose cart is cleared.
+
+        Returns:
+            JSON response with the ids of the games that were deleted.
+        Raises:
+            401 error if the user does not exist.
+            500 if there is an issue deleting the games from the database.
+    """
+
+    current_app.logger.info("Clearing the cart")
+
+    try:
+        deleted = Games.clear_cart(get_cart_owner())
+
+        current_app.logger.info("Cleared %d games from the cart", len(deleted))
+        return make_response(jsonify({"status": "cart cleared", "deleted": deleted}), 200)
+    except PermissionError as e:
+        current_app.logger.error("Could not resolve cart owner: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 401)
+    except Exception as e:
+        current_app.logger.error("Internal error: %s", str(e))
         return make_response(jsonify({"error": str(e)}), 500)
 
-@app.route("/get-games", methods=["GET"])
+@bp.route("/get-games", methods=["GET"])
 def get_games() -> Response:
     """
-        Route to get all of the games in the cart.
+        Route to get the games in the user's cart. Responses carry an ETag,
+        and a request whose If-None-Match still matches it gets a 304.
+
+        Query Parameters:
+            - username (str): The user whose cart is returned.
+            - limit (int, optional): Return at most this many games, ordered by id.
+            - after (int, optional): Only return games with an id greater than this
+              cursor, taken from "next_cursor" of the previous page.
+            - stream (bool, optional): Stream every game as newline-delimited JSON.
 
         Returns:
-            JSON response with all of the games in the cart.
+            JSON response with all of the games in the cart, one page of games
+            with the cursor of the next page, or an NDJSON stream of games.
+            304 if the cart has not changed since the client's copy.
         Raises:
+            400 error if the query parameters are invalid.
+            401 error if the user does not exist.
             500 if there is an issue retrieving the games from the database.
     """
 
-    app.logger.info("Getting all games")
+    current_app.logger.info("Getting all games")
 
     try:
-        games = Games.get_all_games()
+        user_id = get_cart_owner()
+
+        limit = request.args.get("limit", type=int)
+        after = request.args.get("after", type=int)
+        if ("limit" in request.args and limit is None) or ("after" in request.args and after is None):
+            raise ValueError("limit and after must be integers")
+        if limit is not None and not 0 < limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    except PermissionError as e:
+        current_app.logger.error("Could not resolve cart owner: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 401)
+    except ValueError as e:
+        current_app.logger.error("Invalid query parameters: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 400)
 
-        return make_response(jsonify({"games": games}), 200)
+    try:
+        etag = cart_etag(user_id)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+            lines = (dumps_bytes(game) + b"\n" for game in Games.iter_games(user_id))
+            return with_etag(Response(stream_with_context(lines), 200, mimetype="application/x-ndjson"), etag)
+
+        if limit is not None or after is not None:
+            games, next_cursor = Games.get_games_page(user_id, after, limit or MAX_PAGE_SIZE)
+
+            return with_etag(make_response(jsonify({"games": games, "next_cursor": next_cursor}), 200), etag)
+
+        games = Games.get_all_games(user_id)
+
+        return with_etag(make_response(jsonify({"games": games}), 200), etag)
     except Exception as e:
-        app.logger.error("Internal error: %s", str(e))
+        current_app.logger.error("Internal error: %s", str(e))
         return make_response(jsonify({"error": str(e)}), 500)
 
-@app.route("/get-total-price", methods=["GET"])
+@bp.route("/get-total-price", methods=["GET"])
 def get_total_price() -> Response:
     """
-        Route to get the total price of the cart.
+        Route to get the total price of the user's cart. Responses carry an
+        ETag, and a request whose If-None-Match still matches it gets a 304.
+
+        Query Parameters:
+            - username (str): The user whose cart is totalled.
 
         Returns:
-            JSON response with the total price of the cart.
+            JSON response with the total price of the cart and the number of games in it.
+            304 if the cart has not changed since the client's copy.
         Raises:
+            401 error if the user does not exist.
             500 if there is an issue retrieving the games from the database.
     """
 
-    app.logger.info("Getting total price")
+    current_app.logger.info("Getting total price")
 
     try:
-        games = Games.get_all_games()
-
-        price = sum([game["price"] for game in games])
-
-        return make_response(jsonify({"price": price}), 200)
+        user_id = get_cart_owner()
+        etag = cart_etag(user_id)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        summary = Games.get_cart_summary(user_id)
+
+        return with_etag(make_response(jsonify({"price": summary["price"], "count": summary["count"]}), 200), etag)
+    except PermissionError as e:
+        current_app.logger.error("Could not resolve cart owner: %s", str(e))
+        return make_response(jsonify({"error": str(e)}), 401)
     except Exception as e:
-        app.logger.error("Internal error: %s", str(e))
+        current_app.logger.error("Internal error: %s", str(e))
         return make_response(jsonify({"error": str(e)}), 500)
 
+####################################################
+#
+# Command line
+#
+####################################################
+
+def read_catalog_file(file) -> Iterator[dict[str, Any]]:
+    """
+        Reads games from a JSON array or a file with one JSON object per line.
+        Entries may use this app's fields (id, name, price) or the fields of
+        a cheapshark.com search result (gameID, external, cheapest).
+
+        Args:
+            file: The open file.
+
+        Yields:
+            dict[str, Any]: Each game with an id, name and price.
+    """
+    first = file.read(1)
+    while first.isspace():
+        first = file.read(1)
+
+    if first == "[":
+        entries: Any = json.loads(first + file.read())
+    else:
+        entries = (json.loads(line) for line in _prepend(first, file) if line.strip())
+
+    for entry in entries:
+        yield {
+            "id": entry.get("id", entry.get("gameID")),
+            "name": entry.get("name", entry.get("external")),
+            "price": entry.get("price", entry.get("cheapest"))
+        }
+
+def _prepend(first: str, file) -> Iterator[str]:
+    """The lines of a file whose first character was already read."""
+    lines = iter(file)
+    yield first + next(lines, "")
+    yield from lines
+
+@bp.cli.command("import-catalog")
+@click.argument("file", type=click.File("r"))
+def import_catalog(file) -> None:
+    """Bulk import games into the local catalog from FILE."""
+    count = CatalogGame.upsert_games(read_catalog_file(file))
+    click.echo(f"Imported {count} games into the catalog.")
+
+@bp.cli.command("refresh-prices")
+def refresh_prices() -> None:
+    """Refresh the stalest cart prices once, within one run's request budget."""
+    from game_cart.utils.price_refresher import PriceRefresher
+
+    count = PriceRefresher.from_env(current_app).run_once()
+    click.echo(f"Refreshed the prices of {count} games.")
+
+####################################################
+#
+# App factory
+#
+####################################################
+
+# Columns added to existing tables since the first release, with the DDL that
+# adds each one. Games stored before price_updated_at count as never refreshed.
+ADDED_COLUMNS = {
+    "users": {"iterations": "INTEGER"},
+    "games": {"price_updated_at": "FLOAT NOT NULL DEFAULT 0"}
+}
+
+def add_missing_columns() -> List[str]:
+    """
+    Add the columns of ADDED_COLUMNS to tables created before them, so
+    existing accounts and carts are kept.
+
+    Returns:
+        List[str]: The added columns, as "table.column".
+
+    Raises:
+        click.ClickException: If the games table predates per-user carts. Its
+            rows have no owner, so it must be migrated by hand.
+    """
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    columns = {table: {column["name"] for column in inspector.get_columns(table)} for table in tables}
+
+    if "games" in tables and "user_id" not in columns["games"]:
+        raise click.ClickException(
+            "The games table predates per-user carts and its games have no owner. "
+            "Rename or drop it, then run init-db again to create the new one."
+        )
+
+    added = []
+    with db.engine.begin() as connection:
+        for table, new_columns in ADDED_COLUMNS.items():
+            if table not in tables:
+                continue
+            for name, ddl in new_columns.items():
+                if name not in columns[table]:
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                    added.append(f"{table}.{name}")
+    return added
+
+def initialize_database() -> List[str]:
+    """
+    Create the missing tables, columns and indexes. Existing rows are kept.
+    Must be called inside an app context.
+
+    Returns:
+        List[str]: The columns added to existing tables, as "table.column".
+
+    Raises:
+        click.ClickException: If the games table predates per-user carts.
+    """
+    added = add_missing_columns()
+    db.create_all()
+    # create_all only creates the indexes of new tables
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    return added
+
+@bp.cli.command("init-db")
+def init_db() -> None:
+    """Create the missing tables, columns and indexes. Existing rows are kept."""
+    for column in initialize_database():
+        click.echo(f"Added column {column}.")
+    click.echo("Database initialized.")
+
+def create_app(config: Optional[dict[str, Any]] = None) -> Flask:
+    """
+    Create and configure the Flask app. Nothing is read from or written to
+    the database here, so importing the app stays cheap; the schema is created
+    by the init-db command.
+
+    Args:
+        config: Settings applied over the ones read from the environment,
+            for example SQLALCHEMY_DATABASE_URI.
+
+    Returns:
+        The configured Flask app with every route registered.
+    """
+    start = time.perf_counter()
+    app = Flask(__name__)
+    configure_logger(app.logger)
+    app.json = OrjsonProvider(app)
+
+    # Async views run on a long-lived loop per worker thread so the async
+    # CheapShark client keeps its connections between requests
+    app.async_to_sync = run_on_thread_loop
+
+    config = config or {}
+    # The engine options depend on the database, so build them for the final URI
+    app.config.update(get_database_config(config.get("SQLALCHEMY_DATABASE_URI")))
+    app.config.update(config)
+    install_sqlite_pragmas()
+
+    db.init_app(app)
+    app.register_blueprint(bp)
+
+    app.logger.info("App created in %.1f ms", (time.perf_counter() - start) * 1e3)
+    return app
+
+def warm_up(app: Flask) -> None:
+    """
+    Prepare a freshly started worker before it takes traffic: open a database
+    connection, load the most recently seen catalog titles into the suggestion
+    index and prefill the search cache with the comma separated keywords in
+    WARMUP_KEYWORDS, which also opens a kept-alive upstream connection.
+
+    Args:
+        app: The Flask app to warm up.
+    """
+    with app.app_context():
+        db.session.execute(text("SELECT 1"))
+        title_index.add(CatalogGame.get_recent(title_index.max_entries))
+        db.session.remove()
+
+    for keyword in filter(None, (k.strip() for k in os.getenv("WARMUP_KEYWORDS", "").split(","))):
+        try:
+            cheapshark().search_for_games(keyword)
+        except Exception as e:
+            app.logger.warning("Warm-up search for %s failed: %s", keyword, str(e))
+
+    app.logger.info("Worker warmed up")
+
+def start_background_tasks(app: Flask) -> None:
+    """
+    Start the background price refresher in this process, unless
+    PRICE_REFRESH_ENABLED is false. Every process may start it; a file lock
+    makes sure only one of them refreshes at a time.
+
+    Args:
+        app: The Flask app whose carts are refreshed.
+    """
+    if os.getenv("PRICE_REFRESH_ENABLED", "true").lower() == "true":
+        from game_cart.utils.price_refresher import PriceRefresher
+
+        PriceRefresher.from_env(app).start()
+
+app = create_app()
 
-    
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=5000)
\ No newline at end of file
+    # Development server only; production runs under gunicorn with gunicorn.conf.py
+    with app.app_context():
+        for column in initialize_database():
+            app.logger.info(f"Added column {column}")
+    start_background_tasks(app)
+    app.run(debug=os.getenv("FLASK_DEBUG", "false").lower() == "true", host="0.0.0.0", port=5000)
\ No newline at end of file
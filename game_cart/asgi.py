@@ -0,0 +1,189 @@
+"""
+ASGI entry point, for example:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 4
+
+GET /search-games/<keyword>, POST /add-game and POST /add-games are answered
+directly on the event loop, so one worker can keep hundreds of CheapShark
+requests in flight. Their database and catalog work runs on a thread pool,
+and no thread waits on cheapshark.com. Every other route is handed to the
+Flask app, which runs it on a thread pool.
+"""
+import math
+import time
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi
+
+from app import (
+    add_game_error, add_games_error, app, read_add_game, read_add_games, read_add_games_error,
+    remember_in_catalog, save_game, save_games, start_background_tasks, title_index
+)
+from game_cart.models.catalog_model import CATALOG_MAX_AGE, CatalogGame
+from game_cart.utils import async_cheapsharkapi
+from game_cart.utils.cheapsharkapi import MAX_NUM_GAMES, search_cache
+from game_cart.utils.circuit_breaker import CircuitOpenError
+from game_cart.utils.compression import COMPRESSION_ENCODINGS, compress
+from game_cart.utils.json_provider import dumps_bytes
+from game_cart.utils.keywords import normalize_keyword
+from game_cart.utils.metrics import observe_request
+
+SEARCH_PREFIX = "/search-games/"
+
+flask_application = WsgiToAsgi(app)
+
+
+async def _send_json(send, status: int, payload: dict, accept_encoding: str = "") -> None:
+    body = dumps_bytes(payload) + b"\n"
+    headers = [(b"content-type", b"application/json")]
+    if status == 200 and COMPRESSION_ENCODINGS:
+        headers.append((b"vary", b"Accept-Encoding"))
+        body, encoding = compress(body, accept_encoding)
+        if encoding is not None:
+            headers.append((b"content-encoding", encoding.encode()))
+    headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return body
+
+
+@sync_to_async(thread_sensitive=False)
+def in_request_context(scope, body: bytes, step):
+    """Run a step that reads the request, in a Flask request context built from the ASGI scope."""
+    headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in scope["headers"]]
+    with app.test_request_context(
+        scope["path"], method=scope["method"], query_string=scope["query_string"], headers=headers, data=body
+    ):
+        return step()
+
+
+@sync_to_async(thread_sensitive=False)
+def in_app_context(step, *args):
+    with app.app_context():
+        return step(*args)
+
+
+@sync_to_async(thread_sensitive=False)
+def search_catalog(keyword: str, max_age: float = CATALOG_MAX_AGE):
+    with app.app_context():
+        return CatalogGame.search(keyword, MAX_NUM_GAMES, max_age)
+
+
+@sync_to_async(thread_sensitive=False)
+def store_in_catalog(keyword: str, games: list) -> None:
+    with app.app_context():
+        remember_in_catalog(CatalogGame.add_search_results, keyword, games)
+
+
+async def search_games(keyword: str, send, accept_encoding: str = "") -> None:
+    """The asynchronous counterpart of the /search-games/<keyword> Flask route."""
+    start = time.perf_counter()
+    app.logger.info(f"Searching for games with keyword {keyword}")
+    try:
+        normalized = normalize_keyword(keyword)
+        games = None
+        if not search_cache.can_serve(normalized):
+            games = await search_catalog(keyword)
+        if games is None:
+            known = search_cache.peek(normalized)
+            try:
+                games = await async_cheapsharkapi.search_for_games(keyword, limit=None)
+            except RuntimeError as e:
+                games = await search_catalog(keyword, math.inf)
+                if games is None:
+                    raise
+                app.logger.warning("Serving stale catalog results for %s: %s", keyword, str(e))
+            else:
+                # Only results fetched by this call are new to the catalog
+                if games is not known:
+                    await store_in_catalog(keyword, games)
+        title_index.add(games)
+        games = games[:MAX_NUM_GAMES]
+        status, payload = 200, {"games": games}
+    except CircuitOpenError as e:
+        app.logger.error(f"Error searching for games: {e}")
+        status, payload = 503, {"error": str(e)}
+    except Exception as e:
+        app.logger.error(f"Error searching for games: {e}")
+        status, payload = 500, {"error": str(e)}
+
+    await _send_json(send, status, payload, accept_encoding)
+    observe_request("GET", "/search-games/<keyword>", status, time.perf_counter() - start)
+
+
+async def add_game(scope, body: bytes, send) -> None:
+    """The asynchronous counterpart of the /add-game Flask route."""
+    start = time.perf_counter()
+    app.logger.info("Adding game to cart")
+    try:
+        user_id, id = await in_request_context(scope, body, read_add_game)
+        info = await async_cheapsharkapi.get_game_info(id)
+        payload, status = await in_app_context(save_game, user_id, id, info)
+    except Exception as e:
+        with app.app_context():
+            payload, status = add_game_error(e)
+
+    await _send_json(send, status, payload)
+    observe_request("POST", "/add-game", status, time.perf_counter() - start)
+
+
+async def add_games(scope, body: bytes, send) -> None:
+    """The asynchronous counterpart of the /add-games Flask route."""
+    start = time.perf_counter()
+    app.logger.info("Adding games to cart")
+    try:
+        user_id, ids = await in_request_context(scope, body, read_add_games)
+    except (PermissionError, ValueError) as e:
+        with app.app_context():
+            payload, status = read_add_games_error(e)
+    else:
+        try:
+            infos = await async_cheapsharkapi.get_games_info(ids)
+            payload, status = await in_app_context(save_games, user_id, ids, infos)
+        except Exception as e:
+            with app.app_context():
+                payload, status = add_games_error(e)
+
+    await _send_json(send, status, payload)
+    observe_request("POST", "/add-games", status, time.perf_counter() - start)
+
+
+NATIVE_ROUTES = {("POST", "/add-game"): add_game, ("POST", "/add-games"): add_games}
+
+
+async def lifespan(receive, send) -> None:
+    """Start the background tasks, and close the pooled upstream connections when the server shuts down."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            start_background_tasks(app)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await async_cheapsharkapi.client.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+
+    path = scope["path"]
+    keyword = path[len(SEARCH_PREFIX):]
+    route = NATIVE_ROUTES.get((scope["method"], path)) if scope["type"] == "http" else None
+    if scope["type"] == "http" and scope["method"] == "GET" and path.startswith(SEARCH_PREFIX) and keyword and "/" not in keyword:
+        accept_encoding = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        await search_games(keyword, send, accept_encoding)
+    elif route is not None:
+        await route(scope, await _read_body(receive), send)
+    else:
+        await flask_application(scope, receive, send)
@@ -0,0 +1,48 @@
+import json
+from typing import Any, Callable
+
+from benchmarks.harness import benchmark
+from game_cart.utils.cheapsharkapi import _parse_games, _parse_games_info
+
+
+def search_payload(size: int) -> bytes:
+    """A canned games?title= response body with `size` games."""
+    return json.dumps([
+        {
+            "gameID": str(id),
+            "steamAppID": str(100000 + id),
+            "cheapest": f"{id % 60}.99",
+            "cheapestDealID": "tyTH88J0PXRvYALBjV3cNHd5Juq1qKcu4tG4lBiUCt4%3D",
+            "external": f"Benchmark Game {id}: The Sequel",
+            "internalName": f"BENCHMARKGAME{id}THESEQUEL",
+            "thumb": f"https://cdn.example.com/capsule_{id}.jpg"
+        }
+        for id in range(1, size + 1)
+    ]).encode()
+
+
+def games_info_payload(size: int) -> bytes:
+    """A canned games?ids= response body with `size` games."""
+    return json.dumps({
+        str(id): {
+            "info": {"title": f"Benchmark Game {id}: The Sequel", "steamAppID": str(100000 + id)},
+            "cheapestPriceEver": {"price": f"{id % 60}.99", "date": 1700000000},
+            "deals": [
+                {"storeID": "1", "dealID": "x" * 40, "price": f"{id % 60}.99", "retailPrice": "59.99", "savings": "50.0"}
+            ]
+        }
+        for id in range(1, size + 1)
+    }).encode()
+
+
+@benchmark("cheapshark.parse_search")
+def parse_search(size: int) -> Callable[[], Any]:
+    body = search_payload(size)
+    return lambda: _parse_games(json.loads(body))
+
+
+@benchmark("cheapshark.parse_games_info")
+def parse_games_info(size: int) -> Callable[[], Any]:
+    body = games_info_payload(size)
+    ids = list(range(1, size + 1))
+    return lambda: _parse_games_info(ids, json.loads(body))
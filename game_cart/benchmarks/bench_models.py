@@ -0,0 +1,94 @@
+import itertools
+import os
+import tempfile
+from typing import Any, Callable
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from benchmarks.harness import benchmark
+from game_cart.db import db
+from game_cart.db_config import install_sqlite_pragmas
+from game_cart.models import catalog_model, session_model  # noqa: F401, registers their tables
+from game_cart.models.game_model import Games
+from game_cart.models.user_model import User
+from game_cart.utils import password_hashing
+
+PASSWORD = "benchmark-password"
+
+_directory = tempfile.TemporaryDirectory(prefix="game_cart_bench_")
+_databases = itertools.count()
+_engine = None
+
+
+def fresh_database() -> None:
+    """Point db.session at a new SQLite file in a temporary directory, with the production pragmas."""
+    global _engine
+    if _engine is not None:
+        db.session.remove()
+        _engine.dispose()
+
+    install_sqlite_pragmas()
+    path = os.path.join(_directory.name, f"bench{next(_databases)}.db")
+    _engine = create_engine(f"sqlite:///{path}")
+    db.Model.metadata.create_all(bind=_engine)
+    db.session = scoped_session(sessionmaker(bind=_engine))
+
+
+def fill_cart(size: int) -> int:
+    """Create a user whose cart holds `size` games with ids 1 to size, and return the user's id."""
+    fresh_database()
+    db.session.execute(insert(User), [{"username": "buyer", "salt": "", "password": "", "iterations": 1}])
+    user_id = User.get_id_by_username("buyer")
+    db.session.execute(insert(Games), [
+        {"user_id": user_id, "id": id, "name": f"Benchmark Game {id}", "price": 9.99} for id in range(1, size + 1)
+    ])
+    db.session.commit()
+    return user_id
+
+
+def fill_users(size: int) -> None:
+    """Create `size` users, all with the password PASSWORD hashed at the current work factor."""
+    fresh_database()
+    salt = os.urandom(16).hex()
+    iterations = password_hashing.PASSWORD_HASH_ITERATIONS
+    hashed = password_hashing.hash_password(PASSWORD, salt, iterations)
+    db.session.execute(insert(User), [
+        {"username": f"user{n}", "salt": salt, "password": hashed, "iterations": iterations} for n in range(size)
+    ])
+    db.session.commit()
+
+
+@benchmark("games.create_game", max_rounds=50)
+def create_game(size: int) -> Callable[[], Any]:
+    user_id = fill_cart(size)
+    ids = itertools.count(size + 1)
+    return lambda: Games.create_game(user_id, next(ids), "New Benchmark Game", 19.99)
+
+
+@benchmark("games.get_all_games", max_rounds=50)
+def get_all_games(size: int) -> Callable[[], Any]:
+    user_id = fill_cart(size)
+    return lambda: Games.get_all_games(user_id)
+
+
+@benchmark("games.delete_game", max_rounds=50)
+def delete_game(size: int) -> Callable[[], Any]:
+    # The extra rows are the ones deleted, so the cart never drops below `size` games
+    user_id = fill_cart(size + 51)
+    ids = itertools.count(size + 1)
+    return lambda: Games.delete_game(user_id, next(ids))
+
+
+@benchmark("users.create_user", max_rounds=20)
+def create_user(size: int) -> Callable[[], Any]:
+    fill_users(size)
+    names = itertools.count(size)
+    return lambda: User.create_user(f"user{next(names)}", PASSWORD)
+
+
+@benchmark("users.check_password", max_rounds=20)
+def check_password(size: int) -> Callable[[], Any]:
+    fill_users(size)
+    username = f"user{size // 2}"
+    return lambda: User.check_password(username, PASSWORD)
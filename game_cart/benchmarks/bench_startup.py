@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Callable, Optional
+
+from benchmarks.harness import benchmark
+
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_directory = tempfile.TemporaryDirectory(prefix="game_cart_startup_")
+
+
+def _environment() -> dict[str, str]:
+    """The current environment with the database in a temporary directory, as on a fresh machine."""
+    return dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(_directory.name, 'app.db')}")
+
+
+@benchmark("startup.python", max_rounds=10, sized=False)
+def python_startup(size: Optional[int]) -> Callable[[], Any]:
+    """A bare interpreter, the floor under startup.import_app."""
+    return lambda: subprocess.run([sys.executable, "-c", "pass"], check=True)
+
+
+@benchmark("startup.import_app", max_rounds=10, sized=False)
+def import_app(size: Optional[int]) -> Callable[[], Any]:
+    """What a worker, a CLI command or test collection pays to get the app, in a fresh interpreter."""
+    environment = _environment()
+    return lambda: subprocess.run(
+        [sys.executable, "-c", "import app"], cwd=APP_DIRECTORY, env=environment, check=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+@benchmark("startup.create_app", max_rounds=50, sized=False)
+def build_app(size: Optional[int]) -> Callable[[], Any]:
+    """Building one more app once the modules are imported."""
+    sys.path.insert(0, APP_DIRECTORY)
+    from app import create_app
+
+    uri = f"sqlite:///{os.path.join(_directory.name, 'app.db')}"
+    return lambda: create_app({"SQLALCHEMY_DATABASE_URI": uri})
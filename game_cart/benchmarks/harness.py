@@ -0,0 +1,142 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, List, Optional
+
+# name -> (make, max_rounds, sized), where make(size) prepares a case and returns the operation to time
+BENCHMARKS: dict[str, tuple[Callable[[Optional[int]], Callable[[], Any]], int, bool]] = {}
+
+
+def benchmark(name: str, max_rounds: int = 200, sized: bool = True) -> Callable:
+    """
+        Registers a benchmark case.
+
+        The decorated function takes the size of the case, prepares a database
+        or payload of that size and returns the operation to time. Operations
+        that add or remove rows should use a small max_rounds, so the table
+        stays close to the size being measured.
+
+        Args:
+            name (str): The name of the case, such as "games.get_all_games".
+            max_rounds (int): The maximum number of times the operation runs.
+            sized (bool): False for cases that do not depend on a size, which
+                run once and are passed None.
+    """
+    def register(make: Callable[[Optional[int]], Callable[[], Any]]) -> Callable[[Optional[int]], Callable[[], Any]]:
+        BENCHMARKS[name] = (make, max_rounds, sized)
+        return make
+    return register
+
+
+def measure(operation: Callable[[], Any], max_rounds: int, min_time: float = 0.2, min_rounds: int = 3) -> dict[str, Any]:
+    """
+        Times single calls of an operation after one warm-up call, until
+        min_time seconds have passed or max_rounds calls were made.
+
+        Args:
+            operation (Callable[[], Any]): The operation to time.
+            max_rounds (int): The maximum number of timed calls.
+            min_time (float): Stop once the timed calls took this many seconds.
+            min_rounds (int): The minimum number of timed calls.
+
+        Returns:
+            dict[str, Any]: The number of rounds and the median, mean, min and
+                max seconds per call.
+    """
+    operation()
+    timings: List[float] = []
+    while len(timings) < max_rounds and (len(timings) < min_rounds or sum(timings) < min_time):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "rounds": len(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "min": min(timings),
+        "max": max(timings)
+    }
+
+
+def run(names: List[str], sizes: List[int], min_time: float = 0.2, report: Callable[[str], None] = print) -> dict[str, Any]:
+    """
+        Runs benchmark cases at every size.
+
+        Args:
+            names (List[str]): The registered cases to run.
+            sizes (List[int]): The row or payload sizes to run each case at.
+            min_time (float): The time budget of each case and size, in seconds.
+            report (Callable[[str], None]): Receives one line per finished case.
+
+        Returns:
+            dict[str, Any]: The environment the suite ran in and the timings
+                of each case, keyed by "<name>[<size>]", or the name of cases
+                without a size.
+    """
+    results = {}
+    for name in names:
+        make, max_rounds, sized = BENCHMARKS[name]
+        for size in sizes if sized else [None]:
+            key = name if size is None else f"{name}[{size}]"
+            results[key] = measure(make(size), max_rounds, min_time)
+            report(f"{key:<40} {results[key]['median'] * 1e3:12.4f} ms median of {results[key]['rounds']}")
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "password_hash_iterations": os.getenv("PASSWORD_HASH_ITERATIONS", "600000"),
+            "sizes": sizes
+        },
+        "results": results
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.25) -> List[dict[str, Any]]:
+    """
+        Finds the cases whose median got slower than the baseline's by more
+        than the threshold. Cases missing from the baseline are skipped.
+
+        Args:
+            results (dict[str, Any]): The output of run.
+            baseline (dict[str, Any]): The output of an earlier run.
+            threshold (float): The allowed slowdown, 0.25 for 25%.
+
+        Returns:
+            List[dict[str, Any]]: The case, baseline and current medians and
+                ratio of each regression.
+    """
+    regressions = []
+    for key, current in results["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None or previous["median"] <= 0:
+            continue
+        ratio = current["median"] / previous["median"]
+        if ratio > 1 + threshold:
+            regressions.append({
+                "case": key, "baseline": previous["median"], "current": current["median"], "ratio": ratio
+            })
+    return regressions
+
+
+def load(path: str) -> Optional[dict[str, Any]]:
+    """Reads earlier results, or None if the file does not exist."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def save(path: str, results: dict[str, Any]) -> None:
+    """Writes results as indented JSON."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
@@ -0,0 +1,65 @@
+"""
+Runs the microbenchmarks of the model and CheapShark client layers, from the
+game_cart directory:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 10,1000 --filter games.
+    python -m benchmarks.run --save-baseline
+
+Results are written as JSON and compared with the stored baseline. The exit
+status is 1 if any case got slower than the baseline by more than the threshold.
+"""
+import argparse
+import os
+import sys
+
+# Per-call log records would otherwise be part of every timing
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks import bench_cheapshark, bench_models, bench_startup  # noqa: E402, F401, register the cases
+from benchmarks.harness import BENCHMARKS, compare, load, run, save  # noqa: E402
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the game_cart microbenchmarks.")
+    parser.add_argument("--sizes", default="10,1000,100000", help="Comma separated row and payload sizes.")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds spent timing each case and size.")
+    parser.add_argument("--output", default=os.path.join(DIRECTORY, "results", "latest.json"))
+    parser.add_argument("--baseline", default=os.path.join(DIRECTORY, "baseline.json"))
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown, 0.25 for 25%%.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run(names, sizes, args.min_time)
+
+    save(args.output, results)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        save(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = load(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, nothing to compare with")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['case']}: {regression['baseline'] * 1e3:.4f} ms -> "
+            f"{regression['current'] * 1e3:.4f} ms ({regression['ratio']:.2f}x)"
+        )
+    if not regressions:
+        print(f"No case is more than {args.threshold:.0%} slower than the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
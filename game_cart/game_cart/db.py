@@ -1,3 +1,12 @@
+from typing import Any
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import postgresql, sqlite
+
+db = SQLAlchemy()
+
 
-db = SQLAlchemy()
\ No newline at end of file
+def upsert(table: Any) -> Any:
+    """An INSERT that supports on_conflict_do_update for the dialect of the current session."""
+    dialect = postgresql if db.session.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(table)
@@ -0,0 +1,99 @@
+import logging
+import os
+import sqlite3
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+from game_cart.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+DEFAULT_DATABASE_URI = "sqlite:////app/db/app.db"
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+def get_database_config(uri: Optional[str] = None) -> dict[str, Any]:
+    """
+    Builds the Flask-SQLAlchemy settings from the environment.
+
+    Args:
+        uri: The database URI to build the settings for, overriding DATABASE_URL.
+
+    Environment variables:
+        DATABASE_URL: The database URI. Defaults to the SQLite file in /app/db.
+        DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE: Sizing
+            of the connection pool.
+        DB_POOL_PRE_PING: Whether to check connections before handing them out.
+
+    Returns:
+        dict[str, Any]: The SQLALCHEMY_* settings to apply to app.config.
+    """
+    uri = uri or os.getenv("DATABASE_URL", DEFAULT_DATABASE_URI)
+    url = make_url(uri)
+
+    options: dict[str, Any] = {"pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True)}
+
+    # In-memory SQLite uses a single shared connection, which has no pool to size
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800"))
+        )
+
+    return {
+        "SQLALCHEMY_DATABASE_URI": uri,
+        "SQLALCHEMY_ENGINE_OPTIONS": options,
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False
+    }
+
+
+def get_sqlite_pragmas() -> dict[str, Any]:
+    """
+    Builds the pragmas applied to every SQLite connection from the environment.
+
+    Environment variables:
+        SQLITE_JOURNAL_MODE: Defaults to WAL so readers never block the writer.
+        SQLITE_BUSY_TIMEOUT_MS: How long a writer waits for the lock before
+            failing with "database is locked".
+        SQLITE_SYNCHRONOUS: Defaults to NORMAL, which is safe in WAL mode.
+        SQLITE_CACHE_SIZE_KB: Page cache size of each connection.
+
+    Returns:
+        dict[str, Any]: The pragma names and values, in the order to apply them.
+    """
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000")),
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON"
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """Apply the configured pragmas to each new SQLite connection."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in get_sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas() -> None:
+    """Apply the SQLite pragmas to the connections of every engine. Safe to call more than once."""
+    if not event.contains(Engine, "connect", _apply_sqlite_pragmas):
+        event.listen(Engine, "connect", _apply_sqlite_pragmas)
+        logger.info("SQLite connection pragmas installed: %s", get_sqlite_pragmas())
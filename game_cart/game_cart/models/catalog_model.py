@@ -0,0 +1,217 @@
+import logging
+import os
+import time
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import DDL, event, text
+
+from game_cart.db import db, upsert
+from game_cart.utils.keywords import normalize_keyword
+from game_cart.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# Catalog rows and recorded searches older than this are refreshed from cheapshark.com
+CATALOG_MAX_AGE = float(os.getenv("CATALOG_MAX_AGE", "3600"))
+
+UPSERT_BATCH_SIZE = 1000
+
+def _fts_query(keyword: str) -> str:
+    """Match every word of the keyword as a prefix, quoted so FTS5 operators in user input are literal."""
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in keyword.split())
+
+class CatalogGame(db.Model):
+    """
+    A local copy of the titles, ids and current cheapest prices seen on
+    cheapshark.com, filled from search responses and bulk imports. Lookups by
+    id are not stored, since they only report the all-time lowest price. On
+    SQLite the titles are indexed by the catalog_fts FTS5 table, which
+    triggers keep in step with this one.
+    """
+
+    __tablename__ = "catalog_games"
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(255), nullable=False)
+    price = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)
+
+    @classmethod
+    def upsert_games(cls, games: Iterable[dict[str, Any]], now: Optional[float] = None) -> int:
+        """
+        Insert games into the catalog, or refresh the title and price of the
+        ones already in it, in batches of UPSERT_BATCH_SIZE.
+
+        Args:
+            games (Iterable[dict[str, Any]]): The games, each with an id, name and price.
+            now (Optional[float]): The time the data was fetched. Defaults to now.
+
+        Returns:
+            int: The number of games written.
+
+        Raises:
+            ValueError: If a game is missing its id, name or price.
+        """
+        now = time.time() if now is None else now
+        count = 0
+        batch = {}
+        try:
+            for game in games:
+                try:
+                    batch[int(game["id"])] = {
+                        "id": int(game["id"]), "title": game["name"], "price": float(game["price"]), "updated_at": now
+                    }
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ValueError(f"Invalid catalog entry {game!r}: {e}")
+
+                if len(batch) >= UPSERT_BATCH_SIZE:
+                    count += cls._upsert_batch(list(batch.values()))
+                    batch = {}
+            if batch:
+                count += cls._upsert_batch(list(batch.values()))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Database error: %s", str(e))
+            raise
+
+        logger.info("Upserted %d catalog games", count)
+        return count
+
+    @classmethod
+    def _upsert_batch(cls, rows: List[dict[str, Any]]) -> int:
+        stmt = upsert(cls.__table__).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.id],
+            set_={"title": stmt.excluded.title, "price": stmt.excluded.price, "updated_at": stmt.excluded.updated_at}
+        )
+        db.session.execute(stmt)
+        return len(rows)
+
+    @classmethod
+    def search(cls, keyword: str, limit: int, max_age: float = CATALOG_MAX_AGE) -> Optional[List[dict[str, Any]]]:
+        """
+        Answer a search from the catalog when it can be trusted. A keyword
+        searched upstream within `max_age` is answered with the games that
+        search returned. Any other keyword is answered from the full-text
+        index, but only if it matches at least `limit` games. Either way every
+        game must have been refreshed within `max_age`.
+
+        Args:
+            keyword (str): The search keyword.
+            limit (int): The maximum number of games to return.
+            max_age (float): The age in seconds after which data is stale.
+
+        Returns:
+            Optional[List[dict[str, Any]]]: The best matching games, in the
+                format of cheapsharkapi.search_for_games, or None on a miss.
+        """
+        normalized = normalize_keyword(keyword)
+        if not normalized:
+            return None
+
+        cutoff = time.time() - max_age
+        searched = db.session.get(CatalogSearch, normalized)
+        if searched is not None and searched.searched_at >= cutoff:
+            ids = [int(id) for id in searched.game_ids.split(",") if id][:limit]
+            found = {row.id: row for row in db.session.query(cls).filter(cls.id.in_(ids))} if ids else {}
+            rows = [found[id] for id in ids if id in found]
+            if len(rows) < len(ids):
+                logger.info("Catalog is missing results of %s", normalized)
+                return None
+        else:
+            rows = cls._match(normalized, limit)
+            if len(rows) < limit:
+                logger.info("Catalog has %d results for %s, not known to be complete", len(rows), normalized)
+                return None
+
+        if any(row.updated_at < cutoff for row in rows):
+            logger.info("Catalog results for %s are stale", normalized)
+            return None
+
+        return [{"name": row.title, "id": str(row.id), "price": f"{row.price:.2f}"} for row in rows]
+
+    @classmethod
+    def _match(cls, keyword: str, limit: int) -> List[Any]:
+        """The best `limit` full-text matches of a normalized keyword."""
+        if db.session.get_bind().dialect.name == "sqlite":
+            return db.session.execute(
+                text(
+                    "SELECT c.id, c.title, c.price, c.updated_at FROM catalog_fts "
+                    "JOIN catalog_games c ON c.id = catalog_fts.rowid "
+                    "WHERE catalog_fts MATCH :query ORDER BY rank LIMIT :limit"
+                ),
+                {"query": _fts_query(keyword), "limit": limit}
+            ).all()
+        return db.session.query(cls.id, cls.title, cls.price, cls.updated_at).filter(
+            cls.title.ilike(f"%{keyword}%")
+        ).order_by(cls.price).limit(limit).all()
+
+    @classmethod
+    def get_recent(cls, limit: int) -> List[dict[str, Any]]:
+        """
+        Get the most recently refreshed games.
+
+        Args:
+            limit (int): The maximum number of games to return.
+
+        Returns:
+            List[dict[str, Any]]: The games, in the format of cheapsharkapi.search_for_games.
+        """
+        rows = db.session.query(cls.id, cls.title, cls.price).order_by(cls.updated_at.desc()).limit(limit)
+        return [{"name": row.title, "id": str(row.id), "price": f"{row.price:.2f}"} for row in rows]
+
+    @classmethod
+    def add_search_results(cls, keyword: str, games: List[dict[str, Any]]) -> None:
+        """
+        Store every game of an upstream search and remember which games the
+        keyword returned, in order.
+
+        Args:
+            keyword (str): The search keyword.
+            games (List[dict[str, Any]]): Every game cheapshark.com found.
+        """
+        now = time.time()
+        ids = ",".join(str(game["id"]) for game in games)
+        try:
+            stmt = upsert(CatalogSearch.__table__).values(
+                keyword=normalize_keyword(keyword), game_ids=ids, searched_at=now
+            )
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=[CatalogSearch.keyword], set_={"game_ids": ids, "searched_at": now}
+            ))
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Database error: %s", str(e))
+            raise
+        cls.upsert_games(games, now)
+
+class CatalogSearch(db.Model):
+    """The keywords searched on cheapshark.com and the ids of the games each one returned."""
+
+    __tablename__ = "catalog_searches"
+
+    keyword = db.Column(db.String(255), primary_key=True)
+    game_ids = db.Column(db.Text, nullable=False)
+    searched_at = db.Column(db.Float, nullable=False)
+
+# The FTS5 index uses catalog_games as its external content, so it stores only
+# the index and is kept current by triggers. Other databases fall back to LIKE.
+for statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts USING fts5("
+    "title, content='catalog_games', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS catalog_games_ai AFTER INSERT ON catalog_games BEGIN "
+    "INSERT INTO catalog_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS catalog_games_ad AFTER DELETE ON catalog_games BEGIN "
+    "INSERT INTO catalog_fts(catalog_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER IF NOT EXISTS catalog_games_au AFTER UPDATE OF title ON catalog_games "
+    "WHEN old.title IS NOT new.title BEGIN "
+    "INSERT INTO catalog_fts(catalog_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO catalog_fts(rowid, title) VALUES (new.id, new.title); END",
+):
+    event.listen(CatalogGame.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    CatalogGame.__table__, "after_drop", DDL("DROP TABLE IF EXISTS catalog_fts").execute_if(dialect="sqlite")
+)
@@ -1,29 +1,89 @@
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 import logging
-from typing import Any, List
+import time
+from typing import Any, Iterator, List, Optional
 
+from sqlalchemy import bindparam, delete, func, select, update
 from sqlalchemy.exc import IntegrityError
 
-from game_cart.db import db
+from game_cart.db import db, upsert
+from game_cart.models.user_model import User
 from game_cart.utils.logger import configure_logger
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
+class CartVersion(db.Model):
+    """
+    A counter per cart that every change to the cart bumps in the same
+    transaction, so clients can tell whether a cart changed from one lookup.
+    """
+
+    __tablename__ = "cart_versions"
+
+    user_id = db.Column(db.Integer, db.ForeignKey(User.id, ondelete="CASCADE"), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def get(cls, user_id: int) -> int:
+        """
+            Get the current version of a user's cart.
+
+            Args:
+                user_id (int): The id of the user who owns the cart.
+
+            Returns:
+                int: The version, 0 for a cart that was never changed.
+        """
+        return db.session.query(cls.version).filter_by(user_id=user_id).scalar() or 0
+
+    @classmethod
+    def bump(cls, user_id: int) -> None:
+        """Bump the version of a cart. Runs in, and is committed with, the caller's transaction."""
+        stmt = upsert(cls.__table__).values(user_id=user_id, version=1)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[cls.user_id], set_={"version": cls.__table__.c.version + 1}
+        ))
+
+    @classmethod
+    def bump_for_new_prices(cls, prices: List[dict[str, Any]]) -> None:
+        """
+            Bump the version of every cart holding a game whose price is about
+            to change. Runs in the caller's transaction, before the prices are updated.
+
+            Args:
+                prices (List[dict[str, Any]]): The "game_id" and "new_price" of each game.
+        """
+        carts = select(Games.user_id).where(Games.id == bindparam("game_id"), Games.price != bindparam("new_price"))
+        db.session.execute(
+            update(cls.__table__).where(cls.user_id.in_(carts)).values(version=cls.version + 1),
+            prices
+        )
+
 @dataclass
 class Games(db.Model):
     __tablename__ = "games"
+    # The price refresher looks games up by id across every cart. This index
+    # serves those updates and lets it find each game's oldest price without
+    # scanning the table.
+    __table_args__ = (db.Index("ix_games_id_price_updated_at", "id", "price_updated_at"),)
 
+    # (user_id, id) is the primary key, so every per-user query is an index range scan.
+    # Like price_updated_at, user_id is not a dataclass field and stays out of the API.
+    user_id = db.Column(db.Integer, db.ForeignKey(User.id, ondelete="CASCADE"), primary_key=True)
     id: int = db.Column(db.Integer, primary_key=True)
     name: str = db.Column(db.String(80), nullable=False)
     price: float = db.Column(db.Float, nullable=False)
+    # Not a dataclass field, so it is left out of the games returned by the API
+    price_updated_at = db.Column(db.Float, nullable=False, default=time.time)
 
     @classmethod
-    def create_game(cls, id: int, name: str, price: float) -> None:
+    def create_game(cls, user_id: int, id: int, name: str, price: float) -> None:
         """
-            Add a new game in the database.
+            Add a new game to a user's cart.
 
             Args:
+                user_id (int): The id of the user who owns the cart.
                 id (int): The id of the game.
                 name (str): The name of the game.
                 price (float): The price of the game.
@@ -32,9 +92,10 @@ class Games(db.Model):
                 IntegrityError: If there is a db error.
         """
 
-        new_game = cls(id=id, name=name, price=price)
+        new_game = cls(user_id=user_id, id=id, name=name, price=price)
         try: 
             db.session.add(new_game)
+            CartVersion.bump(user_id)
             db.session.commit()
             logger.info("Game successfully added to the database: %s", name)
         except Exception as e:
@@ -47,37 +108,267 @@ class Games(db.Model):
                 raise
 
     @classmethod
-    def delete_game(cls, game_id: int) -> None:
+    def create_games(cls, user_id: int, games: List[dict[str, Any]]) -> dict[int, str]:
+        """
+            Add several games to a user's cart in a single transaction.
+
+            Args:
+                user_id (int): The id of the user who owns the cart.
+                games (List[dict[str, Any]]): The games to add, each with an id,
+                    name, and price.
+
+            Returns:
+                dict[int, str]: The status of each game id, either "added" or
+                    "duplicate" if the game is already in the cart or was
+                    given more than once.
+
+            Raises:
+                ValueError: If a game was added concurrently by another request.
+        """
+        ids = [game["id"] for game in games]
+        existing = {
+            row[0] for row in db.session.query(cls.id).filter(cls.user_id == user_id, cls.id.in_(ids))
+        } if ids else set()
+
+        statuses = {}
+        new_games = []
+        for game in games:
+            if game["id"] in existing or game["id"] in statuses:
+                statuses.setdefault(game["id"], "duplicate")
+                continue
+            statuses[game["id"]] = "added"
+            new_games.append(cls(user_id=user_id, id=game["id"], name=game["name"], price=game["price"]))
+
+        try:
+            db.session.add_all(new_games)
+            if new_games:
+                CartVersion.bump(user_id)
+            db.session.commit()
+            logger.info("%d games successfully added to the database", len(new_games))
+        except Exception as e:
+            db.session.rollback()
+            if isinstance(e, IntegrityError):
+                logger.error("Integrity error while adding %d games", len(new_games))
+                raise ValueError("One or more games were added concurrently, try again")
+            else:
+                logger.error(f"Database error: {str(e)}")
+                raise
+
+        return statuses
+
+    @classmethod
+    def delete_game(cls, user_id: int, game_id: int) -> None:
         """
-            Delete a game from the database.
+            Delete a game from a user's cart.
 
             Args: 
+                user_id (int): The id of the user who owns the cart.
                 game_id (int): The id of the game to delete.
 
             Raises:
-                ValueError: If a game with that id is not in the database.
+                ValueError: If a game with that id is not in the cart.
         """
-        game = db.session.query(Games).filter_by(id=game_id).first()
+        game = db.session.get(Games, (user_id, game_id))
         if not game:
             logger.info(f"Game with id {game_id} not found")
             raise ValueError(f"Game with id {game_id} not found")
         db.session.delete(game)
+        CartVersion.bump(user_id)
         db.session.commit()
         logger.info(f"Game with id {game_id} deleted successfully")
     
     @classmethod
-    def get_all_games(cls) -> List[dict[str, Any]]:
+    def delete_games(cls, user_id: int, game_ids: List[int]) -> List[int]:
         """
-            Retrieves all games from the database.
+            Delete several games from a user's cart with a single statement.
+
+            Args:
+                user_id (int): The id of the user who owns the cart.
+                game_ids (List[int]): The ids of the games to delete.
 
             Returns:
-                List[dict[str, Any]]: A list of all of the games in the database.
+                List[int]: The ids of the games that were actually deleted.
+        """
+        if not game_ids:
+            return []
+        return cls._delete_where(user_id, cls.id.in_(game_ids))
 
+    @classmethod
+    def clear_cart(cls, user_id: int) -> List[int]:
         """
-        #small change to use db.session so can call in tests
-        games = db.session.query(cls).all()
+            Delete every game from a user's cart with a single statement.
 
-        logger.info("Games retrieved successfully")
-        logger.info(games)
+            Args:
+                user_id (int): The id of the user who owns the cart.
+
+            Returns:
+                List[int]: The ids of the games that were deleted.
+        """
+        return cls._delete_where(user_id)
+
+    @classmethod
+    def _delete_where(cls, user_id: int, *criteria: Any) -> List[int]:
+        """Run one set-based DELETE on a user's cart in its own transaction and return the deleted ids."""
+        try:
+            result = db.session.execute(delete(cls).where(cls.user_id == user_id, *criteria).returning(cls.id))
+            deleted = sorted(row[0] for row in result)
+            if deleted:
+                CartVersion.bump(user_id)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Database error: {str(e)}")
+            raise
+        logger.info("%d games deleted successfully", len(deleted))
+        return deleted
+
+    @classmethod
+    def _query_cart(cls, user_id: int) -> Any:
+        """
+            Query a cart's games ordered by id as plain rows of the API fields,
+            skipping ORM objects and their per-row dataclass copies.
+        """
+        return db.session.query(cls.id, cls.name, cls.price).filter(
+            cls.user_id == user_id
+        ).order_by(cls.id)
+
+    @classmethod
+    def get_all_games(cls, user_id: int) -> List[dict[str, Any]]:
+        """
+            Retrieves all games in a user's cart.
+
+            Args:
+                user_id (int): The id of the user who owns the cart.
+
+            Returns:
+                List[dict[str, Any]]: A list of all of the games in the cart.
+
+        """
+        games = cls._query_cart(user_id).all()
+
+        logger.info("%d games retrieved successfully", len(games))
+
+        return [game._asdict() for game in games]
+
+    @classmethod
+    def get_games_page(
+        cls, user_id: int, after_id: Optional[int] = None, limit: int = 100
+    ) -> tuple[List[dict[str, Any]], Optional[int]]:
+        """
+            Retrieves one page of a user's cart ordered by id, using the last id
+            of the previous page as the cursor.
+
+            Args:
+                user_id (int): The id of the user who owns the cart.
+                after_id (Optional[int]): Only games with a greater id are returned.
+                limit (int): The maximum number of games to return.
+
+            Returns:
+                tuple[List[dict[str, Any]], Optional[int]]: The games in the page
+                    and the cursor for the next page, or None on the last page.
+        """
+        query = cls._query_cart(user_id)
+        if after_id is not None:
+            query = query.filter(cls.id > after_id)
+        games = query.limit(limit + 1).all()
+
+        next_cursor = games[limit - 1].id if len(games) > limit else None
+
+        logger.info("%d games retrieved successfully", min(len(games), limit))
+
+        return [game._asdict() for game in games[:limit]], next_cursor
+
+    @classmethod
+    def iter_games(cls, user_id: int, batch_size: int = 500) -> Iterator[dict[str, Any]]:
+        """
+            Yields every game in a user's cart ordered by id, fetching batch_size
+            rows at a time from a server-side cursor so memory use stays flat.
+
+            Args:
+                user_id (int): The id of the user who owns the cart.
+                batch_size (int): The number of rows fetched per round trip.
+
+            Yields:
+                dict[str, Any]: One game at a time.
+        """
+        for game in cls._query_cart(user_id).yield_per(batch_size):
+            yield game._asdict()
+
+    @classmethod
+    def get_cart_summary(cls, user_id: int) -> dict[str, Any]:
+        """
+            Computes the number of games in a user's cart and their total price,
+            without loading any rows.
+
+            Args:
+                user_id (int): The id of the user who owns the cart.
+
+            Returns:
+                dict[str, Any]: The "count" of games and their total "price".
+        """
+        count, price = db.session.query(
+            func.count(cls.id), func.coalesce(func.sum(cls.price), 0.0)
+        ).filter(cls.user_id == user_id).one()
+
+        logger.info("Cart summary retrieved successfully")
+
+        return {"count": count, "price": price}
+
+    @classmethod
+    def get_stale_game_ids(cls, older_than: float, limit: int) -> List[int]:
+        """
+            Finds the games whose price was refreshed least recently, across
+            every cart. A game in several carts is returned once.
+
+            Args:
+                older_than (float): Only games refreshed before this unix time are returned.
+                limit (int): The maximum number of ids to return.
+
+            Returns:
+                List[int]: The ids of the games, the longest unrefreshed first.
+        """
+        oldest = func.min(cls.price_updated_at)
+        rows = db.session.query(cls.id).group_by(cls.id).having(oldest < older_than).order_by(oldest).limit(limit)
+        return [row[0] for row in rows]
+
+    @classmethod
+    def update_prices(cls, prices: dict[int, Optional[float]], now: Optional[float] = None) -> int:
+        """
+            Stores refreshed prices in every cart with one executemany UPDATE,
+            bumping the version of the carts whose prices changed.
+
+            Args:
+                prices (dict[int, Optional[float]]): The new price of each game
+                    id. None keeps the stored price but still marks it refreshed,
+                    for games cheapshark.com no longer knows.
+                now (Optional[float]): The time the prices were fetched. Defaults to now.
+
+            Returns:
+                int: The number of cart rows updated.
+        """
+        now = time.time() if now is None else now
+        changed = [{"game_id": id, "new_price": price} for id, price in prices.items() if price is not None]
+        unchanged = [{"game_id": id} for id, price in prices.items() if price is None]
+
+        count = 0
+        try:
+            if changed:
+                CartVersion.bump_for_new_prices(changed)
+                count += db.session.execute(
+                    update(cls.__table__).where(cls.id == bindparam("game_id"))
+                    .values(price=bindparam("new_price"), price_updated_at=now),
+                    changed
+                ).rowcount
+            if unchanged:
+                count += db.session.execute(
+                    update(cls.__table__).where(cls.id == bindparam("game_id")).values(price_updated_at=now),
+                    unchanged
+                ).rowcount
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Database error: {str(e)}")
+            raise
 
-        return [asdict(game) for game in games]
+        logger.info("Refreshed prices of %d games in %d cart rows", len(prices), count)
+        return count
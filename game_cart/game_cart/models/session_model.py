@@ -0,0 +1,87 @@
+import hashlib
+import logging
+import time
+from typing import Optional
+
+from game_cart.db import db
+from game_cart.models.user_model import User
+from game_cart.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+def _digest(token: str) -> str:
+    """Only a digest of each token is stored, so a leaked table cannot be replayed."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class SessionToken(db.Model):
+    """
+    Persistent storage for session tokens, used by TokenStore so tokens can be
+    resolved by every worker process and survive restarts.
+    """
+
+    __tablename__ = "session_tokens"
+
+    token_hash = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey(User.id, ondelete="CASCADE"), nullable=False, index=True)
+    username = db.Column(db.String(80), nullable=False)
+    expires_at = db.Column(db.Float, nullable=False, index=True)
+
+    @classmethod
+    def save(cls, token: str, user_id: int, username: str, expires_at: float) -> None:
+        """
+        Store a token and purge the expired ones.
+
+        Args:
+            token (str): The session token.
+            user_id (int): The id of the user the token was issued to.
+            username (str): The username of the user.
+            expires_at (float): When the token expires, as a unix timestamp.
+        """
+        try:
+            db.session.query(cls).filter(cls.expires_at <= time.time()).delete()
+            db.session.add(cls(token_hash=_digest(token), user_id=user_id, username=username, expires_at=expires_at))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Database error: %s", str(e))
+            raise
+
+    @classmethod
+    def load(cls, token: str) -> Optional[tuple[int, str, float]]:
+        """
+        Look up a token.
+
+        Args:
+            token (str): The session token.
+
+        Returns:
+            Optional[tuple[int, str, float]]: The user id, username and expiry
+                of the token, or None if it is unknown.
+        """
+        row = db.session.get(cls, _digest(token))
+        if row is None:
+            return None
+        return row.user_id, row.username, row.expires_at
+
+    @classmethod
+    def delete(cls, token: str) -> None:
+        """
+        Delete a token.
+
+        Args:
+            token (str): The session token.
+        """
+        db.session.query(cls).filter_by(token_hash=_digest(token)).delete()
+        db.session.commit()
+
+    @classmethod
+    def delete_for_user(cls, user_id: int) -> None:
+        """
+        Delete every token issued to a user.
+
+        Args:
+            user_id (int): The id of the user.
+        """
+        db.session.query(cls).filter_by(user_id=user_id).delete()
+        db.session.commit()
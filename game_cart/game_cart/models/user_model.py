@@ -1,8 +1,8 @@
-import hashlib
 import logging
 import os
 
 from sqlalchemy.exc import IntegrityError
+from game_cart.utils import password_hashing
 from game_cart.utils.logger import configure_logger
 
 from game_cart.db import db
@@ -18,22 +18,25 @@ class User(db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     salt = db.Column(db.String(32), nullable=False)
     password = db.Column(db.String(64), nullable=False)
+    # PBKDF2 work factor of the stored hash, NULL for legacy salted SHA-256 hashes
+    iterations = db.Column(db.Integer, nullable=True)
 
     @classmethod
-    def _generate_hashed_password(cls, password: str) -> tuple[str, str]:
+    def _generate_hashed_password(cls, password: str) -> tuple[str, str, int]:
         """
-        Generates a salted, hashed password.
+        Generates a salted, hashed password with the current work factor.
 
         Args:
             password (str): The password to hash.
 
         Returns: 
-            tuple: A tuple containing the salt and hashed password.
+            tuple: A tuple containing the salt, hashed password and work factor.
         """
 
         salt = os.urandom(16).hex()
-        hashed_password = hashlib.sha256((password + salt).encode()).hexdigest()
-        return salt, hashed_password
+        iterations = password_hashing.PASSWORD_HASH_ITERATIONS
+        hashed_password = password_hashing.hash_password(password, salt, iterations)
+        return salt, hashed_password, iterations
     
     @classmethod
     def create_user(cls, username: str, password: str) -> None:
@@ -47,8 +50,8 @@ class User(db.Model):
         Raises:
             ValueError: If a user with the username already exists.
         """
-        salt, hashed_password = cls._generate_hashed_password(password)
-        new_user = cls(username=username, salt=salt, password=hashed_password)
+        salt, hashed_password, iterations = cls._generate_hashed_password(password)
+        new_user = cls(username=username, salt=salt, password=hashed_password, iterations=iterations)
         try:
             db.session.add(new_user)
             db.session.commit()
@@ -62,10 +65,32 @@ class User(db.Model):
             logger.error("Database error: %s", str(e))
             raise
 
+    @classmethod
+    def get_id_by_username(cls, username: str) -> int:
+        """
+        Look up the id of a user.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            int: The id of the user.
+
+        Raises:
+            ValueError: If the user does not exist.
+        """
+        row = db.session.query(cls.id).filter_by(username=username).first()
+        if not row:
+            logger.info("User %s not found", username)
+            raise ValueError(f"User {username} not found")
+        return row[0]
+
     @classmethod
     def check_password(cls, username: str, password: str) -> bool:
         """
         Check if a given password matches the stored password for a user.
+        A correct password stored with an outdated work factor is rehashed
+        with the current one.
 
         Args:
             username (str): The username of the user.
@@ -81,8 +106,14 @@ class User(db.Model):
         if not user:
             logger.info("User %s not found", username)
             raise ValueError(f"User {username} not found")
-        hashed_password = hashlib.sha256((password + user.salt).encode()).hexdigest()
-        return hashed_password == user.password
+        if not password_hashing.verify_password(password, user.salt, user.iterations, user.password):
+            return False
+
+        if password_hashing.needs_rehash(user.iterations):
+            user.salt, user.password, user.iterations = cls._generate_hashed_password(password)
+            db.session.commit()
+            logger.info("Password rehashed with the current work factor for user: %s", username)
+        return True
     
     @classmethod
     def update_password(cls, username: str, new_passowrd: str) -> None:
@@ -101,8 +132,9 @@ class User(db.Model):
             logger.info("User %s not found", username)
             raise ValueError(f"User {username} not found")
         
-        salt, hashed_password = cls._generate_hashed_password(new_passowrd)
+        salt, hashed_password, iterations = cls._generate_hashed_password(new_passowrd)
         user.salt = salt
         user.password = hashed_password
+        user.iterations = iterations
         db.session.commit()
         logger.info("Password updated successfully for user: %s", username)
\ No newline at end of file
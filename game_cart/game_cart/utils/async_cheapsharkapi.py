@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import os
+from typing import Any, Callable, List, Optional
+
+import httpx
+
+from game_cart.utils import cheapsharkapi
+from game_cart.utils.cheapsharkapi import (
+    MAX_IDS_PER_REQUEST, MAX_NUM_GAMES, NOT_FOUND_STATUSES, _game_info_ttl, _last_known,
+    _parse_game_info, _parse_games, _parse_games_info, breaker, flight, game_info_cache, search_cache
+)
+from game_cart.utils.http_client import AsyncHttpClient
+from game_cart.utils.keywords import normalize_keyword
+from game_cart.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# The coroutines below mirror the functions of cheapsharkapi and share its
+# caches, circuit breaker and in-flight calls, so a result fetched by either
+# API is served to both.
+
+client = AsyncHttpClient.from_env("CHEAPSHARK", breaker=breaker)
+
+# Chunks of one get_games_info call in flight at once, so a single large
+# request cannot take over the connection pool
+MAX_CONCURRENT_CHUNKS = int(os.getenv("CHEAPSHARK_MAX_CONCURRENT_CHUNKS", "4"))
+
+async def search_for_games(keyword: str, limit: Optional[int] = MAX_NUM_GAMES) -> List[dict[str, Any]]:
+    """
+        Gets a maximum of ten games and their prices based off of a keyword
+        from cheapshark.com without blocking the event loop. Results are cached
+        per normalized keyword, concurrent searches for the same keyword share
+        one request, and the last known results are served if cheapshark.com
+        cannot be reached.
+
+        Args:
+            keyword (str): The search keyword.
+            limit (Optional[int]): The maximum number of games to return, or
+                None for every game cheapshark.com found.
+
+        Returns:
+            List[dict[str, Any]]: A list of games where each entry contains
+                the name of the game, the id, and the price.
+
+        Raises:
+            RuntimeError: If the request to cheapshark.com times out or causes any other exception.
+    """
+    normalized = normalize_keyword(keyword)
+    try:
+        games = await search_cache.get_or_load_async(normalized, lambda: flight.do_async(
+            ("search", normalized),
+            lambda: _fetch(f"{cheapsharkapi.base_url}games?title={normalized}", "search", _parse_games)
+        ))
+    except RuntimeError as e:
+        games = _last_known(search_cache, normalized, e)
+    return games if limit is None else games[:limit]
+
+async def get_game_info(gameID: int) -> dict[str, Any]:
+    """
+        Gets the price and name of the game corresponding to a given id
+        from cheapshark.com without blocking the event loop. Both found games
+        and unknown ids are cached, concurrent lookups of the same id share
+        one request, and the last known info is served if cheapshark.com
+        cannot be reached.
+
+        Args:
+            gameID (int): The id of the game whose info will be returned.
+
+        Returns:
+            dict[str, Any]: A dict containing the game id, name, and price or an
+                empty dict if a game does not exist with gameID
+
+        Raises:
+            RuntimeError: If the request to cheapshark.com times out or causes any other exceptions.
+    """
+    try:
+        return await game_info_cache.get_or_load_async(
+            gameID, lambda: flight.do_async(("game_info", gameID), lambda: _fetch(
+                f"{cheapsharkapi.base_url}games?id={gameID}", "game_info",
+                lambda data: _parse_game_info(gameID, data), on_error_status={}
+            )),
+            ttl_for=_game_info_ttl
+        )
+    except RuntimeError as e:
+        return _last_known(game_info_cache, gameID, e)
+
+async def get_games_info(gameIDs: List[int]) -> dict[int, dict[str, Any]]:
+    """
+        Gets the price and name of several games at once from cheapshark.com.
+        Cached ids are answered locally and the rest are looked up with the
+        multi-id endpoint, at most MAX_IDS_PER_REQUEST ids per request, with
+        up to MAX_CONCURRENT_CHUNKS requests in flight at the same time. If a
+        request fails, the last known info of its ids is served instead.
+
+        Args:
+            gameIDs (List[int]): The ids of the games whose info will be returned.
+
+        Returns:
+            dict[int, dict[str, Any]]: The info of each requested id, as returned
+                by get_game_info. Ids without a game map to an empty dict.
+
+        Raises:
+            RuntimeError: If a request to cheapshark.com times out or causes any other exceptions.
+    """
+    results = {}
+    missing = []
+    for gameID in dict.fromkeys(gameIDs):
+        info = game_info_cache.get(gameID)
+        if info is None:
+            missing.append(gameID)
+        else:
+            results[gameID] = info
+
+    chunks = [missing[start:start + MAX_IDS_PER_REQUEST] for start in range(0, len(missing), MAX_IDS_PER_REQUEST)]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+    async def fetch_chunk(chunk: List[int]) -> dict[int, dict[str, Any]]:
+        async with semaphore:
+            return await flight.do_async(("games_info", tuple(chunk)), lambda: _fetch(
+                f"{cheapsharkapi.base_url}games?ids={','.join(str(gameID) for gameID in chunk)}",
+                "games_info", lambda data: _parse_games_info(chunk, data)
+            ))
+
+    fetched = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks), return_exceptions=True)
+    for chunk, infos in zip(chunks, fetched):
+        if isinstance(infos, RuntimeError):
+            results.update({gameID: _last_known(game_info_cache, gameID, infos) for gameID in chunk})
+            continue
+        if isinstance(infos, BaseException):
+            raise infos
+        for gameID, info in infos.items():
+            game_info_cache.set(gameID, info, _game_info_ttl(info))
+            results[gameID] = info
+
+    return results
+
+async def _fetch(
+    url: str,
+    endpoint: str,
+    parse: Callable[[Any], Any],
+    on_error_status: Optional[Any] = None
+) -> Any:
+    """
+        Requests a cheapshark.com endpoint and parses its JSON payload,
+        bypassing the cache.
+
+        Args:
+            url (str): The url to request.
+            endpoint (str): The name of the endpoint, used to label metrics.
+            parse (Callable[[Any], Any]): Turns the payload into the result.
+            on_error_status (Optional[Any]): Returned when cheapshark.com answers
+                with one of NOT_FOUND_STATUSES. If None, or for any other error
+                status, the error is raised instead.
+
+        Returns:
+            Any: The parsed result.
+
+        Raises:
+            RuntimeError: If the request to cheapshark.com times out or causes any other exception.
+    """
+    try:
+        logger.info(f"Fetching {url}")
+        response = await client.get(url, endpoint=endpoint)
+
+        response.raise_for_status()
+
+        return parse(response.json())
+
+    except httpx.HTTPStatusError as e:
+        if on_error_status is None or e.response.status_code not in NOT_FOUND_STATUSES:
+            logger.error(f"Request to cheapshark.com failed: {str(e)}")
+            raise RuntimeError(f"Request to cheapshark.com failed: {str(e)}")
+        logger.warning(f"{url} answered with status {e.response.status_code}.")
+        return on_error_status
+
+    except httpx.TimeoutException:
+        logger.error("Request to cheapshark.com timed out.")
+        raise RuntimeError("Request to cheapshark.com timed out.")
+
+    except httpx.HTTPError as e:
+        logger.error(f"Request to cheapshark.com failed: {str(e)}")
+        raise RuntimeError(f"Request to cheapshark.com failed: {str(e)}")
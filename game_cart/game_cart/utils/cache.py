@@ -0,0 +1,274 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from game_cart.utils.event_loop import spawn
+from game_cart.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class TTLCache:
+    """
+        A thread-safe, bounded in-process cache with per-entry expiry and
+        least-recently-used eviction.
+
+        Entries that are past their ttl but still inside the stale window are
+        served immediately by get_or_load and get_or_load_async while a single
+        background refresh replaces them. Expired entries are kept (until
+        evicted) so that peek can still return the last known value.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 300.0,
+        stale_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+            Args:
+                max_entries (int): The maximum number of entries to keep.
+                ttl (float): Default number of seconds an entry is fresh for.
+                stale_ttl (float): Number of seconds after expiry an entry can
+                    still be served while it is refreshed in the background.
+                clock (Callable[[], float]): Source of the current time.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._refreshing: set[Hashable] = set()
+        # Keeps the background refreshes of get_or_load_async from being garbage collected
+        self._tasks: set[Any] = set()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Store an entry and evict the least recently used ones. Caller holds the lock."""
+        self._entries[key] = (value, self._clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+            Add or replace an entry in the cache.
+
+            Args:
+                key (Hashable): The cache key.
+                value (Any): The value to cache.
+                ttl (Optional[float]): Seconds the entry is fresh for. Defaults
+                    to the cache ttl.
+        """
+        with self._lock:
+            self._store(key, value, self.ttl if ttl is None else ttl)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+            Returns the value for a key if it is still fresh.
+
+            Args:
+                key (Hashable): The cache key.
+                default (Any): Returned when the key is missing or expired.
+
+            Returns:
+                Any: The cached value or default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() < entry[1]:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+            Returns the last known value for a key, even if it has expired.
+            Does not touch the counters or the LRU order.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        return default if entry is None else entry[0]
+
+    def can_serve(self, key: Hashable) -> bool:
+        """
+            Whether get_or_load would answer a key from the cache, fresh or
+            stale, without calling its loader. Does not touch the counters or
+            the LRU order.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry is not None and self._clock() < entry[1] + self.stale_ttl
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove a single entry from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._refreshing.clear()
+            self.hits = self.misses = self.stale_hits = self.evictions = 0
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl_for: Optional[Callable[[Any], float]] = None
+    ) -> Any:
+        """
+            Returns the cached value for a key, calling loader on a miss.
+
+            A fresh entry is returned as is. An expired entry inside the stale
+            window is returned immediately and one background thread reloads it.
+            Anything else is loaded on the calling thread. Exceptions raised by
+            the loader are not cached.
+
+            Args:
+                key (Hashable): The cache key.
+                loader (Callable[[], Any]): Produces the value for the key.
+                ttl_for (Optional[Callable[[Any], float]]): Picks the ttl for a
+                    loaded value. Defaults to the cache ttl.
+
+            Returns:
+                Any: The cached or freshly loaded value.
+        """
+        found, value, refresh = self._lookup(key)
+        if found:
+            if refresh:
+                threading.Thread(
+                    target=self._refresh, args=(key, loader, ttl_for), daemon=True
+                ).start()
+            return value
+
+        value = loader()
+        self.set(key, value, ttl_for(value) if ttl_for else None)
+        return value
+
+    async def get_or_load_async(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_for: Optional[Callable[[Any], float]] = None
+    ) -> Any:
+        """
+            The coroutine counterpart of get_or_load, for loaders that are
+            coroutines. A stale entry is reloaded by one task, spawned on an
+            event loop that outlives the call, instead of a background thread.
+
+            Args:
+                key (Hashable): The cache key.
+                loader (Callable[[], Awaitable[Any]]): Produces the value for the key.
+                ttl_for (Optional[Callable[[Any], float]]): Picks the ttl for a
+                    loaded value. Defaults to the cache ttl.
+
+            Returns:
+                Any: The cached or freshly loaded value.
+        """
+        found, value, refresh = self._lookup(key)
+        if found:
+            if refresh:
+                task = spawn(self._refresh_async(key, loader, ttl_for))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return value
+
+        value = await loader()
+        self.set(key, value, ttl_for(value) if ttl_for else None)
+        return value
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any, bool]:
+        """
+            Finds the entry get_or_load can serve for a key and updates the counters.
+
+            Returns:
+                tuple[bool, Any, bool]: Whether a fresh or stale entry was
+                    found, its value, and whether the caller must start the
+                    one background refresh of a stale entry.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value, False
+                if now < expires_at + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    refresh = key not in self._refreshing
+                    self._refreshing.add(key)
+                    return True, value, refresh
+            self.misses += 1
+            return False, None, False
+
+    def _refresh(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl_for: Optional[Callable[[Any], float]]
+    ) -> None:
+        """Reload a stale entry in the background, keeping the old value on failure."""
+        try:
+            value = loader()
+            self.set(key, value, ttl_for(value) if ttl_for else None)
+        except Exception as e:
+            logger.warning("Background refresh of %r failed: %s", key, str(e))
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def _refresh_async(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_for: Optional[Callable[[Any], float]]
+    ) -> None:
+        """Reload a stale entry on the event loop, keeping the old value on failure."""
+        try:
+            value = await loader()
+            self.set(key, value, ttl_for(value) if ttl_for else None)
+        except Exception as e:
+            logger.warning("Background refresh of %r failed: %s", key, str(e))
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self) -> dict[str, Any]:
+        """
+            Returns the cache counters.
+
+            Returns:
+                dict[str, Any]: Sizes and hit, stale hit, miss and eviction counts.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
@@ -1,18 +1,145 @@
 import logging
+import os
 import requests
-from typing import List, Any
+from typing import List, Any, Optional
 
+from game_cart.utils.cache import TTLCache
+from game_cart.utils.circuit_breaker import CircuitBreaker
+from game_cart.utils.http_client import HttpClient
+from game_cart.utils.keywords import normalize_keyword
 from game_cart.utils.logger import configure_logger
+from game_cart.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
-base_url = "https://www.cheapshark.com/api/1.0/"
+# Can point at a stand-in such as loadtest/fake_cheapshark.py
+base_url = os.getenv("CHEAPSHARK_BASE_URL", "https://www.cheapshark.com/api/1.0/").rstrip("/") + "/"
 
-def search_for_games(keyword: str) -> List[dict[str, Any]]:
+# Shared with async_cheapsharkapi, so both clients see the same upstream health
+# and identical calls from either one are coalesced
+breaker = CircuitBreaker.from_env("CHEAPSHARK")
+
+flight = SingleFlight("cheapshark")
+
+client = HttpClient.from_env("CHEAPSHARK", breaker=breaker)
+
+search_cache = TTLCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1024")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "300")),
+    stale_ttl=float(os.getenv("SEARCH_CACHE_STALE_TTL", "600"))
+)
+
+GAME_INFO_TTL = float(os.getenv("GAME_INFO_CACHE_TTL", "900"))
+GAME_INFO_NOT_FOUND_TTL = float(os.getenv("GAME_INFO_CACHE_NOT_FOUND_TTL", "120"))
+
+game_info_cache = TTLCache(
+    max_entries=int(os.getenv("GAME_INFO_CACHE_MAX_ENTRIES", "4096")),
+    ttl=GAME_INFO_TTL
+)
+
+MAX_IDS_PER_REQUEST = 25
+
+# Statuses that mean an id has no game. Any other error status, such as a 429
+# once the retries run out, is a failure that is raised and never cached.
+NOT_FOUND_STATUSES = (400, 404)
+
+MAX_NUM_GAMES = 10
+
+def _game_info_ttl(info: dict[str, Any]) -> float:
+    """Found games and unknown ids are cached for different amounts of time."""
+    return GAME_INFO_TTL if info else GAME_INFO_NOT_FOUND_TTL
+
+def _last_known(cache: TTLCache, key: Any, error: RuntimeError) -> Any:
+    """Fall back to the last value cached for a key when cheapshark.com cannot be reached."""
+    value = cache.peek(key)
+    if value is None:
+        raise error
+    logger.warning(f"Serving last known data for {key!r}: {str(error)}")
+    return value
+
+def _parse_games(data: List[dict[str, Any]]) -> List[dict[str, Any]]:
+    """Turn a games?title= payload into a list of games."""
+    games = []
+    for game in data:
+        games.append({
+            "name": game["external"],
+            "id": game["gameID"],
+            "price": game["cheapest"]
+        })
+
+    return games
+
+def _parse_game_info(gameID: int, data: dict[str, Any]) -> dict[str, Any]:
+    """Turn a games?id= payload into the game's info, or {} if there is no such game."""
+    if not data:
+        logger.warning(f"The id {gameID} does not have a corresponding game.")
+        return {}
+
+    return {
+        "name": data["info"]["title"],
+        "id": gameID,
+        "price": data["cheapestPriceEver"]["price"]
+    }
+
+def _parse_games_info(gameIDs: List[int], data: dict[str, Any]) -> dict[int, dict[str, Any]]:
+    """Turn a games?ids= payload into the info of each requested id, {} for unknown ids."""
+    data = data or {}
+    return {gameID: _parse_game_info(gameID, data.get(str(gameID))) for gameID in gameIDs}
+
+def _parse_current_prices(gameIDs: List[int], data: dict[str, Any]) -> dict[int, dict[str, Any]]:
+    """
+        Turn a games?ids= payload into the info of each requested id, priced
+        at its lowest current deal rather than its all-time low. Unknown ids
+        and games without a current deal map to {}.
+    """
+    data = data or {}
+    infos = {}
+    for gameID in gameIDs:
+        game = data.get(str(gameID))
+        deals = game.get("deals") if game else None
+        if not deals:
+            infos[gameID] = {}
+            continue
+        infos[gameID] = {
+            "name": game["info"]["title"],
+            "id": gameID,
+            "price": min((deal["price"] for deal in deals), key=float)
+        }
+    return infos
+
+def search_for_games(keyword: str, limit: Optional[int] = MAX_NUM_GAMES) -> List[dict[str, Any]]:
     """
         Gets a maximum of ten games and their prices based off of a keyword
-        from cheapshark.com.
+        from cheapshark.com. Results are cached per normalized keyword,
+        concurrent searches for the same keyword share one request, and the
+        last known results are served if cheapshark.com cannot be reached.
+
+        Args:
+            keyword (str): The search keyword.       
+            limit (Optional[int]): The maximum number of games to return, or
+                None for every game cheapshark.com found.
+
+        Returns:
+            List[dict[str, Any]]: A list of games where each entry contains
+                the name of the game, the id, and the price.
+
+        Raises:
+            RuntimeError: If the request to cheapshark.com times out or causes any other exception.
+    """
+    normalized = normalize_keyword(keyword)
+    try:
+        games = search_cache.get_or_load(
+            normalized, lambda: flight.do(("search", normalized), lambda: _fetch_games(normalized))
+        )
+    except RuntimeError as e:
+        games = _last_known(search_cache, normalized, e)
+    return games if limit is None else games[:limit]
+
+def _fetch_games(keyword: str) -> List[dict[str, Any]]:
+    """
+        Fetches every game and its price found by cheapshark.com for a
+        keyword, bypassing the cache.
 
         Args:
             keyword (str): The search keyword.       
@@ -28,24 +155,11 @@ def search_for_games(keyword: str) -> List[dict[str, Any]]:
 
     try:
         logger.info(f"Fetching games with keyword {keyword}")
-        response = requests.get(url, timeout=5)
+        response = client.get(url, endpoint="search")
 
         response.raise_for_status()
 
-        data = response.json()
-
-        games = []
-        for game in data:
-            games.append({
-                "name": game["external"],
-                "id": game["gameID"],
-                "price": game["cheapest"]
-            })
-        
-        MAX_NUM_GAMES = 10
-
-        return games[:MAX_NUM_GAMES]
-
+        return _parse_games(response.json())
 
     except requests.exceptions.Timeout:
         logger.error("Request to cheapshark.com timed out.")
@@ -58,7 +172,32 @@ def search_for_games(keyword: str) -> List[dict[str, Any]]:
 def get_game_info(gameID: int) -> dict[str, Any]:
     """
         Gets the price and name of the game corresponding to a given id
-        from cheapshark.com
+        from cheapshark.com. Both found games and unknown ids are cached,
+        concurrent lookups of the same id share one request, and the last
+        known info is served if cheapshark.com cannot be reached.
+
+        Args:
+            gameID (int): The id of the game whose info will be returned.
+
+        Returns:
+            dict[str, Any]: A dict containing the game id, name, and price or an 
+                empty dict if a game does not exist with gameID
+
+        Raises:
+            RuntimeError: If the request to cheapshark.com times out or causes any other exceptions.
+    """
+    try:
+        return game_info_cache.get_or_load(
+            gameID, lambda: flight.do(("game_info", gameID), lambda: _fetch_game_info(gameID)),
+            ttl_for=_game_info_ttl
+        )
+    except RuntimeError as e:
+        return _last_known(game_info_cache, gameID, e)
+
+def _fetch_game_info(gameID: int) -> dict[str, Any]:
+    """
+        Fetches the price and name of the game corresponding to a given id
+        from cheapshark.com, bypassing the cache.
 
         Args:
             gameID (int): The id of the game whose info will be returned.
@@ -74,18 +213,16 @@ def get_game_info(gameID: int) -> dict[str, Any]:
 
     try:
         logger.info(f"Fetching game info for game with id: {gameID}.")
-        response = requests.get(url, timeout=5)
+        response = client.get(url, endpoint="game_info")
 
         response.raise_for_status()
 
-        data = response.json()
+        return _parse_game_info(gameID, response.json())
 
-        return {
-            "name": data["info"]["title"],
-            "id": gameID,
-            "price": data["cheapestPriceEver"]["price"]
-        }
-    except requests.exceptions.HTTPError:
+    except requests.exceptions.HTTPError as e:
+        if e.response is None or e.response.status_code not in NOT_FOUND_STATUSES:
+            logger.error(f"Request to cheapshark.com failed: {str(e)}")
+            raise RuntimeError(f"Request to cheapshark.com failed: {str(e)}")
         logger.warning(f"The id {gameID} does not have a corresponding game.")   
         return {}
 
@@ -97,3 +234,117 @@ def get_game_info(gameID: int) -> dict[str, Any]:
         logger.error(f"Request to cheapshark.com failed: {str(e)}")
         raise RuntimeError(f"Request to cheapshark.com failed: {str(e)}")
 
+
+def get_games_info(gameIDs: List[int]) -> dict[int, dict[str, Any]]:
+    """
+        Gets the price and name of several games at once from cheapshark.com.
+        Cached ids are answered locally and the rest are looked up with the
+        multi-id endpoint, at most MAX_IDS_PER_REQUEST ids per request. If a
+        request fails, the last known info of its ids is served instead.
+
+        Args:
+            gameIDs (List[int]): The ids of the games whose info will be returned.
+
+        Returns:
+            dict[int, dict[str, Any]]: The info of each requested id, as returned
+                by get_game_info. Ids without a game map to an empty dict.
+
+        Raises:
+            RuntimeError: If a request to cheapshark.com times out or causes any other exceptions.
+    """
+    results = {}
+    missing = []
+    for gameID in dict.fromkeys(gameIDs):
+        info = game_info_cache.get(gameID)
+        if info is None:
+            missing.append(gameID)
+        else:
+            results[gameID] = info
+
+    for start in range(0, len(missing), MAX_IDS_PER_REQUEST):
+        chunk = missing[start:start + MAX_IDS_PER_REQUEST]
+        try:
+            infos = flight.do(("games_info", tuple(chunk)), lambda: _fetch_games_info(chunk))
+        except RuntimeError as e:
+            results.update({gameID: _last_known(game_info_cache, gameID, e) for gameID in chunk})
+            continue
+        for gameID, info in infos.items():
+            game_info_cache.set(gameID, info, _game_info_ttl(info))
+            results[gameID] = info
+
+    return results
+
+def refresh_games_info(gameIDs: List[int]) -> dict[int, dict[str, Any]]:
+    """
+        Fetches the current price and name of up to MAX_IDS_PER_REQUEST games
+        with a single request, ignoring and then replacing their cached info.
+        Unlike get_games_info, last known info is never served.
+
+        The price returned is the lowest current deal, which is what a cart
+        should show, while the cached info keeps the all-time low that
+        get_game_info reports.
+
+        Args:
+            gameIDs (List[int]): The ids of the games whose info will be returned.
+
+        Returns:
+            dict[int, dict[str, Any]]: The info of each requested id, priced at
+                its lowest current deal. Ids without a game or without a
+                current deal map to an empty dict.
+
+        Raises:
+            RuntimeError: If the request to cheapshark.com times out or causes any other exceptions.
+    """
+    data = flight.do(("games_payload", tuple(gameIDs)), lambda: _fetch_games_payload(gameIDs))
+    for gameID, info in _parse_games_info(gameIDs, data).items():
+        game_info_cache.set(gameID, info, _game_info_ttl(info))
+    return _parse_current_prices(gameIDs, data)
+
+def _fetch_games_info(gameIDs: List[int]) -> dict[int, dict[str, Any]]:
+    """
+        Fetches the price and name of up to MAX_IDS_PER_REQUEST games with a
+        single request to cheapshark.com, bypassing the cache.
+
+        Args:
+            gameIDs (List[int]): The ids of the games whose info will be returned.
+
+        Returns:
+            dict[int, dict[str, Any]]: The info of each requested id. Ids without
+                a game map to an empty dict.
+
+        Raises:
+            RuntimeError: If the request to cheapshark.com times out or causes any other exceptions.
+    """
+    return _parse_games_info(gameIDs, _fetch_games_payload(gameIDs))
+
+def _fetch_games_payload(gameIDs: List[int]) -> dict[str, Any]:
+    """
+        Fetches the games?ids= payload of up to MAX_IDS_PER_REQUEST games from
+        cheapshark.com, bypassing the cache.
+
+        Args:
+            gameIDs (List[int]): The ids of the games to look up.
+
+        Returns:
+            dict[str, Any]: The payload, keyed by game id.
+
+        Raises:
+            RuntimeError: If the request to cheapshark.com times out or causes any other exceptions.
+    """
+    url = f"{base_url}games?ids={','.join(str(gameID) for gameID in gameIDs)}"
+
+    try:
+        logger.info(f"Fetching game info for {len(gameIDs)} games.")
+        response = client.get(url, endpoint="games_info")
+
+        response.raise_for_status()
+
+        return response.json()
+
+    except requests.exceptions.Timeout:
+        logger.error("Request to cheapshark.com timed out.")
+        raise RuntimeError("Request to cheapshark.com timed out.")
+    
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Request to cheapshark.com failed: {str(e)}")
+        raise RuntimeError(f"Request to cheapshark.com failed: {str(e)}")
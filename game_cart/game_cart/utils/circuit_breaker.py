@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from game_cart.utils.logger import configure_logger
+from game_cart.utils.metrics import observe_circuit_state, observe_short_circuit
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+        A thread-safe circuit breaker over the most recent calls to an upstream.
+
+        While closed, every call goes through. Once at least min_calls of the
+        last `window` calls have been recorded and the share of failed calls
+        reaches failure_rate, or the share of calls slower than slow_seconds
+        reaches slow_rate, the circuit opens and calls fail fast for
+        open_seconds. It then half-opens and lets one trial call through:
+        success closes the circuit and failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str = "upstream",
+        window: int = 20,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        slow_seconds: float = 2.0,
+        slow_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+            Args:
+                name (str): The name of the upstream, used to label metrics.
+                window (int): How many of the most recent calls are considered.
+                min_calls (int): How many calls must be recorded before the circuit can open.
+                failure_rate (float): The share of failed calls that opens the circuit.
+                slow_seconds (float): Calls taking at least this long count as slow.
+                slow_rate (float): The share of slow calls that opens the circuit.
+                open_seconds (float): How long the circuit stays open before a trial call.
+                clock (Callable[[], float]): Source of the current time.
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._calls: deque[tuple[bool, bool]] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+        self._lock = threading.Lock()
+        observe_circuit_state(self.name, self._state)
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "CircuitBreaker":
+        """
+            Builds a breaker from environment variables such as
+            <prefix>_BREAKER_WINDOW, <prefix>_BREAKER_MIN_CALLS,
+            <prefix>_BREAKER_FAILURE_RATE, <prefix>_BREAKER_SLOW_SECONDS,
+            <prefix>_BREAKER_SLOW_RATE and <prefix>_BREAKER_OPEN_SECONDS.
+
+            Args:
+                prefix (str): The prefix of the environment variables.
+
+            Returns:
+                CircuitBreaker: The configured breaker.
+        """
+        return cls(
+            name=prefix.lower(),
+            window=int(os.getenv(f"{prefix}_BREAKER_WINDOW", "20")),
+            min_calls=int(os.getenv(f"{prefix}_BREAKER_MIN_CALLS", "10")),
+            failure_rate=float(os.getenv(f"{prefix}_BREAKER_FAILURE_RATE", "0.5")),
+            slow_seconds=float(os.getenv(f"{prefix}_BREAKER_SLOW_SECONDS", "2")),
+            slow_rate=float(os.getenv(f"{prefix}_BREAKER_SLOW_RATE", "0.8")),
+            open_seconds=float(os.getenv(f"{prefix}_BREAKER_OPEN_SECONDS", "30"))
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _set_state(self, state: str) -> None:
+        """Caller holds the lock."""
+        if state != self._state:
+            logger.warning("Circuit for %s is now %s", self.name, state)
+            self._state = state
+            observe_circuit_state(self.name, state)
+
+    def before_call(self) -> None:
+        """
+            Checks that a call may be made.
+
+            Raises:
+                CircuitOpenError: If the circuit is open, or half-open with its
+                    trial call already in flight.
+        """
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                self._set_state(HALF_OPEN)
+                self._trial_in_flight = False
+
+            if self._state == CLOSED:
+                return
+            # A trial that never reported back is given up on after open_seconds
+            now = self._clock()
+            if self._state == HALF_OPEN and (not self._trial_in_flight or now - self._trial_started >= self.open_seconds):
+                self._trial_in_flight = True
+                self._trial_started = now
+                return
+
+        observe_short_circuit(self.name)
+        raise CircuitOpenError(f"{self.name} is unavailable, not retrying for up to {self.open_seconds:g} seconds.")
+
+    def record(self, success: bool, seconds: float) -> None:
+        """
+            Records the outcome of a call.
+
+            Args:
+                success (bool): Whether the upstream answered without a server error.
+                seconds (float): How long the call took.
+        """
+        slow = seconds >= self.slow_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial_in_flight = False
+                if success and not slow:
+                    self._calls.clear()
+                    self._set_state(CLOSED)
+                else:
+                    self._open()
+                return
+
+            if self._state == OPEN:
+                return
+
+            self._calls.append((not success, slow))
+            if len(self._calls) < self.min_calls:
+                return
+
+            failures = sum(1 for failed, _ in self._calls if failed)
+            slow_calls = sum(1 for _, was_slow in self._calls if was_slow)
+            if failures >= self.failure_rate * len(self._calls) or slow_calls >= self.slow_rate * len(self._calls):
+                logger.warning(
+                    "Opening circuit for %s: %d failed and %d slow of the last %d calls",
+                    self.name, failures, slow_calls, len(self._calls)
+                )
+                self._open()
+
+    def reset(self) -> None:
+        """Close the circuit and forget every recorded call."""
+        with self._lock:
+            self._calls.clear()
+            self._trial_in_flight = False
+            self._set_state(CLOSED)
+
+    def _open(self) -> None:
+        """Caller holds the lock."""
+        self._opened_at = self._clock()
+        self._calls.clear()
+        self._set_state(OPEN)
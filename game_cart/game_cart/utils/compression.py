@@ -0,0 +1,80 @@
+import gzip
+import logging
+import os
+from typing import List, Optional
+
+import brotli
+from werkzeug.http import parse_accept_header
+
+from game_cart.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+# Comma separated encodings in order of preference, for example "br,gzip". Empty disables compression.
+COMPRESSION_ENCODINGS = [
+    encoding.strip() for encoding in os.getenv("RESPONSE_COMPRESSION", "").split(",") if encoding.strip()
+]
+for encoding in COMPRESSION_ENCODINGS:
+    if encoding not in SUPPORTED_ENCODINGS:
+        logger.warning("Ignoring unsupported response compression %s", encoding)
+COMPRESSION_ENCODINGS = [encoding for encoding in COMPRESSION_ENCODINGS if encoding in SUPPORTED_ENCODINGS]
+
+# Smaller bodies fit in a packet or two already, so compressing them costs more CPU than it saves
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Fast settings for bodies built per request: game lists compress to within a
+# few percent of the maximum ratio at a fraction of the CPU time
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+
+def choose_encoding(accept_encoding: str, encodings: Optional[List[str]] = None) -> Optional[str]:
+    """
+        Picks the preferred enabled encoding that the client accepts.
+
+        Args:
+            accept_encoding (str): The request's Accept-Encoding header.
+            encodings (Optional[List[str]]): The enabled encodings in order of
+                preference. Defaults to COMPRESSION_ENCODINGS.
+
+        Returns:
+            Optional[str]: The encoding to use, or None to send the body as is.
+    """
+    accepted = parse_accept_header(accept_encoding)
+    for encoding in COMPRESSION_ENCODINGS if encodings is None else encodings:
+        if accepted[encoding] > 0:
+            return encoding
+    return None
+
+
+def compress(
+    body: bytes, accept_encoding: str, encodings: Optional[List[str]] = None, min_size: Optional[int] = None
+) -> tuple[bytes, Optional[str]]:
+    """
+        Compresses a response body if it is large enough and the client
+        accepts one of the enabled encodings.
+
+        Args:
+            body (bytes): The response body.
+            accept_encoding (str): The request's Accept-Encoding header.
+            encodings (Optional[List[str]]): The enabled encodings in order of
+                preference. Defaults to COMPRESSION_ENCODINGS.
+            min_size (Optional[int]): Smaller bodies are not compressed.
+                Defaults to COMPRESSION_MIN_SIZE.
+
+        Returns:
+            tuple[bytes, Optional[str]]: The body to send and its Content-Encoding,
+                or the original body and None.
+    """
+    if len(body) < (COMPRESSION_MIN_SIZE if min_size is None else min_size):
+        return body, None
+
+    encoding = choose_encoding(accept_encoding, encodings)
+    if encoding == "br":
+        return brotli.compress(body, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY), encoding
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), encoding
+    return body, None
@@ -0,0 +1,74 @@
+import asyncio
+import functools
+import threading
+from typing import Any, Callable, Coroutine, Optional
+
+_local = threading.local()
+
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_lock = threading.Lock()
+
+
+def get_thread_loop() -> asyncio.AbstractEventLoop:
+    """Returns the event loop owned by the calling thread, creating it on first use."""
+    loop = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _local.loop = loop
+    return loop
+
+
+def run_on_thread_loop(func: Callable[..., Coroutine[Any, Any, Any]]) -> Callable[..., Any]:
+    """
+        Makes a coroutine function callable from synchronous code by running it
+        on the calling thread's own event loop.
+
+        Unlike asgiref's async_to_sync, which starts a new loop for every call,
+        the loop outlives the call, so the connections pooled by the async
+        HTTP clients are reused by the next request the thread serves.
+
+        Args:
+            func (Callable[..., Coroutine[Any, Any, Any]]): The coroutine function.
+
+        Returns:
+            Callable[..., Any]: A function that runs it and returns its result.
+    """
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return get_thread_loop().run_until_complete(func(*args, **kwargs))
+
+    return wrapper
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Returns an event loop that runs forever on a daemon thread, starting it on first use."""
+    global _background_loop
+    with _background_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(target=_background_loop.run_forever, name="background-loop", daemon=True).start()
+        return _background_loop
+
+
+def spawn(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+        Starts a coroutine that may outlive its caller, such as a background
+        cache refresh.
+
+        A thread's own loop from run_on_thread_loop stops as soon as the call
+        it runs returns, which would leave a task started on it pending
+        forever. Coroutines spawned from such a loop therefore run on the
+        background loop instead. On any other loop, such as the one of an ASGI
+        server, they become a task of that loop.
+
+        Args:
+            coro (Coroutine[Any, Any, Any]): The coroutine to run.
+
+        Returns:
+            Any: The asyncio.Task or concurrent.futures.Future of the run.
+                Keep a reference to it until it is done.
+    """
+    loop = asyncio.get_running_loop()
+    if loop is getattr(_local, "loop", None):
+        return asyncio.run_coroutine_threadsafe(coro, get_background_loop())
+    return loop.create_task(coro)
@@ -0,0 +1,303 @@
+import asyncio
+import logging
+import os
+import random
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from game_cart.utils.circuit_breaker import CircuitBreaker
+from game_cart.utils.logger import configure_logger
+from game_cart.utils.metrics import observe_upstream, observe_upstream_retry
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def backoff_delay(attempt: int, base: float, maximum: float, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header."""
+    if retry_after is not None and retry_after.isdigit():
+        return min(float(retry_after), maximum)
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+def _record_call(breaker: Optional[CircuitBreaker], status_code: Optional[int], seconds: float) -> None:
+    """Report an attempt to the circuit breaker. Server errors, 429s and failed requests count as failures."""
+    if breaker is not None:
+        breaker.record(status_code is not None and status_code < 500 and status_code != 429, seconds)
+
+
+class HttpClient:
+    """
+        A shared HTTP client that keeps connections alive in a sized pool and
+        retries idempotent GET requests with jittered exponential backoff.
+        Every attempt's latency, status, payload size and retries are recorded
+        as metrics under the client's name.
+
+        Requests are retried on connection errors (including connect timeouts)
+        and on 429/5xx responses. Read timeouts are not retried so a slow
+        upstream is not hit again while the caller is already waiting.
+
+        With a circuit breaker, every attempt is reported to it, and no
+        attempt is made while the circuit is open.
+    """
+
+    def __init__(
+        self,
+        name: str = "upstream",
+        pool_size: int = 10,
+        connect_timeout: float = 2.0,
+        read_timeout: float = 5.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.1,
+        backoff_max: float = 2.0,
+        sleep: Callable[[float], None] = time.sleep,
+        breaker: Optional[CircuitBreaker] = None
+    ) -> None:
+        """
+            Args:
+                name (str): The name of the upstream, used to label metrics.
+                pool_size (int): The maximum number of kept-alive connections per host.
+                connect_timeout (float): Seconds to wait for a connection.
+                read_timeout (float): Seconds to wait for the response.
+                max_retries (int): How many times a request is retried.
+                backoff_base (float): The backoff before the first retry, in seconds.
+                backoff_max (float): The upper bound of a single backoff, in seconds.
+                sleep (Callable[[float], None]): Used to wait between retries.
+                breaker (Optional[CircuitBreaker]): Fails calls fast while the
+                    upstream is unhealthy.
+        """
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self.breaker = breaker
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def from_env(cls, prefix: str, breaker: Optional[CircuitBreaker] = None) -> "HttpClient":
+        """
+            Builds a client from environment variables such as <prefix>_POOL_SIZE,
+            <prefix>_CONNECT_TIMEOUT, <prefix>_READ_TIMEOUT, <prefix>_MAX_RETRIES,
+            <prefix>_BACKOFF_BASE and <prefix>_BACKOFF_MAX.
+
+            Args:
+                prefix (str): The prefix of the environment variables.
+                breaker (Optional[CircuitBreaker]): The circuit breaker of the upstream.
+
+            Returns:
+                HttpClient: The configured client.
+        """
+        return cls(
+            name=prefix.lower(),
+            pool_size=int(os.getenv(f"{prefix}_POOL_SIZE", "10")),
+            connect_timeout=float(os.getenv(f"{prefix}_CONNECT_TIMEOUT", "2")),
+            read_timeout=float(os.getenv(f"{prefix}_READ_TIMEOUT", "5")),
+            max_retries=int(os.getenv(f"{prefix}_MAX_RETRIES", "2")),
+            backoff_base=float(os.getenv(f"{prefix}_BACKOFF_BASE", "0.1")),
+            backoff_max=float(os.getenv(f"{prefix}_BACKOFF_MAX", "2")),
+            breaker=breaker
+        )
+
+    def get(self, url: str, endpoint: str = "other", **kwargs: Any) -> requests.Response:
+        """
+            Sends a GET request over the pooled session, retrying transient failures.
+
+            Args:
+                url (str): The url to request.
+                endpoint (str): The name of the endpoint, used to label metrics.
+                **kwargs: Passed through to requests.Session.get.
+
+            Returns:
+                requests.Response: The last response received.
+
+            Raises:
+                requests.exceptions.RequestException: If the request fails and
+                    cannot be retried or runs out of retries.
+                CircuitOpenError: If the upstream's circuit is open.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            retry_after = None
+            if self.breaker is not None:
+                self.breaker.before_call()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                status = "timeout" if isinstance(e, requests.exceptions.Timeout) else "error"
+                observe_upstream(self.name, endpoint, status, time.perf_counter() - start)
+                _record_call(self.breaker, None, time.perf_counter() - start)
+                if not isinstance(e, requests.exceptions.ConnectionError) or attempt >= self.max_retries:
+                    raise
+                logger.warning("Connection to %s failed, retrying: %s", url, str(e))
+            else:
+                observe_upstream(
+                    self.name, endpoint, str(response.status_code),
+                    time.perf_counter() - start, len(response.content)
+                )
+                _record_call(self.breaker, response.status_code, time.perf_counter() - start)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                logger.warning("Got status %d from %s, retrying", response.status_code, url)
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+
+            observe_upstream_retry(self.name, endpoint)
+            self._sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after))
+            attempt += 1
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        self.session.close()
+
+
+class AsyncHttpClient:
+    """
+        The asyncio counterpart of HttpClient, built on httpx, with the same
+        retry policy, metrics and circuit breaking.
+
+        An httpx client is bound to the event loop it is first used on, so one
+        pooled client is kept per running loop and dropped with it.
+    """
+
+    def __init__(
+        self,
+        name: str = "upstream",
+        pool_size: int = 100,
+        connect_timeout: float = 2.0,
+        read_timeout: float = 5.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.1,
+        backoff_max: float = 2.0,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ) -> None:
+        """
+            Args:
+                name (str): The name of the upstream, used to label metrics.
+                pool_size (int): The maximum number of concurrent connections per loop.
+                connect_timeout (float): Seconds to wait for a connection.
+                read_timeout (float): Seconds to wait for the response.
+                max_retries (int): How many times a request is retried.
+                backoff_base (float): The backoff before the first retry, in seconds.
+                backoff_max (float): The upper bound of a single backoff, in seconds.
+                sleep (Callable[[float], Awaitable[None]]): Used to wait between retries.
+                transport (Optional[httpx.AsyncBaseTransport]): Replaces the network
+                    transport, for tests.
+                breaker (Optional[CircuitBreaker]): Fails calls fast while the
+                    upstream is unhealthy.
+        """
+        self.name = name
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self._transport = transport
+        self.breaker = breaker
+        self._clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_env(cls, prefix: str, breaker: Optional[CircuitBreaker] = None) -> "AsyncHttpClient":
+        """
+            Builds a client from the same environment variables as
+            HttpClient.from_env, except that the pool is sized by
+            <prefix>_ASYNC_POOL_SIZE.
+
+            Args:
+                prefix (str): The prefix of the environment variables.
+                breaker (Optional[CircuitBreaker]): The circuit breaker of the upstream.
+
+            Returns:
+                AsyncHttpClient: The configured client.
+        """
+        return cls(
+            name=prefix.lower(),
+            pool_size=int(os.getenv(f"{prefix}_ASYNC_POOL_SIZE", "100")),
+            connect_timeout=float(os.getenv(f"{prefix}_CONNECT_TIMEOUT", "2")),
+            read_timeout=float(os.getenv(f"{prefix}_READ_TIMEOUT", "5")),
+            max_retries=int(os.getenv(f"{prefix}_MAX_RETRIES", "2")),
+            backoff_base=float(os.getenv(f"{prefix}_BACKOFF_BASE", "0.1")),
+            backoff_max=float(os.getenv(f"{prefix}_BACKOFF_MAX", "2")),
+            breaker=breaker
+        )
+
+    def _client(self) -> httpx.AsyncClient:
+        """Returns the pooled client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, transport=self._transport)
+            self._clients[loop] = client
+        return client
+
+    async def get(self, url: str, endpoint: str = "other", **kwargs: Any) -> httpx.Response:
+        """
+            Sends a GET request over the loop's pooled client, retrying transient failures.
+
+            Args:
+                url (str): The url to request.
+                endpoint (str): The name of the endpoint, used to label metrics.
+                **kwargs: Passed through to httpx.AsyncClient.get.
+
+            Returns:
+                httpx.Response: The last response received.
+
+            Raises:
+                httpx.HTTPError: If the request fails and cannot be retried or
+                    runs out of retries.
+                CircuitOpenError: If the upstream's circuit is open.
+        """
+        client = self._client()
+        attempt = 0
+        while True:
+            retry_after = None
+            if self.breaker is not None:
+                self.breaker.before_call()
+            start = time.perf_counter()
+            try:
+                response = await client.get(url, **kwargs)
+            except httpx.TransportError as e:
+                status = "timeout" if isinstance(e, httpx.TimeoutException) else "error"
+                observe_upstream(self.name, endpoint, status, time.perf_counter() - start)
+                _record_call(self.breaker, None, time.perf_counter() - start)
+                retryable = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                logger.warning("Connection to %s failed, retrying: %s", url, str(e))
+            else:
+                observe_upstream(
+                    self.name, endpoint, str(response.status_code),
+                    time.perf_counter() - start, len(response.content)
+                )
+                _record_call(self.breaker, response.status_code, time.perf_counter() - start)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                logger.warning("Got status %d from %s, retrying", response.status_code, url)
+                retry_after = response.headers.get("Retry-After")
+
+            observe_upstream_retry(self.name, endpoint)
+            await self._sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after))
+            attempt += 1
+
+    async def aclose(self) -> None:
+        """Close the pooled client of the running event loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
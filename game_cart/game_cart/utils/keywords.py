@@ -0,0 +1,3 @@
+def normalize_keyword(keyword: str) -> str:
+    """Collapse case and whitespace so equivalent searches share a cache entry and a catalog row."""
+    return " ".join(keyword.lower().split())
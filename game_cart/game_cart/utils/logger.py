@@ -1,26 +1,132 @@
+import atexit
+import copy
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
 
-from flask import current_app, has_request_context
+from flask.logging import default_handler
 
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Keep only one in every LOG_SAMPLE_EVERY INFO/DEBUG records per message template
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "1"))
+
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Passes one in every `every` records at INFO level or below for each logger
+    and message template. Warnings and errors are never sampled.
+    """
+
+    MAX_TEMPLATES = 1000
+
+    def __init__(self, every: int = 1):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or record.levelno > logging.INFO:
+            return True
+
+        key = (record.name, record.msg)
+        with self._lock:
+            if len(self._counts) >= self.MAX_TEMPLATES and key not in self._counts:
+                self._counts.clear()
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler that drops records instead of blocking when the queue is
+    full, and leaves all formatting to the listener thread.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Copy the record without formatting it. The stock QueueHandler merges
+        the message arguments and renders the traceback on the logging thread
+        so the record can be pickled, which a queue inside one process does
+        not need. Arguments are therefore rendered when the record is written.
+        """
+        return copy.copy(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
 
-def configure_logger(logger):
-    logger.setLevel(logging.DEBUG)  # Set the desired logging level here
 
-    # Create a console handler that logs to stderr
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setLevel(logging.DEBUG)
+_log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_queue_handler = DroppingQueueHandler(_log_queue)
+_queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_EVERY))
 
-    # Create a formatter with a timestamp
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _start_listener():
+    """Start the single background thread that formats and writes every record."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+
+        # Create a console handler that logs to stderr
+        handler = logging.StreamHandler(sys.stderr)
+
+        # Create a formatter with a timestamp
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+        _listener = logging.handlers.QueueListener(_log_queue, handler, respect_handler_level=True)
+        _listener.start()
+
+
+def _stop_listener():
+    """Flush the queue and stop the background writer."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _restart_listener_after_fork():
+    """The writer thread does not survive fork, so forked workers start their own."""
+    global _listener, _listener_lock
+    _listener = None
+    _listener_lock = threading.Lock()
+    _start_listener()
+
+
+atexit.register(_stop_listener)
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
+def configure_logger(logger):
+    """
+    Route a logger through the shared non-blocking queue pipeline. Records are
+    put on a queue by the calling thread and written to stderr by one
+    background thread. Calling this more than once on a logger is a no-op.
+    """
+    logger.setLevel(LOG_LEVEL)
 
-    # Add the formatter to the handler
-    handler.setFormatter(formatter)
+    # Flask's synchronous stderr handler is replaced by the queue
+    if default_handler in logger.handlers:
+        logger.removeHandler(default_handler)
 
-    # Add the handler to the logger
-    logger.addHandler(handler)
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
 
-    if has_request_context():
-        app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+    _start_listener()
@@ -0,0 +1,175 @@
+import os
+from typing import Optional
+
+from flask import g, has_request_context
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+
+# When PROMETHEUS_MULTIPROC_DIR is set before this module is imported, every
+# worker process writes its samples to files in that directory and /metrics
+# sums them, so counters stay correct behind a pre-fork server.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_COUNT = Counter(
+    "game_cart_http_requests_total",
+    "HTTP requests handled, by method, route and status code.",
+    ["method", "route", "status"]
+)
+
+REQUEST_LATENCY = Histogram(
+    "game_cart_http_request_duration_seconds",
+    "HTTP request latency in seconds, by method and route.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+
+
+UPSTREAM_LATENCY = Histogram(
+    "game_cart_upstream_request_duration_seconds",
+    "Latency of each outbound request attempt in seconds, by upstream and endpoint.",
+    ["upstream", "endpoint"],
+    buckets=LATENCY_BUCKETS
+)
+
+UPSTREAM_RESPONSES = Counter(
+    "game_cart_upstream_responses_total",
+    "Outbound request attempts by upstream, endpoint and status code, or \"timeout\"/\"error\".",
+    ["upstream", "endpoint", "status"]
+)
+
+UPSTREAM_RETRIES = Counter(
+    "game_cart_upstream_retries_total",
+    "Outbound requests retried, by upstream and endpoint.",
+    ["upstream", "endpoint"]
+)
+
+UPSTREAM_RESPONSE_BYTES = Histogram(
+    "game_cart_upstream_response_bytes",
+    "Size of outbound response payloads in bytes, by upstream and endpoint.",
+    ["upstream", "endpoint"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576)
+)
+
+UPSTREAM_CIRCUIT_STATE = Gauge(
+    "game_cart_upstream_circuit_state",
+    "Circuit breaker state by upstream: 0 closed, 1 half-open, 2 open.",
+    ["upstream"],
+    multiprocess_mode="livemax"
+)
+
+UPSTREAM_SHORT_CIRCUITED = Counter(
+    "game_cart_upstream_short_circuited_total",
+    "Outbound requests failed fast because the upstream's circuit was open.",
+    ["upstream"]
+)
+
+UPSTREAM_COALESCED = Counter(
+    "game_cart_upstream_coalesced_total",
+    "Outbound requests answered by an identical request already in flight.",
+    ["upstream"]
+)
+
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    """
+        Records one handled request.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The route template, such as /search-games/<keyword>.
+            status (int): The response status code.
+            seconds (float): How long the request took.
+    """
+    REQUEST_COUNT.labels(method, route, str(status)).inc()
+    REQUEST_LATENCY.labels(method, route).observe(seconds)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+        Renders every metric in the Prometheus text format, aggregated across
+        worker processes when multiprocess mode is enabled.
+
+        Returns:
+            tuple[bytes, str]: The metrics payload and its content type.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def observe_upstream(
+    upstream: str,
+    endpoint: str,
+    status: str,
+    seconds: float,
+    size: Optional[int] = None
+) -> None:
+    """
+        Records one outbound request attempt and adds its time to the timing
+        breakdown of the current request, if there is one.
+
+        Args:
+            upstream (str): The name of the upstream service.
+            endpoint (str): The upstream endpoint, such as "search".
+            status (str): The response status code, "timeout" or "error".
+            seconds (float): How long the attempt took.
+            size (Optional[int]): The size of the response payload in bytes.
+    """
+    UPSTREAM_RESPONSES.labels(upstream, endpoint, status).inc()
+    UPSTREAM_LATENCY.labels(upstream, endpoint).observe(seconds)
+    if size is not None:
+        UPSTREAM_RESPONSE_BYTES.labels(upstream, endpoint).observe(size)
+
+    if has_request_context():
+        timings = g.setdefault("upstream_timings", {})
+        total, calls = timings.get(upstream, (0.0, 0))
+        timings[upstream] = (total + seconds, calls + 1)
+
+
+def observe_upstream_retry(upstream: str, endpoint: str) -> None:
+    """Records that an outbound request is being retried."""
+    UPSTREAM_RETRIES.labels(upstream, endpoint).inc()
+
+
+def server_timing_header(total_seconds: float) -> str:
+    """
+        Builds a Server-Timing header that splits the current request's time
+        between each upstream and the app itself.
+
+        Args:
+            total_seconds (float): How long the whole request took.
+
+        Returns:
+            str: The value of the Server-Timing header.
+    """
+    timings = g.get("upstream_timings", {})
+    parts = []
+    upstream_seconds = 0.0
+    for upstream, (seconds, calls) in timings.items():
+        upstream_seconds += seconds
+        parts.append(f'{upstream};dur={seconds * 1000:.1f};desc="{calls} calls"')
+    parts.append(f"app;dur={max(total_seconds - upstream_seconds, 0.0) * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def observe_circuit_state(upstream: str, state: str) -> None:
+    """Records the state of an upstream's circuit breaker."""
+    UPSTREAM_CIRCUIT_STATE.labels(upstream).set(CIRCUIT_STATES[state])
+
+
+def observe_short_circuit(upstream: str) -> None:
+    """Records that a request failed fast because the circuit was open."""
+    UPSTREAM_SHORT_CIRCUITED.labels(upstream).inc()
+
+
+def observe_coalesced(upstream: str) -> None:
+    """Records that a request joined an identical one already in flight."""
+    UPSTREAM_COALESCED.labels(upstream).inc()
@@ -0,0 +1,78 @@
+import hashlib
+import hmac
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from game_cart.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# PBKDF2-HMAC-SHA256 work factor for new hashes. Raising it makes existing
+# hashes get upgraded the next time their owner logs in.
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "600000"))
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# hashlib releases the GIL while it runs PBKDF2, so a small thread pool caps how
+# many cores login storms can take without blocking other request threads.
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+
+def _compute_hash(password: str, salt: str, iterations: Optional[int]) -> str:
+    """
+        Computes a password hash on the calling thread.
+
+        Args:
+            password (str): The password to hash.
+            salt (str): The hex encoded salt.
+            iterations (Optional[int]): The PBKDF2 work factor, or None for the
+                legacy single round of salted SHA-256.
+
+        Returns:
+            str: The hex encoded hash.
+    """
+    if not iterations:
+        return hashlib.sha256((password + salt).encode()).hexdigest()
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations).hex()
+
+
+def hash_password(password: str, salt: str, iterations: Optional[int]) -> str:
+    """
+        Computes a password hash on the hashing pool and waits for the result.
+
+        Args:
+            password (str): The password to hash.
+            salt (str): The hex encoded salt.
+            iterations (Optional[int]): The PBKDF2 work factor, or None for the
+                legacy single round of salted SHA-256.
+
+        Returns:
+            str: The hex encoded hash.
+    """
+    return _executor.submit(_compute_hash, password, salt, iterations).result()
+
+
+def verify_password(password: str, salt: str, iterations: Optional[int], expected: str) -> bool:
+    """
+        Checks a password against a stored hash in constant time.
+
+        Args:
+            password (str): The password to check.
+            salt (str): The hex encoded salt the hash was made with.
+            iterations (Optional[int]): The work factor the hash was made with.
+            expected (str): The stored hex encoded hash.
+
+        Returns:
+            bool: True if the password matches, False otherwise.
+    """
+    return hmac.compare_digest(hash_password(password, salt, iterations), expected)
+
+
+def needs_rehash(iterations: Optional[int]) -> bool:
+    """Returns True if a hash was made with a different work factor than the current one."""
+    return iterations != PASSWORD_HASH_ITERATIONS
@@ -0,0 +1,169 @@
+import fcntl
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+from flask import Flask
+
+from game_cart.db import db
+from game_cart.models.game_model import Games
+from game_cart.utils.cheapsharkapi import MAX_IDS_PER_REQUEST, refresh_games_info
+from game_cart.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class PriceRefresher:
+    """
+        Refreshes the prices of the games in carts in the background, oldest
+        first, so cart reads never wait on cheapshark.com.
+
+        Every `interval` seconds the refresher tries to take an exclusive lock
+        on lock_path without blocking. Only the process holding the lock does
+        any work, however many workers run. Each run looks up at most
+        requests_per_minute * interval / 60 chunks of MAX_IDS_PER_REQUEST ids,
+        spaced evenly, and stores each chunk's prices with one bulk update.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        interval: float = 60.0,
+        max_age: float = 3600.0,
+        requests_per_minute: float = 30.0,
+        lock_path: Optional[str] = None,
+        fetch: Callable[[List[int]], dict[int, dict[str, Any]]] = refresh_games_info,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        """
+            Args:
+                app (Flask): The app whose database holds the carts.
+                interval (float): Seconds between runs.
+                max_age (float): Prices older than this many seconds are refreshed.
+                requests_per_minute (float): The budget of upstream requests.
+                lock_path (Optional[str]): The file locked by the refreshing process.
+                fetch (Callable[[List[int]], dict[int, dict[str, Any]]]): Looks up
+                    the current info of a chunk of ids.
+                clock (Callable[[], float]): Source of the current time.
+        """
+        self.app = app
+        self.interval = interval
+        self.max_age = max_age
+        self.requests_per_run = max(1, int(requests_per_minute * interval / 60))
+        self.spacing = 60 / requests_per_minute
+        self.lock_path = lock_path or os.path.join(tempfile.gettempdir(), "game_cart_price_refresh.lock")
+        self._fetch = fetch
+        self._clock = clock
+        self._lock_file = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, app: Flask) -> "PriceRefresher":
+        """
+            Builds a refresher from PRICE_REFRESH_INTERVAL, PRICE_REFRESH_MAX_AGE,
+            PRICE_REFRESH_REQUESTS_PER_MINUTE and PRICE_REFRESH_LOCK_FILE.
+
+            Args:
+                app (Flask): The app whose database holds the carts.
+
+            Returns:
+                PriceRefresher: The configured refresher.
+        """
+        return cls(
+            app,
+            interval=float(os.getenv("PRICE_REFRESH_INTERVAL", "60")),
+            max_age=float(os.getenv("PRICE_REFRESH_MAX_AGE", "3600")),
+            requests_per_minute=float(os.getenv("PRICE_REFRESH_REQUESTS_PER_MINUTE", "30")),
+            lock_path=os.getenv("PRICE_REFRESH_LOCK_FILE")
+        )
+
+    def _acquire_lock(self) -> bool:
+        """Take the refresh lock without blocking. Once taken it is held until stop."""
+        if self._lock_file is not None:
+            return True
+
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        logger.info("Process %d is now refreshing prices", os.getpid())
+        self._lock_file = lock_file
+        return True
+
+    def _release_lock(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def run_once(self) -> int:
+        """
+            Refreshes the stalest prices within one run's request budget, if
+            this process holds the refresh lock.
+
+            Returns:
+                int: The number of games whose price was refreshed.
+        """
+        if not self._acquire_lock():
+            return 0
+
+        # Fixed for the run, so rows it refreshes are not picked again
+        cutoff = self._clock() - self.max_age
+        refreshed = 0
+        with self.app.app_context():
+            try:
+                for request in range(self.requests_per_run):
+                    if request and self._stop.wait(self.spacing):
+                        break
+
+                    ids = Games.get_stale_game_ids(cutoff, MAX_IDS_PER_REQUEST)
+                    if not ids:
+                        break
+
+                    try:
+                        infos = self._fetch(ids)
+                    except RuntimeError as e:
+                        logger.warning("Price refresh stopped: %s", str(e))
+                        break
+
+                    prices = {
+                        id: float(infos[id]["price"]) if infos.get(id) else None for id in ids
+                    }
+                    Games.update_prices(prices, self._clock())
+                    refreshed += len(prices)
+            finally:
+                db.session.remove()
+
+        if refreshed:
+            logger.info("Refreshed the prices of %d games", refreshed)
+        return refreshed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("Price refresh failed: %s", str(e))
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Start refreshing on a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="price-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and release the refresh lock."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._release_lock()
@@ -0,0 +1,167 @@
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Protocol
+
+from game_cart.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class TokenPersistence(Protocol):
+    """Storage that lets tokens outlive the process that issued them."""
+
+    def save(self, token: str, user_id: int, username: str, expires_at: float) -> None: ...
+
+    def load(self, token: str) -> Optional[tuple[int, str, float]]: ...
+
+    def delete(self, token: str) -> None: ...
+
+    def delete_for_user(self, user_id: int) -> None: ...
+
+
+class TokenStore:
+    """
+        A bounded, thread-safe in-memory store of session tokens.
+
+        Tokens are kept in issue order. Because every token lives for the same
+        ttl, expired tokens are always at the front and are purged in O(1)
+        amortized time. When the store is full the oldest token is evicted;
+        with persistence configured an evicted token is reloaded on its next use.
+
+        With persistence configured, the in-memory copy of a token is only
+        trusted for recheck_after seconds before it is looked up again, so a
+        token revoked by another process stops working within that time.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl: float = 3600.0,
+        persistence: Optional[TokenPersistence] = None,
+        recheck_after: float = 5.0,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        """
+            Args:
+                max_entries (int): The maximum number of tokens kept in memory.
+                ttl (float): The number of seconds a token is valid for.
+                persistence (Optional[TokenPersistence]): Where tokens are also
+                    saved so other processes and restarts can resolve them.
+                recheck_after (float): The number of seconds a token resolved
+                    from memory is trusted before persistence is checked again.
+                clock (Callable[[], float]): Source of the current time.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persistence = persistence
+        self.recheck_after = recheck_after
+        self._clock = clock
+        # token -> (user_id, username, expires_at, checked_at)
+        self._tokens: OrderedDict[str, tuple[int, str, float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def _purge_expired(self, now: float) -> None:
+        """Drop expired tokens from the front of the store. Caller holds the lock."""
+        while self._tokens:
+            token, entry = next(iter(self._tokens.items()))
+            if entry[2] > now:
+                break
+            del self._tokens[token]
+
+    def _remember(self, token: str, entry: tuple[int, str, float, float]) -> None:
+        """Keep a token in memory, evicting the oldest ones. Caller holds the lock."""
+        self._tokens[token] = entry
+        while len(self._tokens) > self.max_entries:
+            self._tokens.popitem(last=False)
+
+    def issue(self, user_id: int, username: str) -> str:
+        """
+            Issues a new session token for a user.
+
+            Args:
+                user_id (int): The id of the user.
+                username (str): The username of the user.
+
+            Returns:
+                str: The new token.
+        """
+        token = secrets.token_urlsafe(32)
+        now = self._clock()
+        entry = (user_id, username, now + self.ttl, now)
+
+        if self.persistence is not None:
+            self.persistence.save(token, *entry[:3])
+
+        with self._lock:
+            self._purge_expired(now)
+            self._remember(token, entry)
+
+        logger.info("Session token issued for user: %s", username)
+        return token
+
+    def resolve(self, token: str) -> Optional[tuple[int, str]]:
+        """
+            Looks up the user a token was issued to.
+
+            Args:
+                token (str): The session token.
+
+            Returns:
+                Optional[tuple[int, str]]: The user id and username, or None if
+                    the token is unknown or expired.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._tokens.get(token)
+
+        if self.persistence is not None and (entry is None or entry[3] + self.recheck_after <= now):
+            # Persistence is the source of truth: it sees revocations made by other processes
+            loaded = self.persistence.load(token)
+            with self._lock:
+                if loaded is None or loaded[2] <= now:
+                    self._tokens.pop(token, None)
+                    entry = None
+                else:
+                    entry = (*loaded, now)
+                    self._remember(token, entry)
+
+        if entry is None or entry[2] <= now:
+            return None
+        return entry[0], entry[1]
+
+    def revoke(self, token: str) -> None:
+        """Invalidate a single token."""
+        with self._lock:
+            self._tokens.pop(token, None)
+        if self.persistence is not None:
+            self.persistence.delete(token)
+
+    def revoke_user(self, user_id: int) -> None:
+        """Invalidate every token issued to a user."""
+        with self._lock:
+            for token in [t for t, entry in self._tokens.items() if entry[0] == user_id]:
+                del self._tokens[token]
+        if self.persistence is not None:
+            self.persistence.delete_for_user(user_id)
+
+    def clear(self) -> None:
+        """Forget every token held in memory."""
+        with self._lock:
+            self._tokens.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """
+            Returns the size of the store.
+
+            Returns:
+                dict[str, Any]: The number of tokens in memory and the maximum.
+        """
+        with self._lock:
+            return {"size": len(self._tokens), "max_entries": self.max_entries}
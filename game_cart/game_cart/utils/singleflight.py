@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable
+
+from game_cart.utils.logger import configure_logger
+from game_cart.utils.metrics import observe_coalesced
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class SingleFlight:
+    """
+        Coalesces concurrent calls with the same key into one call.
+
+        The first caller for a key runs the function and every caller that
+        arrives while it is in flight receives the same result or exception.
+        Calls are shared between threads and between event loops, so sync
+        callers and coroutines on any loop can wait on the same call.
+    """
+
+    def __init__(self, name: str = "upstream") -> None:
+        """
+            Args:
+                name (str): The name of the upstream, used to label metrics.
+        """
+        self.name = name
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        """Returns the in-flight call for a key and whether the caller must run it."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                observe_coalesced(self.name)
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+            Calls fn, or waits for the call already in flight for the key.
+
+            Args:
+                key (Hashable): Identifies identical calls.
+                fn (Callable[[], Any]): Makes the call.
+
+            Returns:
+                Any: The result of the call.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+            Awaits fn(), or the call already in flight for the key.
+
+            Args:
+                key (Hashable): Identifies identical calls.
+                fn (Callable[[], Awaitable[Any]]): Makes the call.
+
+            Returns:
+                Any: The result of the call.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
@@ -0,0 +1,134 @@
+import bisect
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List
+
+from game_cart.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+SORT_ORDERS = ("popularity", "price")
+
+
+class TitleIndex:
+    """
+        A bounded, thread-safe in-memory prefix index over game titles, used
+        for type-ahead suggestions.
+
+        Each title is stored once per word, as the lowercase text from that
+        word to the end, in one sorted list of (text, id) keys. All titles
+        that have a word starting with a prefix are therefore one contiguous
+        run of the list, which is found with bisect. Inserts are incremental.
+        When the index is full the least recently seen game is evicted.
+
+        Every time a game is seen its popularity goes up by one, so games that
+        keep coming up in searches and carts rank first.
+    """
+
+    def __init__(self, max_entries: int = 20000, max_words: int = 8) -> None:
+        """
+            Args:
+                max_entries (int): The maximum number of games kept.
+                max_words (int): How many leading words of a title can start a match.
+        """
+        self.max_entries = max_entries
+        self.max_words = max_words
+        self._keys: List[tuple[str, int]] = []
+        # id -> [name, price, popularity, keys], in least recently seen order
+        self._games: OrderedDict[int, list] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def _title_keys(self, name: str, id: int) -> List[tuple[str, int]]:
+        words = name.lower().split()
+        return [(" ".join(words[i:]), id) for i in range(min(len(words), self.max_words))]
+
+    def _remove(self, id: int) -> None:
+        """Drop a game and its keys. Caller holds the lock."""
+        for key in self._games.pop(id)[3]:
+            index = bisect.bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                del self._keys[index]
+
+    def add(self, games: Iterable[dict[str, Any]]) -> None:
+        """
+            Inserts games into the index, or refreshes the ones already in it.
+
+            Args:
+                games (Iterable[dict[str, Any]]): The games, each with an id,
+                    name and price as returned by cheapsharkapi.
+        """
+        with self._lock:
+            for game in games:
+                try:
+                    id, name, price = int(game["id"]), game["name"], float(game["price"])
+                except (KeyError, TypeError, ValueError):
+                    logger.warning("Skipping game without a valid id, name and price: %s", game)
+                    continue
+
+                entry = self._games.get(id)
+                if entry is not None and entry[0] == name:
+                    entry[1] = price
+                    entry[2] += 1
+                    self._games.move_to_end(id)
+                    continue
+
+                popularity = 1
+                if entry is not None:
+                    popularity += entry[2]
+                    self._remove(id)
+
+                keys = self._title_keys(name, id)
+                for key in keys:
+                    bisect.insort(self._keys, key)
+                self._games[id] = [name, price, popularity, keys]
+
+                while len(self._games) > self.max_entries:
+                    self._remove(next(iter(self._games)))
+
+    def suggest(self, prefix: str, k: int = 10, sort: str = "popularity") -> List[dict[str, Any]]:
+        """
+            Finds the top k games with a word in their title starting with a prefix.
+
+            Args:
+                prefix (str): The text typed so far.
+                k (int): The maximum number of suggestions.
+                sort (str): "popularity" for the most often seen games first,
+                    or "price" for the cheapest first.
+
+            Returns:
+                List[dict[str, Any]]: The suggested games, each with an id, name and price.
+
+            Raises:
+                ValueError: If the sort order is unknown.
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_ORDERS)}")
+
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+
+        with self._lock:
+            ids = set()
+            index = bisect.bisect_left(self._keys, (prefix,))
+            while index < len(self._keys) and self._keys[index][0].startswith(prefix):
+                ids.add(self._keys[index][1])
+                index += 1
+
+            if sort == "price":
+                top = heapq.nsmallest(k, ids, key=lambda id: (self._games[id][1], self._games[id][0]))
+            else:
+                top = heapq.nsmallest(k, ids, key=lambda id: (-self._games[id][2], self._games[id][0]))
+
+            return [{"id": str(id), "name": self._games[id][0], "price": f"{self._games[id][1]:.2f}"} for id in top]
+
+    def stats(self) -> dict[str, int]:
+        """Returns the number of games and keys in the index."""
+        with self._lock:
+            return {"size": len(self._games), "keys": len(self._keys), "max_entries": self.max_entries}
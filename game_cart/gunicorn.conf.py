@@ -0,0 +1,78 @@
+"""
+Gunicorn settings for running Game Cart in production:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Every setting can be overridden with the environment variables below. Send
+SIGHUP to the master for a graceful reload: new workers are started with the
+new code and old workers finish their in-flight requests before exiting.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Threaded workers: requests mostly wait on cheapshark.com or SQLite, so a few
+# threads per process keep the CPU busy without a process per connection.
+worker_class = "gthread"
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then so slow leaks cannot build up; the jitter
+# keeps them from all restarting at once.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# Preloading shares the imported app between workers but means SIGHUP no
+# longer picks up new code, so it is off by default.
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG")
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+# Workers write their metrics here so /metrics can sum them. This must be set
+# before prometheus_client is imported, which is why it is done in the config.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "game_cart_metrics")
+)
+
+
+def on_starting(server):
+    """Start with an empty metrics directory so counts from a previous run are not summed in."""
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def post_fork(server, worker):
+    """Give each worker its own database connections instead of sockets inherited from the master."""
+    if not server.cfg.preload_app:
+        return
+
+    from app import app
+    from game_cart.db import db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Warm up database and upstream connections before the worker accepts requests."""
+    from app import start_background_tasks, warm_up
+
+    warm_up(worker.wsgi)
+    start_background_tasks(worker.wsgi)
+
+
+def child_exit(server, worker):
+    """Let the metrics of a dead worker be merged instead of left as live gauges."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,182 @@
+"""
+A local stand-in for the cheapshark.com API, for load tests without network
+access. Start it, then point the app at it:
+
+    python -m loadtest.fake_cheapshark --port 8899 --latency 0.05 --error-rate 0.01
+    CHEAPSHARK_BASE_URL=http://127.0.0.1:8899/api/1.0/ gunicorn -c gunicorn.conf.py app:app
+
+It answers games?title=, games?id= and games?ids= from a generated catalog of
+--catalog-size games with ids 1 to catalog-size. Game n is titled after
+WORDS[n % len(WORDS)], so searching for one of WORDS returns games whose
+titles contain it.
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+WORDS = (
+    "space", "dragon", "racing", "legend", "shadow", "kingdom", "galaxy", "zombie", "soccer", "puzzle",
+    "pirate", "ninja", "castle", "robot", "forest", "empire", "hunter", "storm", "island", "quest"
+)
+
+API_PATH = "/api/1.0/games"
+
+
+@dataclass
+class FakeConfig:
+    """How the stand-in behaves. Latency is drawn uniformly from latency ± jitter seconds."""
+
+    latency: float = 0.05
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    search_results: int = 60
+    catalog_size: int = 100000
+    padding: int = 0
+
+
+def title(id: int) -> str:
+    """The title of a catalog game."""
+    return f"{WORDS[id % len(WORDS)].title()} {WORDS[(id // len(WORDS)) % len(WORDS)].title()} {id}"
+
+
+def price(id: int) -> str:
+    return f"{id % 60}.{id % 100:02d}"
+
+
+def search(config: FakeConfig, keyword: str) -> list[dict[str, Any]]:
+    """A games?title= payload of up to search_results games."""
+    keyword = keyword.lower().strip()
+    if keyword in WORDS:
+        ids = range(WORDS.index(keyword) or len(WORDS), config.catalog_size + 1, len(WORDS))
+    else:
+        # Unknown keywords still get a stable set of games
+        seed = zlib.crc32(keyword.encode())
+        ids = sorted({(seed + n * 7919) % config.catalog_size + 1 for n in range(config.search_results)})
+    return [
+        {
+            "gameID": str(id),
+            "steamAppID": str(100000 + id),
+            "cheapest": price(id),
+            "cheapestDealID": "x" * 44,
+            "external": title(id),
+            "internalName": title(id).upper().replace(" ", ""),
+            "thumb": "t" * config.padding
+        }
+        for id in itertools.islice(ids, config.search_results)
+    ]
+
+
+def game_info(config: FakeConfig, id: int) -> Optional[dict[str, Any]]:
+    """The games?id= payload of one game, or None if it is not in the catalog."""
+    if not 1 <= id <= config.catalog_size:
+        return None
+    return {
+        "info": {"title": title(id), "steamAppID": str(100000 + id), "thumb": "t" * config.padding},
+        "cheapestPriceEver": {"price": price(id), "date": 1700000000},
+        "deals": [{"storeID": "1", "dealID": "x" * 44, "price": price(id), "retailPrice": "59.99", "savings": "50.0"}]
+    }
+
+
+class FakeCheapSharkHandler(BaseHTTPRequestHandler):
+    server: "FakeCheapSharkServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        config = self.server.config
+        delay = config.latency + random.uniform(-config.jitter, config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path.rstrip("/") != API_PATH:
+            self._send(404, {"error": "not found"})
+        elif random.random() < config.error_rate:
+            self._send(config.error_status, {"error": "injected failure"})
+        elif "title" in query:
+            self._send(200, search(config, query["title"]))
+        elif "ids" in query:
+            infos = {id: game_info(config, int(id)) for id in query["ids"].split(",") if id.isdigit()}
+            self._send(200, {id: info for id, info in infos.items() if info is not None})
+        elif "id" in query and query["id"].isdigit():
+            self._send(200, game_info(config, int(query["id"])) or [])
+        else:
+            self._send(400, {"error": "title, id or ids is required"})
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.requests += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class FakeCheapSharkServer(ThreadingHTTPServer):
+    """A threaded HTTP server, one thread per connection, that counts the requests it answered."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: tuple[str, int], config: FakeConfig) -> None:
+        super().__init__(address, FakeCheapSharkHandler)
+        self.config = config
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """The value to use as CHEAPSHARK_BASE_URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/1.0/"
+
+    def start(self) -> threading.Thread:
+        """Serve on a daemon thread, for use from tests and scripts."""
+        thread = threading.Thread(target=self.serve_forever, name="fake-cheapshark", daemon=True)
+        thread.start()
+        return thread
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a fake cheapshark.com API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency varies uniformly by up to this many seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with --error-status.")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--search-results", type=int, default=60, help="Games per search response.")
+    parser.add_argument("--catalog-size", type=int, default=100000, help="Ids 1 to this number exist.")
+    parser.add_argument("--padding", type=int, default=0, help="Extra bytes per game, to inflate payloads.")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status,
+        search_results=args.search_results, catalog_size=args.catalog_size, padding=args.padding
+    )
+    server = FakeCheapSharkServer((args.host, args.port), config)
+    print(f"Serving a fake cheapshark.com at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
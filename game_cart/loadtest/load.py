@@ -0,0 +1,294 @@
+"""
+A concurrent load generator that drives a mix of every app route and reports
+throughput and p50/p95/p99 latency per route:
+
+    python -m loadtest.load --url http://localhost:5000 --concurrency 32 --duration 60
+    python -m loadtest.load --mix search=10,get_games=10,add_game=5 --output results.json
+
+Each worker thread is one shopper with its own account, session token and
+cart. Pair it with loadtest/fake_cheapshark.py to run without network access.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, List, Optional
+
+import requests
+
+from loadtest.fake_cheapshark import WORDS
+
+PASSWORD = "load-test-password"
+
+# Operation -> relative weight. Login, logout, account creation and password
+# changes hash a password, so they are kept rare as they are in real traffic.
+DEFAULT_MIX = {
+    "search": 15, "suggest": 15, "get_games": 15, "get_total_price": 10, "add_game": 8, "add_games": 4,
+    "delete_game": 4, "delete_games": 2, "clear_cart": 1, "login": 1, "logout": 1, "create_account": 1,
+    "update_password": 1, "health": 2, "metrics": 1, "cache_stats": 1
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """The nearest-rank q-th percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+class Recorder:
+    """Thread-safe latencies and outcomes per route."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, List[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def record(self, route: str, seconds: float, status: str) -> None:
+        with self._lock:
+            self.latencies[route].append(seconds)
+            self.statuses[route][status] += 1
+
+    def report(self, elapsed: float) -> dict[str, Any]:
+        """Per route and overall request counts, throughput, latency percentiles in ms and statuses."""
+        routes = {}
+        with self._lock:
+            everything = sorted(seconds for latencies in self.latencies.values() for seconds in latencies)
+            for route, latencies in sorted(self.latencies.items()):
+                routes[route] = self._summary(sorted(latencies), elapsed, dict(self.statuses[route]))
+            total = self._summary(everything, elapsed, {})
+        errors = sum(
+            count for summary in routes.values() for status, count in summary["statuses"].items()
+            if not status.isdigit() or int(status) >= 500
+        )
+        total["errors"] = errors
+        return {"elapsed": elapsed, "routes": routes, "total": total}
+
+    @staticmethod
+    def _summary(latencies: List[float], elapsed: float, statuses: dict[str, int]) -> dict[str, Any]:
+        return {
+            "requests": len(latencies),
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+            "p50": percentile(latencies, 50) * 1e3,
+            "p95": percentile(latencies, 95) * 1e3,
+            "p99": percentile(latencies, 99) * 1e3,
+            "statuses": statuses
+        }
+
+
+class Shopper:
+    """One simulated user, driven by one worker thread."""
+
+    def __init__(
+        self, url: str, recorder: Recorder, username: str, rng: random.Random, timeout: float, catalog_size: int
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.catalog_size = catalog_size
+        self.recorder = recorder
+        self.username = username
+        self.rng = rng
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.token: Optional[str] = None
+        self.cart: set[int] = set()
+        self.etag: Optional[str] = None
+
+    def call(self, method: str, route: str, path: str, **kwargs: Any) -> Optional[requests.Response]:
+        """Make one request and record its latency under the route template."""
+        if self.token:
+            kwargs.setdefault("headers", {})["Authorization"] = f"Bearer {self.token}"
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            self.recorder.record(route, time.perf_counter() - start, type(e).__name__)
+            return None
+        self.recorder.record(route, time.perf_counter() - start, str(response.status_code))
+        return response
+
+    def sign_up(self) -> None:
+        self.session.post(
+            f"{self.url}/create-account", json={"username": self.username, "password": PASSWORD}, timeout=self.timeout
+        )
+        self.login()
+
+    def login(self) -> None:
+        self.token = None
+        response = self.call("POST", "/login", "/login", json={"username": self.username, "password": PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.token = response.json()["token"]
+
+    def logout(self) -> None:
+        self.call("POST", "/logout", "/logout")
+        self.login()
+
+    def create_account(self) -> None:
+        username = f"load-{uuid.uuid4().hex}"
+        self.call("POST", "/create-account", "/create-account", json={"username": username, "password": PASSWORD})
+
+    def update_password(self) -> None:
+        self.call("POST", "/update-password", "/update-password", json={"newPassword": PASSWORD})
+        # Changing the password revokes every session token of the user
+        self.login()
+
+    def search(self) -> None:
+        keyword = self.rng.choice(WORDS)
+        self.call("GET", "/search-games/<keyword>", f"/search-games/{keyword}")
+
+    def suggest(self) -> None:
+        word = self.rng.choice(WORDS)
+        self.call("GET", "/suggest", "/suggest", params={"q": word[:self.rng.randint(1, len(word))], "limit": 10})
+
+    def add_game(self) -> None:
+        id = self.rng.randint(1, self.catalog_size)
+        response = self.call("POST", "/add-game", "/add-game", json={"id": id})
+        if response is not None and response.status_code == 201:
+            self.cart.add(id)
+
+    def add_games(self) -> None:
+        ids = [self.rng.randint(1, self.catalog_size) for _ in range(self.rng.randint(2, 30))]
+        response = self.call("POST", "/add-games", "/add-games", json={"ids": ids})
+        if response is not None and response.status_code < 300:
+            self.cart.update(ids)
+
+    def delete_game(self) -> None:
+        id = self.rng.choice(sorted(self.cart)) if self.cart else self.rng.randint(1, self.catalog_size)
+        self.call("DELETE", "/delete-game", "/delete-game", json={"id": id})
+        self.cart.discard(id)
+
+    def delete_games(self) -> None:
+        ids = self.rng.sample(sorted(self.cart), min(len(self.cart), 5)) or [self.rng.randint(1, self.catalog_size)]
+        self.call("DELETE", "/delete-games", "/delete-games", json={"ids": ids})
+        self.cart.difference_update(ids)
+
+    def clear_cart(self) -> None:
+        self.call("DELETE", "/clear-cart", "/clear-cart")
+        self.cart.clear()
+
+    def get_games(self) -> None:
+        # Half the reads revalidate the last copy, as a client with a cache would
+        headers = {"If-None-Match": self.etag} if self.etag and self.rng.random() < 0.5 else {}
+        response = self.call("GET", "/get-games", "/get-games", headers=headers)
+        if response is not None and response.status_code == 200:
+            self.etag = response.headers.get("ETag")
+
+    def get_total_price(self) -> None:
+        self.call("GET", "/get-total-price", "/get-total-price")
+
+    def health(self) -> None:
+        self.call("GET", "/health", "/health")
+
+    def metrics(self) -> None:
+        self.call("GET", "/metrics", "/metrics")
+
+    def cache_stats(self) -> None:
+        self.call("GET", "/cache-stats", "/cache-stats")
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parses "operation=weight,..." into weights, checking every operation exists."""
+    mix = {}
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation {name}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def run(
+    url: str, concurrency: int, duration: float, mix: dict[str, float], timeout: float = 10.0,
+    catalog_size: int = 100000, seed: Optional[int] = None, progress: Callable[[str], None] = print
+) -> dict[str, Any]:
+    """
+        Signs up one shopper per worker, then drives the mix until the
+        duration has passed.
+
+        Args:
+            url (str): The base URL of the app.
+            concurrency (int): The number of concurrent shoppers.
+            duration (float): Seconds of load after sign-up.
+            mix (dict[str, float]): Operation name -> relative weight.
+            timeout (float): Seconds before a request counts as failed.
+            catalog_size (int): Games are added from ids 1 to this number, as
+                in the --catalog-size of the fake cheapshark.com.
+            seed (Optional[int]): Seed of the random choices, for repeatable runs.
+            progress (Callable[[str], None]): Receives progress messages.
+
+        Returns:
+            dict[str, Any]: The report of Recorder.report.
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    run_id = uuid.uuid4().hex[:8]
+    seeds = random.Random(seed)
+
+    progress(f"Signing up {concurrency} shoppers")
+    shoppers = [
+        Shopper(url, Recorder(), f"load-{run_id}-{n}", random.Random(seeds.random()), timeout, catalog_size)
+        for n in range(concurrency)
+    ]
+    sign_up_threads = [threading.Thread(target=shopper.sign_up) for shopper in shoppers]
+    for thread in sign_up_threads:
+        thread.start()
+    for thread in sign_up_threads:
+        thread.join()
+
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    def work(shopper: Shopper) -> None:
+        shopper.recorder = recorder
+        while time.perf_counter() < deadline:
+            getattr(shopper, shopper.rng.choices(names, weights)[0])()
+
+    progress(f"Running {', '.join(names)} for {duration:g} seconds")
+    start = time.perf_counter()
+    threads = [threading.Thread(target=work, args=(shopper,)) for shopper in shoppers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return recorder.report(time.perf_counter() - start)
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [f"{'route':<26}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses"]
+    for route, summary in list(report["routes"].items()) + [("total", report["total"])]:
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(summary["statuses"].items()))
+        lines.append(
+            f"{route:<26}{summary['requests']:>10}{summary['throughput']:>10.1f}"
+            f"{summary['p50']:>10.1f}{summary['p95']:>10.1f}{summary['p99']:>10.1f}  {statuses}"
+        )
+    lines.append(f"{report['total']['errors']} server errors in {report['elapsed']:.1f} seconds")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the game cart API.")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--mix", default="", help="operation=weight,... Defaults to a mix of every route.")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--catalog-size", type=int, default=100000, help="Add games with ids 1 to this number.")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", help="Also write the report to this JSON file.")
+    args = parser.parse_args()
+
+    report = run(
+        args.url, args.concurrency, args.duration, parse_mix(args.mix) or DEFAULT_MIX, args.timeout, args.catalog_size, args.seed
+    )
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
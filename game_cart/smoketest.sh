@@ -24,7 +24,7 @@ done
 check_health() {
   echo "Checking API health..."
   response=$(curl -s -X GET "$BASE_URL/health")
-  if echo "$response" | grep -q '"status": "healthy"'; then
+  if echo "$response" | grep -q '"status": *"healthy"'; then
     echo "API is healthy."
   else
     echo "API health check failed. Response: $response"
@@ -46,7 +46,7 @@ create_user() {
   response=$(curl -s -X POST "$BASE_URL/create-account" \
     -H "Content-Type: application/json" \
     -d "{\"username\": \"$username\", \"password\": \"$password\"}")
-  if echo "$response" | grep -q '"status": "user added"'; then
+  if echo "$response" | grep -q '"status": *"user added"'; then
     echo "User created successfully: $username"
   else
     echo "Failed to create user. Response: $response"
@@ -62,7 +62,8 @@ login_user() {
   response=$(curl -s -X POST "$BASE_URL/login" \
     -H "Content-Type: application/json" \
     -d "{\"username\": \"$username\", \"password\": \"$password\"}")
-  if echo "$response" | grep -q '"message": "User .* logged in successfully."'; then
+  if echo "$response" | grep -q '"message": *"User .* logged in successfully."'; then
+    TOKEN=$(echo "$response" | sed -n 's/.*"token": *"\([^"]*\)".*/\1/p')
     echo "User logged in successfully: $username"
   else
     echo "Failed to log in user. Response: $response"
@@ -72,15 +73,15 @@ login_user() {
 
 
 update_password() {
-  username=$1
-  new_password=$2
+  new_password=$1
 
-  echo "Updating password for user: $username"
+  echo "Updating password of the logged in user..."
   response=$(curl -s -X POST "$BASE_URL/update-password" \
+    -H "Authorization: Bearer $TOKEN" \
     -H "Content-Type: application/json" \
-    -d "{\"username\": \"$username\", \"newPassword\": \"$new_password\"}")
-  if echo "$response" | grep -q '"status": "password changed"'; then
-    echo "Password updated successfully for user: $username"
+    -d "{\"newPassword\": \"$new_password\"}")
+  if echo "$response" | grep -q '"status": *"password changed"'; then
+    echo "Password updated successfully."
   else
     echo "Failed to update password. Response: $response"
     exit 1
@@ -118,10 +119,11 @@ add_game_to_cart_by_id() {
 
   echo "Adding game by ID ($id)..."
   response=$(curl -s -X POST "$BASE_URL/add-game" \
+    -H "Authorization: Bearer $TOKEN" \
     -H "Content-Type: application/json" \
     -d "{\"id\": $id}")
 
-  if echo "$response" | grep -q '"status": "game added"'; then
+  if echo "$response" | grep -q '"status": *"game added"'; then
     echo "Game added successfully by ID ($id)."
   else
     echo "Failed to add game. Response: $response"
@@ -135,9 +137,10 @@ delete_game_from_cart_by_id() {
 
   echo "Deleting a game from the cart by ID ($id)..."
   response=$(curl -s -X DELETE "$BASE_URL/delete-game" \
+    -H "Authorization: Bearer $TOKEN" \
     -H "Content-Type: application/json" \
     -d "{\"id\": $id}")
-  if echo "$response" | grep -q '"status": "game deleted"'; then
+  if echo "$response" | grep -q '"status": *"game deleted"'; then
     echo "Game deleted successfully by id ($id)."
   else
     echo "Failed to delete game."
@@ -147,7 +150,7 @@ delete_game_from_cart_by_id() {
 
 get_games_in_cart() {
   echo "Retrieving all games in cart..."
-  response=$(curl -s -X GET "$BASE_URL/get-games")
+  response=$(curl -s -X GET "$BASE_URL/get-games" -H "Authorization: Bearer $TOKEN")
   if echo "$response" | grep -q '"games":'; then
     echo "Games retrieved successfully."
   else
@@ -158,7 +161,7 @@ get_games_in_cart() {
 
 get_total_price_of_cart() {
   echo "Retrieving total price of cart..."
-  response=$(curl -s -X GET "$BASE_URL/get-total-price")
+  response=$(curl -s -X GET "$BASE_URL/get-total-price" -H "Authorization: Bearer $TOKEN")
   if echo "$response" | grep -q '"price":'; then
     echo "Total price retrieved successfully."
   else
@@ -171,7 +174,9 @@ check_health
 
 create_user user1 login123
 login_user user1 login123
-update_password user1 login123
+update_password login123
+# Changing the password revokes every session token of the user
+login_user user1 login123
 
 search_games_by_keyword "Action"
 
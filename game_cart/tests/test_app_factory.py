@@ -0,0 +1,102 @@
+import hashlib
+import os
+import subprocess
+import sys
+
+from sqlalchemy import inspect, text
+
+from app import create_app
+from game_cart.db import db
+from game_cart.models.game_model import Games
+from game_cart.models.user_model import User
+from game_cart.utils import password_hashing
+
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_touches_no_database_and_defers_the_cheapshark_client(tmp_path):
+    """Importing the app neither creates the database nor loads the HTTP clients."""
+    database = tmp_path / "app.db"
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app; print(sorted(m for m in sys.modules if 'cheapshark' in m))"],
+        cwd=APP_DIRECTORY, env=dict(os.environ, DATABASE_URL=f"sqlite:///{database}"),
+        capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "[]"
+    assert not database.exists()
+
+
+def test_create_app_with_in_memory_database(monkeypatch):
+    """Engine options are built for the URI passed in, not the one in DATABASE_URL."""
+    monkeypatch.setenv("DATABASE_URL", "sqlite:////app/db/app.db")
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+
+    assert app.test_cli_runner().invoke(args=["init-db"]).exit_code == 0
+    with app.app_context():
+        assert "games" in inspect(db.engine).get_table_names()
+
+
+def test_init_db_creates_the_schema(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}"})
+    with app.app_context():
+        assert "games" not in inspect(db.engine).get_table_names()
+
+    result = app.test_cli_runner().invoke(args=["init-db"])
+
+    assert result.exit_code == 0
+    with app.app_context():
+        assert {"users", "games", "cart_versions", "catalog_games"} <= set(inspect(db.engine).get_table_names())
+
+
+def test_init_db_adds_missing_indexes_to_existing_tables(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}"})
+    runner = app.test_cli_runner()
+    runner.invoke(args=["init-db"])
+    with app.app_context():
+        db.session.execute(text("DROP INDEX ix_games_id_price_updated_at"))
+        db.session.commit()
+
+    assert runner.invoke(args=["init-db"]).exit_code == 0
+    with app.app_context():
+        assert "ix_games_id_price_updated_at" in {index["name"] for index in inspect(db.engine).get_indexes("games")}
+
+
+def test_init_db_upgrades_tables_created_before_new_columns(tmp_path, monkeypatch):
+    """Accounts and carts from before iterations and price_updated_at survive init-db and can still log in."""
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_ITERATIONS", 1000)
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}"})
+    legacy_hash = hashlib.sha256(("oldpassword" + "salt").encode()).hexdigest()
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(80) UNIQUE NOT NULL, "
+                "salt VARCHAR(32) NOT NULL, password VARCHAR(64) NOT NULL)"
+            ))
+            connection.execute(text(
+                "CREATE TABLE games (user_id INTEGER NOT NULL, id INTEGER NOT NULL, name VARCHAR(80) NOT NULL, "
+                "price FLOAT NOT NULL, PRIMARY KEY (user_id, id))"
+            ))
+            connection.execute(text(f"INSERT INTO users VALUES (1, 'olduser', 'salt', '{legacy_hash}')"))
+            connection.execute(text("INSERT INTO games VALUES (1, 612, 'LEGO Batman', 15.95)"))
+
+    result = app.test_cli_runner().invoke(args=["init-db"])
+
+    assert result.exit_code == 0, result.output
+    assert "Added column users.iterations." in result.output
+    with app.app_context():
+        assert User.check_password("olduser", "oldpassword")
+        assert db.session.get(User, 1).iterations == 1000, "The legacy hash should be upgraded on login."
+        assert Games.get_stale_game_ids(older_than=1.0, limit=10) == [612]
+
+
+def test_init_db_refuses_carts_without_owners(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}"})
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE games (id INTEGER PRIMARY KEY, name VARCHAR(80), price FLOAT)"))
+
+    result = app.test_cli_runner().invoke(args=["init-db"])
+
+    assert result.exit_code != 0
+    assert "predates per-user carts" in result.output
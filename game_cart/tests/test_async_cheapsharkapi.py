@@ -0,0 +1,246 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from app import create_app
+from game_cart.models.catalog_model import CatalogGame
+from game_cart.utils import async_cheapsharkapi
+from game_cart.utils.async_cheapsharkapi import get_game_info, get_games_info, search_for_games
+from game_cart.utils.cheapsharkapi import MAX_IDS_PER_REQUEST, breaker, game_info_cache, search_cache
+from game_cart.utils.event_loop import get_thread_loop, run_on_thread_loop
+from game_cart.utils.http_client import AsyncHttpClient
+
+KEYWORD = "minecraft"
+GAME_ID = 258010
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty response caches and a closed circuit."""
+    search_cache.clear()
+    game_info_cache.clear()
+    breaker.reset()
+    yield
+    search_cache.clear()
+    game_info_cache.clear()
+    breaker.reset()
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Routes the async client to a handler that tests can replace, and records every request."""
+    state = {"requests": [], "handler": lambda request: httpx.Response(200, json=[])}
+
+    def handle(request):
+        state["requests"].append(request)
+        return state["handler"](request)
+
+    async def no_sleep(seconds):
+        pass
+
+    client = AsyncHttpClient(name="cheapshark", sleep=no_sleep, transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(async_cheapsharkapi, "client", client)
+    return state
+
+
+def test_search_for_games(upstream):
+    """Search results are parsed and cached per normalized keyword."""
+    upstream["handler"] = lambda request: httpx.Response(200, json=[
+        {"external": "Minecraft Legends", "gameID": "258010", "cheapest": "39.99"},
+        {"external": "Minecraft Dungeons", "gameID": "234902", "cheapest": "19.99"},
+    ])
+
+    result = asyncio.run(search_for_games(KEYWORD))
+    assert result[0] == {"name": "Minecraft Legends", "id": "258010", "price": "39.99"}
+
+    assert asyncio.run(search_for_games("  MineCraft ")) == result
+    assert len(upstream["requests"]) == 1
+
+
+def test_search_for_games_serves_stale_results_while_refreshing(upstream, monkeypatch):
+    """An expired keyword inside the stale window is answered at once and refreshed in the background."""
+    monkeypatch.setattr(search_cache, "stale_ttl", 60)
+    search_cache.set(KEYWORD, [{"name": "Old", "id": "1", "price": "1.00"}], ttl=-1)
+    upstream["handler"] = lambda request: httpx.Response(200, json=[
+        {"external": "New", "gameID": "1", "cheapest": "2.00"}
+    ])
+
+    async def scenario():
+        stale = await search_for_games(KEYWORD)
+        await asyncio.gather(*search_cache._tasks)
+        return stale, await search_for_games(KEYWORD)
+
+    stale, fresh = asyncio.run(scenario())
+    assert stale[0]["name"] == "Old"
+    assert fresh[0]["name"] == "New"
+    assert search_cache.stats()["stale_hits"] == 1
+    assert len(upstream["requests"]) == 1
+
+
+def test_search_for_games_timeout(upstream):
+    """A read timeout is reported the same way as by the sync client."""
+    def timeout(request):
+        raise httpx.ReadTimeout("timed out", request=request)
+    upstream["handler"] = timeout
+
+    with pytest.raises(RuntimeError, match="Request to cheapshark.com timed out."):
+        asyncio.run(search_for_games(KEYWORD))
+
+
+def test_search_for_games_retries_server_errors(upstream):
+    """A 503 is retried before the result is returned."""
+    responses = [httpx.Response(503), httpx.Response(200, json=[])]
+    upstream["handler"] = lambda request: responses.pop(0)
+
+    assert asyncio.run(search_for_games(KEYWORD)) == []
+    assert len(upstream["requests"]) == 2
+
+
+def test_get_game_info(upstream):
+    """Game info is parsed and cached."""
+    upstream["handler"] = lambda request: httpx.Response(200, json={
+        "info": {"title": "Minecraft Legends"},
+        "cheapestPriceEver": {"price": "39.99"},
+    })
+
+    result = asyncio.run(get_game_info(GAME_ID))
+    assert result == {"name": "Minecraft Legends", "id": GAME_ID, "price": "39.99"}
+    assert game_info_cache.get(GAME_ID) == result
+
+
+def test_get_game_info_error_status(upstream):
+    """An error status means the id has no game."""
+    upstream["handler"] = lambda request: httpx.Response(404)
+
+    assert asyncio.run(get_game_info(GAME_ID)) == {}
+
+
+def test_get_game_info_rate_limited_not_cached(upstream):
+    """A 429 left after the retries is a failure, not an unknown id."""
+    upstream["handler"] = lambda request: httpx.Response(429)
+
+    with pytest.raises(RuntimeError, match="Request to cheapshark.com failed"):
+        asyncio.run(get_game_info(GAME_ID))
+    assert game_info_cache.peek(GAME_ID) is None
+
+
+def test_get_games_info_fetches_chunks_concurrently(monkeypatch):
+    """Ids missing from the cache are fetched in chunks, all in flight at once."""
+    game_info_cache.set(1, {"name": "Cached", "id": 1, "price": "1.00"})
+    ids = list(range(1, MAX_IDS_PER_REQUEST * 2 + 3))
+    in_flight = {"now": 0, "max": 0}
+
+    async def handle(request):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        requested = request.url.params["ids"].split(",")
+        return httpx.Response(200, json={
+            id: {"info": {"title": f"Game {id}"}, "cheapestPriceEver": {"price": "9.99"}}
+            for id in requested if id != "2"
+        })
+
+    monkeypatch.setattr(async_cheapsharkapi, "client", AsyncHttpClient(transport=httpx.MockTransport(handle)))
+    result = asyncio.run(get_games_info(ids))
+
+    assert result[1]["name"] == "Cached"
+    assert result[2] == {}
+    assert result[len(ids)]["name"] == f"Game {len(ids)}"
+    assert in_flight["max"] == 3
+
+
+def test_get_games_info_limits_chunks_in_flight(monkeypatch):
+    """A large request keeps at most MAX_CONCURRENT_CHUNKS upstream requests in flight."""
+    monkeypatch.setattr(async_cheapsharkapi, "MAX_CONCURRENT_CHUNKS", 2)
+    in_flight = {"now": 0, "max": 0, "requests": 0}
+
+    async def handle(request):
+        in_flight["now"] += 1
+        in_flight["requests"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(async_cheapsharkapi, "client", AsyncHttpClient(transport=httpx.MockTransport(handle)))
+    asyncio.run(get_games_info(list(range(1, MAX_IDS_PER_REQUEST * 6 + 1))))
+
+    assert in_flight["requests"] == 6
+    assert in_flight["max"] == 2
+
+
+def test_run_on_thread_loop_reuses_the_loop():
+    """Every call from the same thread runs on the same event loop."""
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    run = run_on_thread_loop(current_loop)
+    assert run() is run() is get_thread_loop()
+
+
+def test_concurrent_searches_share_one_request(upstream):
+    """Identical searches awaited together make a single upstream call."""
+    async def main():
+        return await asyncio.gather(*(search_for_games(KEYWORD) for _ in range(10)))
+
+    assert asyncio.run(main()) == [[]] * 10
+    assert len(upstream["requests"]) == 1
+
+
+def test_get_game_info_serves_last_known_info(upstream):
+    """An expired lookup is answered with the last known info when cheapshark.com fails."""
+    game_info_cache.set(GAME_ID, {"name": "Old", "id": GAME_ID, "price": "1.00"}, ttl=-1)
+    upstream["handler"] = lambda request: httpx.Response(503)
+
+    assert asyncio.run(get_game_info(GAME_ID))["name"] == "Old"
+
+
+def test_stale_refresh_from_a_flask_view_outlives_the_request(upstream, monkeypatch):
+    """A refresh started by a Flask async view finishes after the view returns, so later misses do not hang."""
+    monkeypatch.setattr(search_cache, "stale_ttl", 60)
+    search_cache.set(KEYWORD, [{"name": "Old", "id": "1", "price": "1.00"}], ttl=-1)
+    released = threading.Event()
+
+    async def slow_search(request):
+        while not released.is_set():
+            await asyncio.sleep(0.01)
+        return httpx.Response(200, json=[{"external": "New", "gameID": "1", "cheapest": "2.00"}])
+
+    monkeypatch.setattr(async_cheapsharkapi, "client", AsyncHttpClient(transport=httpx.MockTransport(slow_search)))
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    app.test_cli_runner().invoke(args=["init-db"])
+
+    response = app.test_client().get(f"/search-games/{KEYWORD}")
+    assert response.get_json()["games"][0]["name"] == "Old"
+
+    search_cache.invalidate(KEYWORD)
+    results = []
+    miss = threading.Thread(target=lambda: results.append(run_on_thread_loop(search_for_games)(KEYWORD)), daemon=True)
+    miss.start()
+    released.set()
+    miss.join(timeout=5)
+
+    assert not miss.is_alive()
+    assert results[0][0]["name"] == "New"
+
+
+def test_search_route_checks_the_cache_first_and_stores_only_upstream_results(upstream):
+    """Cached results are served without touching the catalog, fetched ones are added to it."""
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    app.test_cli_runner().invoke(args=["init-db"])
+    client = app.test_client()
+    search_cache.set(KEYWORD, [{"name": "Cached", "id": "1", "price": "1.00"}])
+    upstream["handler"] = lambda request: httpx.Response(200, json=[
+        {"external": "Fetched", "gameID": "2", "cheapest": "2.00"}
+    ])
+
+    assert client.get(f"/search-games/{KEYWORD}").get_json()["games"][0]["name"] == "Cached"
+    with app.app_context():
+        assert CatalogGame.search(KEYWORD, 10) is None
+
+    search_cache.clear()
+    assert client.get(f"/search-games/{KEYWORD}").get_json()["games"][0]["name"] == "Fetched"
+    with app.app_context():
+        assert CatalogGame.search(KEYWORD, 10)[0]["name"] == "Fetched"
+    assert len(upstream["requests"]) == 1
@@ -0,0 +1,24 @@
+from benchmarks.harness import compare, measure
+
+
+def results(**medians):
+    return {"results": {key: {"median": median} for key, median in medians.items()}}
+
+
+def test_measure_stops_at_max_rounds():
+    calls = []
+    timing = measure(lambda: calls.append(1), max_rounds=5, min_time=10)
+
+    assert timing["rounds"] == 5
+    assert len(calls) == 6  # one warm-up call
+    assert timing["min"] <= timing["median"] <= timing["max"]
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = results(fast=1.0, same=1.0, slow=1.0)
+    current = results(fast=0.5, same=1.2, slow=1.5, new=9.0)
+
+    regressions = compare(current, baseline, threshold=0.25)
+
+    assert [regression["case"] for regression in regressions] == ["slow"]
+    assert regressions[0]["ratio"] == 1.5
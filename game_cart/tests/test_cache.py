@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+import pytest
+
+from game_cart.utils.cache import TTLCache
+
+
+class FakeClock:
+    """A manually advanced clock for expiry tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_get_or_load_hit_and_miss(clock):
+    cache = TTLCache(max_entries=4, ttl=10, clock=clock)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_load("key", loader) == "value"
+    assert cache.get_or_load("key", loader) == "value"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction(clock):
+    cache = TTLCache(max_entries=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get_or_load("a", lambda: 0)  # touch a so b is least recently used
+    cache.set("c", 3)
+
+    assert cache.peek("a") == 1
+    assert cache.peek("b") is None
+    assert cache.peek("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entry_is_reloaded(clock):
+    cache = TTLCache(max_entries=4, ttl=10, stale_ttl=0, clock=clock)
+    cache.set("key", "old")
+    clock.now = 11
+
+    assert cache.get_or_load("key", lambda: "new") == "new"
+    assert cache.stats()["misses"] == 1
+
+
+def test_stale_entry_served_while_refreshing(clock):
+    cache = TTLCache(max_entries=4, ttl=10, stale_ttl=60, clock=clock)
+    cache.set("key", "old")
+    clock.now = 11
+
+    release = threading.Event()
+    refreshed = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        refreshed.set()
+        return "new"
+
+    assert cache.get_or_load("key", loader) == "old"
+    assert cache.get_or_load("key", loader) == "old"
+    release.set()
+    assert refreshed.wait(5)
+
+    assert len(calls) == 1, "Only one background refresh should run per key."
+    assert cache.stats()["stale_hits"] == 2
+
+
+def test_stale_entry_served_while_refreshing_on_the_event_loop(clock):
+    cache = TTLCache(max_entries=4, ttl=10, stale_ttl=60, clock=clock)
+    cache.set("key", "old")
+    clock.now = 11
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "new"
+
+    async def scenario():
+        first = await cache.get_or_load_async("key", loader)
+        second = await cache.get_or_load_async("key", loader)
+        await asyncio.gather(*cache._tasks)
+        return first, second, await cache.get_or_load_async("key", loader)
+
+    assert asyncio.run(scenario()) == ("old", "old", "new")
+    assert len(calls) == 1, "Only one background refresh should run per key."
+    assert cache.stats()["stale_hits"] == 2
+
+
+def test_loader_errors_are_not_cached(clock):
+    cache = TTLCache(max_entries=4, ttl=10, clock=clock)
+
+    def failing_loader():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        cache.get_or_load("key", failing_loader)
+    assert len(cache) == 0
+
+
+def test_ttl_for_overrides_default_ttl(clock):
+    cache = TTLCache(max_entries=4, ttl=10, clock=clock)
+    cache.get_or_load("key", lambda: {}, ttl_for=lambda value: 1 if value == {} else 10)
+    clock.now = 2
+
+    assert cache.get_or_load("key", lambda: {"found": True}) == {"found": True}
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from game_cart.db import db
+from game_cart.models.catalog_model import CatalogGame
+
+TEST_DATABASE_URL = "sqlite:///:memory:"
+
+@pytest.fixture(scope="function")
+def test_db():
+    """
+    Create a new database session for each test.
+    """
+    engine = create_engine(TEST_DATABASE_URL)
+    TestingSessionLocal = sessionmaker(bind=engine)
+    db.Model.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    db.session = session
+
+    yield session
+
+    session.rollback()
+    session.close()
+    db.Model.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def minecraft_games():
+    return [
+        {"name": "Minecraft Legends", "id": "258010", "price": "39.99"},
+        {"name": "Minecraft Dungeons", "id": "234902", "price": "19.99"},
+    ]
+
+
+def test_search_after_upstream_search(test_db, minecraft_games):
+    """A keyword searched upstream is answered from the catalog, by prefix and in any case."""
+    CatalogGame.add_search_results("Minecraft", minecraft_games)
+
+    result = CatalogGame.search("minecraft", limit=10)
+    assert sorted(game["name"] for game in result) == ["Minecraft Dungeons", "Minecraft Legends"]
+    assert {"name": "Minecraft Dungeons", "id": "234902", "price": "19.99"} in result
+
+    assert [game["name"] for game in CatalogGame.search("Minecraft  Dung", limit=1)] == ["Minecraft Dungeons"]
+
+
+def test_search_returns_upstream_results_in_order(test_db, minecraft_games):
+    """A searched keyword returns exactly the games upstream returned, even ones the index would not match."""
+    CatalogGame.add_search_results("mc", minecraft_games[::-1])
+
+    assert [game["id"] for game in CatalogGame.search("MC", limit=10)] == ["234902", "258010"]
+    assert len(CatalogGame.search("mc", limit=1)) == 1
+
+
+def test_search_empty_upstream_result_is_cached(test_db):
+    """A keyword upstream knows nothing about is answered with no games."""
+    CatalogGame.add_search_results("nothing", [])
+
+    assert CatalogGame.search("nothing", limit=10) == []
+
+
+def test_search_miss_when_incomplete(test_db, minecraft_games):
+    """Games seen only through lookups do not answer a search with fewer than limit results."""
+    CatalogGame.upsert_games(minecraft_games)
+
+    assert CatalogGame.search("minecraft", limit=10) is None
+    assert len(CatalogGame.search("minecraft", limit=2)) == 2
+
+
+def test_search_miss_when_stale(test_db, minecraft_games):
+    """Matches older than max_age send the search upstream."""
+    CatalogGame.add_search_results("minecraft", minecraft_games)
+    CatalogGame.upsert_games(minecraft_games[:1], now=time.time() - 100)
+
+    assert CatalogGame.search("minecraft", limit=10, max_age=50) is None
+    assert CatalogGame.search("minecraft", limit=10, max_age=200) is not None
+
+
+def test_upsert_updates_index(test_db, minecraft_games):
+    """Renamed games are found by their new title only."""
+    CatalogGame.upsert_games(minecraft_games)
+    CatalogGame.upsert_games([{"name": "Legends Remastered", "id": "258010", "price": "9.99"}])
+
+    assert [game["name"] for game in CatalogGame.search("legends", limit=1)] == ["Legends Remastered"]
+    assert [game["price"] for game in CatalogGame.search("minecraft", limit=1)] == ["19.99"]
+
+
+def test_search_quotes_fts_syntax(test_db):
+    """FTS5 operators and quotes in keywords are matched literally instead of failing."""
+    CatalogGame.upsert_games([{"name": "Half-Life 2", "id": "1", "price": "9.99"}])
+
+    assert CatalogGame.search('half" OR life*', limit=1) is None
+    assert CatalogGame.search("half-life", limit=1)[0]["name"] == "Half-Life 2"
+
+
+def test_upsert_rejects_invalid_entries(test_db):
+    with pytest.raises(ValueError, match="Invalid catalog entry"):
+        CatalogGame.upsert_games([{"name": "No price", "id": "1"}])
@@ -1,34 +1,52 @@
 import pytest
 import requests
-from game_cart.utils.cheapsharkapi import search_for_games, get_game_info
+import threading
+import time
+
+from game_cart.utils.cheapsharkapi import (
+    search_for_games, get_game_info, get_games_info, refresh_games_info, search_cache, game_info_cache,
+    breaker, MAX_IDS_PER_REQUEST
+)
+from game_cart.utils.circuit_breaker import OPEN
 
 KEYWORD = "minecraft"
 GAME_ID = 258010
 MAX_NUM_GAMES = 10
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty response caches and a closed circuit."""
+    search_cache.clear()
+    game_info_cache.clear()
+    breaker.reset()
+    yield
+    search_cache.clear()
+    game_info_cache.clear()
+    breaker.reset()
+
 @pytest.fixture
 def mock_search_response(mocker):
     """Fixture to mock the response for searching games."""
-    mock_response = mocker.Mock()
+    mock_response = mocker.Mock(content=b"{}", status_code=200)
     mock_response.json.return_value = [
         {"external": "Minecraft Legends", "gameID": "258010", "cheapest": "39.99"},
         {"external": "Minecraft Dungeons", "gameID": "234902", "cheapest": "19.99"},
         {"external": "Minecraft Dungeons (XBOX)", "gameID": "225056", "cheapest": "19.99"},
         {"external": "Minecraft Dungeons: Ultimate DLC Bundle", "gameID": "234200", "cheapest": "19.99"},
     ]
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("requests.Session.get", return_value=mock_response)
     return mock_response
 
 
 @pytest.fixture
 def mock_game_info_response(mocker):
     """Fixture to mock the response for fetching game info by ID."""
-    mock_response = mocker.Mock()
+    mock_response = mocker.Mock(content=b"{}", status_code=200)
     mock_response.json.return_value = {
         "info": {"title": "Minecraft Legends"},
         "cheapestPriceEver": {"price": "39.99"},
     }
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("requests.Session.get", return_value=mock_response)
     return mock_response
 
 
@@ -40,9 +58,18 @@ def test_search_for_games(mock_search_response):
     assert result[0]["price"] == "39.99"
 
 
+def test_search_for_games_cached(mock_search_response):
+    """Repeated searches for the same normalized keyword hit the cache."""
+    search_for_games(KEYWORD)
+    result = search_for_games("  MineCraft ")
+    assert len(result) == 4
+    assert mock_search_response.json.call_count == 1
+    assert search_cache.stats()["hits"] == 1
+
+
 def test_search_for_games_timeout(mocker):
     """Simulate a timeout for search_for_games."""
-    mocker.patch("requests.get", side_effect=requests.exceptions.Timeout)
+    mocker.patch("requests.Session.get", side_effect=requests.exceptions.Timeout)
 
     with pytest.raises(RuntimeError, match="Request to cheapshark.com timed out."):
         search_for_games(KEYWORD)
@@ -51,7 +78,7 @@ def test_search_for_games_timeout(mocker):
 def test_search_for_games_request_failure(mocker):
     """Simulate a request failure for search_for_games."""
     mocker.patch(
-        "requests.get", side_effect=requests.exceptions.RequestException("Connection error")
+        "requests.Session.get", side_effect=requests.exceptions.RequestException("Connection error")
     )
 
     with pytest.raises(RuntimeError, match="Request to cheapshark.com failed: Connection error"):
@@ -66,9 +93,39 @@ def test_get_game_info(mock_game_info_response):
     assert result["id"] == GAME_ID
 
 
+def test_get_game_info_cached(mock_game_info_response):
+    """Repeated lookups of the same id hit the cache."""
+    get_game_info(GAME_ID)
+    result = get_game_info(GAME_ID)
+    assert result["name"] == "Minecraft Legends"
+    assert mock_game_info_response.json.call_count == 1
+
+
+def test_get_game_info_not_found_cached(mocker):
+    """Unknown ids are cached as empty results."""
+    mock_response = mocker.Mock(content=b"{}", status_code=404)
+    mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=mock_response)
+    mock_get = mocker.patch("requests.Session.get", return_value=mock_response)
+
+    assert get_game_info(GAME_ID) == {}
+    assert get_game_info(GAME_ID) == {}
+    assert mock_get.call_count == 1
+
+
+def test_get_game_info_rate_limited_not_cached(mocker):
+    """A 429 left after the retries is a failure, not an unknown id."""
+    mock_response = mocker.Mock(content=b"{}", status_code=429, headers={})
+    mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=mock_response)
+    mocker.patch("requests.Session.get", return_value=mock_response)
+
+    with pytest.raises(RuntimeError, match="Request to cheapshark.com failed"):
+        get_game_info(GAME_ID)
+    assert game_info_cache.peek(GAME_ID) is None
+
+
 def test_get_game_info_timeout(mocker):
     """Simulate a timeout for get_game_info."""
-    mocker.patch("requests.get", side_effect=requests.exceptions.Timeout)
+    mocker.patch("requests.Session.get", side_effect=requests.exceptions.Timeout)
 
     with pytest.raises(RuntimeError, match="Request to cheapshark.com timed out."):
         get_game_info(GAME_ID)
@@ -77,8 +134,98 @@ def test_get_game_info_timeout(mocker):
 def test_get_game_info_request_failure(mocker):
     """Simulate a request failure for get_game_info."""
     mocker.patch(
-        "requests.get", side_effect=requests.exceptions.RequestException("Connection error")
+        "requests.Session.get", side_effect=requests.exceptions.RequestException("Connection error")
     )
 
     with pytest.raises(RuntimeError, match="Request to cheapshark.com failed: Connection error"):
         get_game_info(GAME_ID)
+
+
+def test_get_games_info_chunks_and_caches(mocker):
+    """Ids are looked up in chunks and answered from the cache afterwards."""
+    ids = list(range(1, MAX_IDS_PER_REQUEST + 3))
+
+    def fake_get(url, **kwargs):
+        requested = url.split("ids=")[1].split(",")
+        response = mocker.Mock(content=b"{}", status_code=200)
+        response.json.return_value = {
+            gameID: {"info": {"title": f"Game {gameID}"}, "cheapestPriceEver": {"price": "1.99"}}
+            for gameID in requested if gameID != "2"
+        }
+        return response
+
+    mock_get = mocker.patch("requests.Session.get", side_effect=fake_get)
+
+    result = get_games_info(ids)
+    assert mock_get.call_count == 2
+    assert result[1] == {"name": "Game 1", "id": 1, "price": "1.99"}
+    assert result[2] == {}
+    assert len(result) == len(ids)
+
+    assert get_games_info([1, 2]) == {1: result[1], 2: {}}
+    assert get_game_info(1) == result[1]
+    assert mock_get.call_count == 2
+
+
+def test_refresh_games_info_uses_the_lowest_current_deal(mocker):
+    """Refreshed prices are the cheapest current deal, while the cache keeps the all-time low."""
+    response = mocker.Mock(content=b"{}", status_code=200)
+    response.json.return_value = {
+        "1": {
+            "info": {"title": "Game 1"},
+            "cheapestPriceEver": {"price": "4.99"},
+            "deals": [{"storeID": "1", "price": "19.99"}, {"storeID": "7", "price": "9.99"}],
+        },
+        "2": {"info": {"title": "Game 2"}, "cheapestPriceEver": {"price": "1.99"}, "deals": []},
+    }
+    mocker.patch("requests.Session.get", return_value=response)
+
+    result = refresh_games_info([1, 2, 3])
+
+    assert result == {1: {"name": "Game 1", "id": 1, "price": "9.99"}, 2: {}, 3: {}}
+    assert game_info_cache.get(1)["price"] == "4.99"
+
+
+def test_concurrent_searches_share_one_request(mocker, mock_search_response):
+    """Identical searches in flight at the same time make a single upstream call."""
+    release = threading.Event()
+
+    def slow_get(*args, **kwargs):
+        release.wait(1)
+        return mock_search_response
+
+    mock_get = mocker.patch("requests.Session.get", side_effect=slow_get)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(search_for_games(KEYWORD))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert mock_get.call_count == 1
+    assert len(results) == 5 and all(len(result) == 4 for result in results)
+
+
+def test_search_serves_last_known_results(mocker, mock_search_response):
+    """An expired search is answered with its last results when cheapshark.com fails."""
+    search_for_games(KEYWORD)
+    search_cache.set(KEYWORD, search_cache.peek(KEYWORD), ttl=-search_cache.stale_ttl - 1)
+    mocker.patch("requests.Session.get", side_effect=requests.exceptions.Timeout)
+
+    assert len(search_for_games(KEYWORD)) == 4
+
+
+def test_open_circuit_fails_fast(mocker):
+    """Once enough calls fail, cheapshark.com is not called until the circuit half-opens."""
+    mock_get = mocker.patch("requests.Session.get", side_effect=requests.exceptions.ReadTimeout)
+    for i in range(breaker.min_calls):
+        with pytest.raises(RuntimeError):
+            search_for_games(f"{KEYWORD} {i}")
+
+    assert breaker.state == OPEN
+    calls = mock_get.call_count
+    with pytest.raises(RuntimeError, match="cheapshark is unavailable"):
+        search_for_games("another keyword")
+    assert mock_get.call_count == calls
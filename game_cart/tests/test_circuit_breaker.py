@@ -0,0 +1,86 @@
+import pytest
+
+from game_cart.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+class FakeClock:
+    """A manually advanced clock for open timeouts."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(window=4, min_calls=4, failure_rate=0.5, slow_seconds=1.0, slow_rate=0.75, open_seconds=10, clock=clock)
+
+
+def record_calls(breaker, outcomes):
+    for success, seconds in outcomes:
+        breaker.before_call()
+        breaker.record(success, seconds)
+
+
+def test_stays_closed_below_thresholds(breaker):
+    record_calls(breaker, [(True, 0.1), (False, 0.1), (True, 0.1), (True, 2.0)])
+    assert breaker.state == CLOSED
+
+
+def test_needs_min_calls_before_opening(breaker):
+    record_calls(breaker, [(False, 0.1)] * 3)
+    assert breaker.state == CLOSED
+
+
+def test_opens_on_failure_rate(breaker):
+    """Half of the window failing opens the circuit, and calls then fail fast."""
+    record_calls(breaker, [(True, 0.1), (False, 0.1), (True, 0.1), (False, 0.1)])
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_opens_on_slow_calls(breaker):
+    """Successful but slow calls also open the circuit."""
+    record_calls(breaker, [(True, 1.5), (True, 1.5), (True, 0.1), (True, 1.5)])
+    assert breaker.state == OPEN
+
+
+def test_half_open_trial_closes_on_success(breaker, clock):
+    """After open_seconds one trial call is let through, and success closes the circuit."""
+    record_calls(breaker, [(False, 0.1)] * 4)
+    clock.now += 10
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_half_open_trial_reopens_on_failure(breaker, clock):
+    record_calls(breaker, [(False, 0.1)] * 4)
+    clock.now += 10
+
+    breaker.before_call()
+    breaker.record(False, 0.1)
+
+    assert breaker.state == OPEN
+    clock.now += 5
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_reset(breaker):
+    record_calls(breaker, [(False, 0.1)] * 4)
+    breaker.reset()
+    assert breaker.state == CLOSED
+    breaker.before_call()
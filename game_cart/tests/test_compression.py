@@ -0,0 +1,32 @@
+import gzip
+
+import brotli
+
+from game_cart.utils.compression import choose_encoding, compress
+
+BODY = b'{"games":[' + b",".join(b'{"id":%d,"name":"Game %d","price":9.99}' % (i, i) for i in range(100)) + b"]}"
+
+
+def test_choose_encoding_follows_preference_and_quality():
+    assert choose_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("gzip, br", ["gzip", "br"]) == "gzip"
+    assert choose_encoding("gzip;q=1.0, br;q=0", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("*", ["br", "gzip"]) == "br"
+    assert choose_encoding("identity", ["br", "gzip"]) is None
+    assert choose_encoding("", ["br", "gzip"]) is None
+
+
+def test_compress_round_trips():
+    body, encoding = compress(BODY, "gzip", ["gzip"], min_size=0)
+    assert encoding == "gzip"
+    assert gzip.decompress(body) == BODY
+    assert len(body) < len(BODY)
+
+    body, encoding = compress(BODY, "br", ["br"], min_size=0)
+    assert encoding == "br"
+    assert brotli.decompress(body) == BODY
+
+
+def test_compress_skips_small_bodies_and_disabled_encodings():
+    assert compress(BODY, "gzip", ["gzip"], min_size=len(BODY) + 1) == (BODY, None)
+    assert compress(BODY, "gzip", [], min_size=0) == (BODY, None)
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from game_cart.db_config import get_database_config, get_sqlite_pragmas, install_sqlite_pragmas
+
+
+def test_get_database_config_defaults(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    config = get_database_config()
+
+    assert config["SQLALCHEMY_DATABASE_URI"] == "sqlite:////app/db/app.db"
+    assert config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"] == 10
+    assert config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_pre_ping"] is True
+
+
+def test_get_database_config_server_database(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://user:pass@db/game_cart")
+    monkeypatch.setenv("DB_POOL_SIZE", "25")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "5")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    options = get_database_config()["SQLALCHEMY_ENGINE_OPTIONS"]
+
+    assert options["pool_size"] == 25
+    assert options["max_overflow"] == 5
+    assert options["pool_pre_ping"] is False
+
+
+def test_get_database_config_memory_sqlite_has_no_pool(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+    assert "pool_size" not in get_database_config()["SQLALCHEMY_ENGINE_OPTIONS"]
+
+
+def test_get_database_config_uri_overrides_environment(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://user:pass@db/game_cart")
+    config = get_database_config("sqlite://")
+
+    assert config["SQLALCHEMY_DATABASE_URI"] == "sqlite://"
+    assert "pool_size" not in config["SQLALCHEMY_ENGINE_OPTIONS"]
+
+
+def test_sqlite_pragmas_applied(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "1234")
+    install_sqlite_pragmas()
+    install_sqlite_pragmas()
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    engine.dispose()
+
+
+def test_get_sqlite_pragmas_cache_size(monkeypatch):
+    monkeypatch.setenv("SQLITE_CACHE_SIZE_KB", "4096")
+    assert get_sqlite_pragmas()["cache_size"] == -4096
@@ -1,10 +1,12 @@
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
-from game_cart.models.game_model import Games
+from game_cart.models.game_model import CartVersion, Games
+from game_cart.models.user_model import User
 from game_cart.db import db
+from game_cart.utils import password_hashing
 
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
@@ -25,6 +27,22 @@ def test_db():
     session.close()
     db.Model.metadata.drop_all(bind=engine)  # Drop tables
 
+@pytest.fixture(autouse=True)
+def fast_password_hashing(monkeypatch):
+    """Use a low work factor so creating cart owners stays fast."""
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_ITERATIONS", 1000)
+
+@pytest.fixture
+def user_id(test_db):
+    """Create the user who owns the cart under test."""
+    User.create_user("testuser", "securepassword123")
+    return User.get_id_by_username("testuser")
+
+@pytest.fixture
+def other_user_id(test_db):
+    User.create_user("otheruser", "securepassword123")
+    return User.get_id_by_username("otheruser")
+
 @pytest.fixture
 def sample_game1():
     return {
@@ -42,45 +60,72 @@ def sample_game2():
     }
 
 
-def test_create_game(test_db, sample_game1):
+def test_create_game(test_db, user_id, sample_game1):
     
-    Games.create_game(**sample_game1)
+    Games.create_game(user_id, **sample_game1)
     all_games = test_db.query(Games).all()
     assert len(all_games) == 1
     assert all_games[0].name == "Forza Horizon 5"
     assert all_games[0].price == 59.99
     
-def test_create_duplicate_game(test_db, sample_game1):
-    Games.create_game(**sample_game1)
+def test_create_duplicate_game(test_db, user_id, sample_game1):
+    Games.create_game(user_id, **sample_game1)
     
     #game with id... already exist
     with pytest.raises(ValueError, match="Game with id 1 already exists"):
-        Games.create_game(**sample_game1)
+        Games.create_game(user_id, **sample_game1)
+
+
+def test_create_games(test_db, user_id, sample_game1, sample_game2):
+    Games.create_game(user_id, **sample_game1)
+
+    statuses = Games.create_games(user_id, [sample_game1, sample_game2, sample_game2])
+    assert statuses == {1: "duplicate", 2: "added"}
+    assert test_db.query(Games).count() == 2
 
     
-def test_delete_game(test_db, sample_game1, sample_game2):
-    Games.create_game(**sample_game1)
-    Games.create_game(**sample_game2)
+def test_delete_game(test_db, user_id, sample_game1, sample_game2):
+    Games.create_game(user_id, **sample_game1)
+    Games.create_game(user_id, **sample_game2)
     
     #deleted the second game so now it should be length 1
-    Games.delete_game(game_id=1)
+    Games.delete_game(user_id, game_id=1)
     all_games = test_db.query(Games).all()
     assert len(all_games) == 1
     assert all_games[0].name == "Legend of Zelda: Tears of the Kingdom"
     assert all_games[0].price == 39.99
     
 
-def test_delete_nonexisting_game(test_db):
+def test_delete_nonexisting_game(test_db, user_id):
     
     with pytest.raises(ValueError, match="Game with id 1 not found"):
-        Games.delete_game(game_id=1)
+        Games.delete_game(user_id, game_id=1)
+
+def test_delete_games(test_db, user_id, sample_game1, sample_game2):
+    Games.create_game(user_id, **sample_game1)
+    Games.create_game(user_id, **sample_game2)
+
+    deleted = Games.delete_games(user_id, [1, 3])
+    assert deleted == [1]
+    all_games = test_db.query(Games).all()
+    assert [game.id for game in all_games] == [2]
+
 
-def test_get_all_game(test_db, sample_game1, sample_game2):
+def test_clear_cart(test_db, user_id, sample_game1, sample_game2):
+    Games.create_game(user_id, **sample_game1)
+    Games.create_game(user_id, **sample_game2)
+
+    assert Games.clear_cart(user_id) == [1, 2]
+    assert test_db.query(Games).count() == 0
+    assert Games.clear_cart(user_id) == []
+
+
+def test_get_all_game(test_db, user_id, sample_game1, sample_game2):
     #add 2 games
-    Games.create_game(**sample_game1)
-    Games.create_game(**sample_game2)
+    Games.create_game(user_id, **sample_game1)
+    Games.create_game(user_id, **sample_game2)
     
-    all_games = Games.get_all_games()
+    all_games = Games.get_all_games(user_id)
     
     assert len(all_games) == 2
     game_names = [game["name"] for game in all_games]  # Access "name" from dictionaries
@@ -88,10 +133,129 @@ def test_get_all_game(test_db, sample_game1, sample_game2):
     assert "Legend of Zelda: Tears of the Kingdom" in game_names
     
 
-def test_get_all_game_empty(test_db, sample_game1):
+def test_get_all_game_empty(test_db, user_id, sample_game1):
     
-    Games.create_game(**sample_game1)
-    Games.delete_game(game_id=1)
-    all_games = Games.get_all_games()
+    Games.create_game(user_id, **sample_game1)
+    Games.delete_game(user_id, game_id=1)
+    all_games = Games.get_all_games(user_id)
     
-    assert len(all_games) == 0
\ No newline at end of file
+    assert len(all_games) == 0
+
+def test_get_cart_summary(test_db, user_id, sample_game1, sample_game2):
+    assert Games.get_cart_summary(user_id) == {"count": 0, "price": 0.0}
+
+    Games.create_game(user_id, **sample_game1)
+    Games.create_game(user_id, **sample_game2)
+
+    summary = Games.get_cart_summary(user_id)
+    assert summary["count"] == 2
+    assert summary["price"] == pytest.approx(99.98)
+
+
+def test_get_games_page(test_db, user_id):
+    Games.create_games(user_id, [{"id": id, "name": f"Game {id}", "price": 1.0} for id in range(1, 6)])
+
+    games, next_cursor = Games.get_games_page(user_id, limit=2)
+    assert [game["id"] for game in games] == [1, 2]
+    assert next_cursor == 2
+
+    games, next_cursor = Games.get_games_page(user_id, after_id=next_cursor, limit=3)
+    assert [game["id"] for game in games] == [3, 4, 5]
+    assert next_cursor is None
+
+
+def test_iter_games(test_db, user_id, sample_game1, sample_game2):
+    Games.create_game(user_id, **sample_game2)
+    Games.create_game(user_id, **sample_game1)
+
+    assert [game["id"] for game in Games.iter_games(user_id, batch_size=1)] == [1, 2]
+
+
+def test_carts_are_per_user(test_db, user_id, other_user_id, sample_game1, sample_game2):
+    Games.create_game(user_id, **sample_game1)
+    Games.create_game(other_user_id, **sample_game1)
+    Games.create_game(other_user_id, **sample_game2)
+
+    assert [game["id"] for game in Games.get_all_games(user_id)] == [1]
+    assert Games.get_cart_summary(other_user_id)["count"] == 2
+
+    Games.clear_cart(other_user_id)
+    assert Games.get_cart_summary(user_id)["count"] == 1
+    with pytest.raises(ValueError, match="Game with id 2 not found"):
+        Games.delete_game(user_id, game_id=2)
+
+
+def test_get_stale_game_ids_oldest_first(test_db, user_id, other_user_id, sample_game1, sample_game2):
+    """Each game is returned once, ordered by its least recently refreshed cart row."""
+    Games.create_game(user_id, **sample_game1)
+    Games.create_game(other_user_id, **sample_game1)
+    Games.create_game(user_id, **sample_game2)
+    Games.update_prices({2: 39.99}, now=100.0)
+    Games.update_prices({1: 59.99}, now=200.0)
+
+    assert Games.get_stale_game_ids(older_than=300.0, limit=10) == [2, 1]
+    assert Games.get_stale_game_ids(older_than=150.0, limit=10) == [2]
+    assert Games.get_stale_game_ids(older_than=300.0, limit=1) == [2]
+
+
+def test_update_prices_in_every_cart(test_db, user_id, other_user_id, sample_game1, sample_game2):
+    """New prices reach every cart; a None price only marks the game refreshed."""
+    Games.create_game(user_id, **sample_game1)
+    Games.create_game(other_user_id, **sample_game1)
+    Games.create_game(user_id, **sample_game2)
+
+    assert Games.update_prices({1: 49.99, 2: None}, now=500.0) == 3
+
+    assert Games.get_cart_summary(user_id)["price"] == pytest.approx(49.99 + 39.99)
+    assert Games.get_cart_summary(other_user_id)["price"] == pytest.approx(49.99)
+    assert Games.get_stale_game_ids(older_than=500.0, limit=10) == []
+    assert "price_updated_at" not in Games.get_all_games(user_id)[0]
+    assert "user_id" not in Games.get_all_games(user_id)[0], "Cart owners are internal and left out of the API."
+
+
+def test_cart_version_bumped_by_every_change(test_db, user_id, other_user_id, sample_game1, sample_game2):
+    """Adding and removing games bumps the cart's version, and only when something changed."""
+    assert CartVersion.get(user_id) == 0
+
+    Games.create_game(user_id, **sample_game1)
+    assert CartVersion.get(user_id) == 1
+
+    Games.create_games(user_id, [sample_game1, sample_game2])
+    assert CartVersion.get(user_id) == 2
+    Games.create_games(user_id, [sample_game1])
+    assert CartVersion.get(user_id) == 2
+
+    Games.delete_game(user_id, game_id=1)
+    assert CartVersion.get(user_id) == 3
+    Games.delete_games(user_id, [1])
+    assert CartVersion.get(user_id) == 3
+    Games.clear_cart(user_id)
+    assert CartVersion.get(user_id) == 4
+
+    assert CartVersion.get(other_user_id) == 0
+
+
+def test_cart_version_bumped_by_price_changes(test_db, user_id, other_user_id, sample_game1, sample_game2):
+    """A refresh bumps the carts whose prices changed, not the ones it only marks refreshed."""
+    Games.create_game(user_id, **sample_game1)
+    Games.create_game(other_user_id, **sample_game2)
+
+    Games.update_prices({1: 49.99, 2: 39.99}, now=500.0)
+    assert CartVersion.get(user_id) == 2
+    assert CartVersion.get(other_user_id) == 1
+
+    Games.update_prices({1: None, 2: None}, now=600.0)
+    assert CartVersion.get(user_id) == 2
+    assert CartVersion.get(other_user_id) == 1
+
+
+@pytest.mark.parametrize("statement", [
+    "UPDATE games SET price = 1.0 WHERE id = 1",
+    "SELECT user_id FROM games WHERE id = 1 AND price != 1.0",
+    "SELECT id FROM games GROUP BY id HAVING min(price_updated_at) < 1.0 ORDER BY min(price_updated_at)"
+])
+def test_price_refresh_queries_do_not_scan_the_table(test_db, statement):
+    """Lookups by id across carts are served by an index, not a full table scan."""
+    plan = [row[-1] for row in test_db.execute(text(f"EXPLAIN QUERY PLAN {statement}"))]
+    assert "ix_games_id_price_updated_at" in plan[0]
+    assert "SCAN games" not in plan[0] or "COVERING INDEX" in plan[0]
@@ -0,0 +1,100 @@
+import pytest
+import requests
+
+from game_cart.utils.http_client import HttpClient
+from game_cart.utils.metrics import UPSTREAM_RESPONSES, UPSTREAM_RETRIES
+
+URL = "https://www.cheapshark.com/api/1.0/games?id=1"
+
+@pytest.fixture
+def client():
+    """A client that records its backoffs instead of sleeping."""
+    client = HttpClient(max_retries=2, backoff_base=0.1, backoff_max=1.0)
+    client.sleeps = []
+    client._sleep = client.sleeps.append
+    return client
+
+
+def make_response(mocker, status_code, headers=None):
+    response = mocker.Mock(content=b"{}")
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+def test_get_success(mocker, client):
+    """A successful response is returned without retrying."""
+    ok = make_response(mocker, 200)
+    mock_get = mocker.patch("requests.Session.get", return_value=ok)
+
+    assert client.get(URL) is ok
+    assert mock_get.call_count == 1
+    assert mock_get.call_args.kwargs["timeout"] == client.timeout
+
+
+def test_get_retries_server_errors(mocker, client):
+    """5xx responses are retried with a bounded backoff."""
+    ok = make_response(mocker, 200)
+    mock_get = mocker.patch(
+        "requests.Session.get", side_effect=[make_response(mocker, 503), ok]
+    )
+
+    assert client.get(URL) is ok
+    assert mock_get.call_count == 2
+    assert len(client.sleeps) == 1
+    assert 0 <= client.sleeps[0] <= 0.1
+
+
+def test_get_honours_retry_after(mocker, client):
+    """A 429 with a Retry-After header waits that long, capped at backoff_max."""
+    ok = make_response(mocker, 200)
+    mocker.patch(
+        "requests.Session.get",
+        side_effect=[make_response(mocker, 429, {"Retry-After": "30"}), ok]
+    )
+
+    client.get(URL)
+    assert client.sleeps == [1.0]
+
+
+def test_get_returns_last_response_after_retries(mocker, client):
+    """Once retries run out the last error response is returned."""
+    mock_get = mocker.patch("requests.Session.get", return_value=make_response(mocker, 500))
+
+    assert client.get(URL).status_code == 500
+    assert mock_get.call_count == 3
+
+
+def test_get_retries_connection_errors(mocker, client):
+    """Connection errors are retried and re-raised once retries run out."""
+    mock_get = mocker.patch(
+        "requests.Session.get", side_effect=requests.exceptions.ConnectionError("refused")
+    )
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get(URL)
+    assert mock_get.call_count == 3
+
+
+def test_get_does_not_retry_read_timeouts(mocker, client):
+    """Read timeouts are raised straight away."""
+    mock_get = mocker.patch("requests.Session.get", side_effect=requests.exceptions.ReadTimeout)
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.get(URL)
+    assert mock_get.call_count == 1
+
+
+def test_get_records_upstream_metrics(mocker, client):
+    """Every attempt is counted by status, and retries are counted."""
+    responses = UPSTREAM_RESPONSES.labels("upstream", "test", "503")
+    retries = UPSTREAM_RETRIES.labels("upstream", "test")
+    before_responses, before_retries = responses._value.get(), retries._value.get()
+    mocker.patch(
+        "requests.Session.get",
+        side_effect=[make_response(mocker, 503), make_response(mocker, 200)]
+    )
+
+    client.get(URL, endpoint="test")
+    assert responses._value.get() == before_responses + 1
+    assert retries._value.get() == before_retries + 1
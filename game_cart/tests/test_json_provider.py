@@ -0,0 +1,21 @@
+from decimal import Decimal
+
+from flask import Flask, jsonify
+
+from game_cart.utils.json_provider import OrjsonProvider, dumps_bytes
+
+
+def test_dumps_bytes_sorts_keys_and_encodes_flask_types():
+    assert dumps_bytes({"b": 1, "a": [1.5, "é"], 3: None}) == '{"3":null,"a":[1.5,"é"],"b":1}'.encode()
+    assert dumps_bytes({"price": Decimal("9.99")}) == b'{"price":"9.99"}'
+
+
+def test_jsonify_uses_orjson():
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+
+    with app.app_context():
+        response = jsonify({"games": [{"price": 1.0, "id": 2}]})
+
+    assert response.mimetype == "application/json"
+    assert response.get_data() == b'{"games":[{"id":2,"price":1.0}]}\n'
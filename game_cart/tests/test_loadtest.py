@@ -0,0 +1,43 @@
+import pytest
+import requests
+
+from loadtest.fake_cheapshark import FakeCheapSharkServer, FakeConfig
+from loadtest.load import parse_mix, percentile
+
+
+@pytest.fixture
+def fake():
+    server = FakeCheapSharkServer(("127.0.0.1", 0), FakeConfig(latency=0, search_results=5, catalog_size=100))
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_fake_answers_searches_and_lookups(fake):
+    games = requests.get(f"{fake.base_url}games?title=Dragon", timeout=5).json()
+    assert len(games) == 5
+    assert all("Dragon" in game["external"] for game in games)
+
+    info = requests.get(f"{fake.base_url}games?ids=1,2,500", timeout=5).json()
+    assert sorted(info) == ["1", "2"]
+    assert requests.get(f"{fake.base_url}games?id=500", timeout=5).json() == []
+    assert fake.requests == 3
+
+
+def test_fake_injects_errors(fake):
+    fake.config.error_rate = 1.0
+    assert requests.get(f"{fake.base_url}games?title=dragon", timeout=5).status_code == 500
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+def test_parse_mix_rejects_unknown_operations():
+    assert parse_mix("search=3, get_games") == {"search": 3.0, "get_games": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("teleport=1")
@@ -0,0 +1,49 @@
+import logging
+import queue
+
+from flask.logging import default_handler
+
+from game_cart.utils.logger import DroppingQueueHandler, SamplingFilter, configure_logger
+
+
+def make_record(level, msg):
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+def test_configure_logger_is_idempotent():
+    logger = logging.getLogger("game_cart.tests.idempotent")
+    configure_logger(logger)
+    configure_logger(logger)
+    assert len(logger.handlers) == 1
+
+
+def test_configure_logger_replaces_flask_handler():
+    logger = logging.getLogger("game_cart.tests.flask")
+    logger.addHandler(default_handler)
+    configure_logger(logger)
+    assert default_handler not in logger.handlers
+    assert len(logger.handlers) == 1
+
+
+def test_sampling_filter_samples_info_per_template():
+    sampler = SamplingFilter(every=3)
+    passed = [sampler.filter(make_record(logging.INFO, "Fetching %s")) for _ in range(6)]
+    assert passed == [True, False, False, True, False, False]
+    assert sampler.filter(make_record(logging.INFO, "Another message")) is True
+
+
+def test_sampling_filter_keeps_warnings():
+    sampler = SamplingFilter(every=100)
+    assert all(sampler.filter(make_record(logging.WARNING, "Retrying")) for _ in range(5))
+
+
+def test_queue_handler_leaves_formatting_to_the_listener():
+    handler = DroppingQueueHandler(queue.Queue())
+    handler.setFormatter(logging.Formatter("formatted: %(message)s"))
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "Fetching %s", ("games",), None)
+
+    prepared = handler.prepare(record)
+
+    assert prepared is not record
+    assert (prepared.msg, prepared.args) == ("Fetching %s", ("games",))
+    assert prepared.getMessage() == "Fetching games"
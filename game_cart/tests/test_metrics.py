@@ -0,0 +1,17 @@
+from game_cart.utils.metrics import REQUEST_COUNT, observe_request, render_metrics
+
+
+def test_observe_request_counts_by_route_and_status():
+    before = REQUEST_COUNT.labels("GET", "/get-games", "200")._value.get()
+    observe_request("GET", "/get-games", 200, 0.012)
+    assert REQUEST_COUNT.labels("GET", "/get-games", "200")._value.get() == before + 1
+
+
+def test_render_metrics_prometheus_text():
+    observe_request("GET", "/search-games/<keyword>", 500, 0.3)
+    payload, content_type = render_metrics()
+    text = payload.decode()
+
+    assert content_type.startswith("text/plain")
+    assert 'game_cart_http_requests_total{method="GET",route="/search-games/<keyword>",status="500"}' in text
+    assert 'game_cart_http_request_duration_seconds_bucket{le="0.5",method="GET",route="/search-games/<keyword>"}' in text
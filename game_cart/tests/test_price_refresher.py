@@ -0,0 +1,89 @@
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from game_cart.db import db
+from game_cart.models.game_model import Games
+from game_cart.models.user_model import User
+from game_cart.utils import password_hashing
+from game_cart.utils.cheapsharkapi import MAX_IDS_PER_REQUEST
+from game_cart.utils.price_refresher import PriceRefresher
+
+TEST_DATABASE_URL = "sqlite:///:memory:"
+
+@pytest.fixture(scope="function")
+def test_db():
+    """
+    Create a new database session for each test.
+    """
+    engine = create_engine(TEST_DATABASE_URL)
+    TestingSessionLocal = scoped_session(sessionmaker(bind=engine))
+
+    db.session = TestingSessionLocal
+    db.Model.metadata.create_all(bind=engine)
+
+    yield TestingSessionLocal
+
+    TestingSessionLocal.remove()
+    db.Model.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def user_id(test_db, monkeypatch):
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_ITERATIONS", 1000)
+    User.create_user("testuser", "securepassword123")
+    return User.get_id_by_username("testuser")
+
+@pytest.fixture
+def lookups():
+    return []
+
+@pytest.fixture
+def make_refresher(tmp_path, lookups):
+    """Builds refreshers sharing one lock file, with a fake upstream that doubles every price."""
+    def fetch(ids):
+        lookups.append(ids)
+        return {id: {"id": id, "name": f"Game {id}", "price": "2.00"} if id != 3 else {} for id in ids}
+
+    def make(**kwargs):
+        kwargs.setdefault("requests_per_minute", 6000)
+        return PriceRefresher(Flask(__name__), max_age=0, lock_path=str(tmp_path / "refresh.lock"), fetch=fetch, **kwargs)
+    return make
+
+
+def test_run_once_refreshes_prices_within_budget(test_db, user_id, make_refresher, lookups):
+    """Each run looks up at most its budget of chunks and bulk updates the prices."""
+    Games.create_games(user_id, [{"id": id, "name": f"Game {id}", "price": 1.0} for id in range(1, MAX_IDS_PER_REQUEST * 3)])
+    refresher = make_refresher(interval=0.02)
+    assert refresher.requests_per_run == 2
+
+    assert refresher.run_once() == MAX_IDS_PER_REQUEST * 2
+    assert [len(ids) for ids in lookups] == [MAX_IDS_PER_REQUEST, MAX_IDS_PER_REQUEST]
+
+    summary = Games.get_cart_summary(user_id)
+    assert summary["price"] == pytest.approx(2.0 * (MAX_IDS_PER_REQUEST * 2 - 1) + 1.0 * MAX_IDS_PER_REQUEST)
+    refresher.stop()
+
+
+def test_only_one_process_refreshes(test_db, user_id, make_refresher, lookups):
+    """A second refresher cannot take the lock while the first one holds it."""
+    Games.create_game(user_id, 1, "Game 1", 1.0)
+    first, second = make_refresher(), make_refresher()
+
+    assert first.run_once() == 1
+    assert second.run_once() == 0
+    first.stop()
+    assert second.run_once() == 1
+    second.stop()
+
+
+def test_upstream_failure_stops_the_run(test_db, user_id, tmp_path):
+    Games.create_game(user_id, 1, "Game 1", 1.0)
+
+    def fail(ids):
+        raise RuntimeError("Request to cheapshark.com timed out.")
+
+    refresher = PriceRefresher(Flask(__name__), max_age=0, lock_path=str(tmp_path / "refresh.lock"), fetch=fail)
+    assert refresher.run_once() == 0
+    assert Games.get_cart_summary(user_id)["price"] == 1.0
+    refresher.stop()
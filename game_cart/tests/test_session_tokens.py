@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from game_cart.db import db
+from game_cart.models.session_model import SessionToken
+from game_cart.models.user_model import User
+from game_cart.utils import password_hashing
+from game_cart.utils.session_tokens import TokenStore
+
+TEST_DATABASE_URL = "sqlite:///:memory:"
+
+class FakeClock:
+    """A manually advanced clock for expiry tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture(scope="function")
+def test_db():
+    """
+    Create a new database session for each test.
+    """
+    engine = create_engine(TEST_DATABASE_URL)
+    TestingSessionLocal = scoped_session(sessionmaker(bind=engine))
+
+    db.session = TestingSessionLocal
+    db.Model.metadata.create_all(bind=engine)
+
+    yield TestingSessionLocal
+
+    TestingSessionLocal.remove()
+    db.Model.metadata.drop_all(bind=engine)
+
+
+def test_issue_and_resolve(clock):
+    store = TokenStore(ttl=60, clock=clock)
+    token = store.issue(1, "testuser")
+
+    assert store.resolve(token) == (1, "testuser")
+    assert store.resolve("unknown") is None
+
+
+def test_tokens_expire(clock):
+    store = TokenStore(ttl=60, clock=clock)
+    token = store.issue(1, "testuser")
+    clock.now += 61
+
+    assert store.resolve(token) is None
+    store.issue(2, "otheruser")
+    assert len(store) == 1, "Expired tokens should be purged on issue."
+
+
+def test_oldest_tokens_are_evicted(clock):
+    store = TokenStore(max_entries=2, ttl=60, clock=clock)
+    first = store.issue(1, "a")
+    store.issue(2, "b")
+    store.issue(3, "c")
+
+    assert store.resolve(first) is None
+    assert len(store) == 2
+
+
+def test_revoke(clock):
+    store = TokenStore(ttl=60, clock=clock)
+    token = store.issue(1, "testuser")
+    other = store.issue(1, "testuser")
+    kept = store.issue(2, "otheruser")
+
+    store.revoke(token)
+    assert store.resolve(token) is None
+
+    store.revoke_user(1)
+    assert store.resolve(other) is None
+    assert store.resolve(kept) == (2, "otheruser")
+
+
+def test_persisted_tokens_survive_eviction(test_db, monkeypatch):
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_ITERATIONS", 1000)
+    User.create_user("testuser", "securepassword123")
+    user_id = User.get_id_by_username("testuser")
+    store = TokenStore(max_entries=1, ttl=60, persistence=SessionToken)
+
+    token = store.issue(user_id, "testuser")
+    store.clear()
+    assert store.resolve(token) == (user_id, "testuser")
+    assert test_db.query(SessionToken).first().token_hash != token, "Only a digest should be stored."
+
+    store.revoke_user(user_id)
+    store.clear()
+    assert store.resolve(token) is None
+
+
+def test_revocation_by_another_process_is_seen_after_recheck(test_db, monkeypatch, clock):
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_ITERATIONS", 1000)
+    User.create_user("testuser", "securepassword123")
+    user_id = User.get_id_by_username("testuser")
+    worker = TokenStore(ttl=60, persistence=SessionToken, recheck_after=5, clock=clock)
+    other_worker = TokenStore(ttl=60, persistence=SessionToken, recheck_after=5, clock=clock)
+
+    token = worker.issue(user_id, "testuser")
+    assert other_worker.resolve(token) == (user_id, "testuser")
+
+    worker.revoke(token)
+    assert other_worker.resolve(token) == (user_id, "testuser"), "A cached token is trusted until the recheck."
+    clock.now += 5
+    assert other_worker.resolve(token) is None
+    assert len(other_worker) == 0
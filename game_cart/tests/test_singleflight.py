@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+import pytest
+
+from game_cart.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_call():
+    """Threads asking for the same key while it is in flight share its result."""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", fetch)))
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", fetch))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+
+
+def test_exceptions_are_shared_and_not_remembered():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError, match="upstream down"):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "recovered") == "recovered"
+
+
+def test_coroutines_share_one_call():
+    """Coroutines on a loop share a call, and different keys are not coalesced."""
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.do_async("a", lambda: fetch("a")) for _ in range(5)),
+            flight.do_async("b", lambda: fetch("b"))
+        )
+
+    assert asyncio.run(main()) == ["a"] * 5 + ["b"]
+    assert sorted(calls) == ["a", "b"]
@@ -0,0 +1,64 @@
+import pytest
+
+from game_cart.utils.title_index import TitleIndex
+
+@pytest.fixture
+def index():
+    index = TitleIndex(max_entries=3)
+    index.add([
+        {"name": "The Witcher 3: Wild Hunt", "id": "1", "price": "9.99"},
+        {"name": "Witcher 2", "id": "2", "price": "2.49"},
+        {"name": "Wild Arms", "id": "3", "price": "5.00"},
+    ])
+    return index
+
+
+def names(suggestions):
+    return [game["name"] for game in suggestions]
+
+
+def test_suggest_matches_any_word_prefix(index):
+    """A prefix matches the start of any word of a title, ignoring case."""
+    assert set(names(index.suggest("WIT"))) == {"The Witcher 3: Wild Hunt", "Witcher 2"}
+    assert set(names(index.suggest("wild"))) == {"The Witcher 3: Wild Hunt", "Wild Arms"}
+    assert names(index.suggest("witcher  3")) == ["The Witcher 3: Wild Hunt"]
+    assert index.suggest("zelda") == []
+    assert index.suggest("  ") == []
+
+
+def test_suggest_ranks_by_popularity_or_price(index):
+    """Games seen more often rank first by popularity; the cheapest rank first by price."""
+    index.add([{"name": "The Witcher 3: Wild Hunt", "id": "1", "price": "7.50"}])
+
+    assert names(index.suggest("w", k=2)) == ["The Witcher 3: Wild Hunt", "Wild Arms"]
+    assert index.suggest("w", k=2, sort="price") == [
+        {"id": "2", "name": "Witcher 2", "price": "2.49"},
+        {"id": "3", "name": "Wild Arms", "price": "5.00"},
+    ]
+
+
+def test_renamed_game_is_reindexed(index):
+    index.add([{"name": "Witcher II Enhanced", "id": "2", "price": "2.49"}])
+
+    assert names(index.suggest("enh")) == ["Witcher II Enhanced"]
+    assert names(index.suggest("witcher 2")) == []
+
+
+def test_least_recently_seen_game_is_evicted(index):
+    """The index never holds more than max_entries games."""
+    index.add([{"name": "Witcher 2", "id": "2", "price": "2.49"}])
+    index.add([{"name": "Zelda", "id": "4", "price": "59.99"}])
+
+    assert len(index) == 3
+    assert names(index.suggest("the")) == []
+    assert index.stats()["keys"] == 2 + 2 + 1
+
+
+def test_invalid_games_are_skipped(index):
+    index.add([{"name": "No price", "id": "5"}])
+    assert len(index) == 3
+
+
+def test_unknown_sort_order(index):
+    with pytest.raises(ValueError, match="sort must be one of"):
+        index.suggest("w", sort="name")
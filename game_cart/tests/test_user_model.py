@@ -4,6 +4,7 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 
 from game_cart.models.user_model import User
 from game_cart.db import db
+from game_cart.utils import password_hashing
 
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
@@ -24,6 +25,12 @@ def test_db():
     db.Model.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def fast_password_hashing(monkeypatch):
+    """Use a low work factor so the tests stay fast."""
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_ITERATIONS", 1000)
+
+
 @pytest.fixture
 def sample_user():
     return {
@@ -65,6 +72,31 @@ def test_check_password_incorrect(test_db, sample_user):
     User.create_user(**sample_user)
     assert User.check_password(sample_user["username"], "wrongpassword") is False, "Password should not match."
 
+def test_check_password_rehashes_outdated_hash(test_db, sample_user, monkeypatch):
+    """Test that logging in upgrades a hash made with an old work factor."""
+    User.create_user(**sample_user)
+    old_hash = test_db.query(User).filter_by(username=sample_user["username"]).first().password
+
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_ITERATIONS", 2000)
+    assert User.check_password(sample_user["username"], sample_user["password"]) is True
+
+    user = test_db.query(User).filter_by(username=sample_user["username"]).first()
+    assert user.iterations == 2000
+    assert user.password != old_hash
+    assert User.check_password(sample_user["username"], sample_user["password"]) is True
+
+def test_check_password_legacy_hash(test_db, sample_user):
+    """Test that legacy salted SHA-256 hashes still verify and are upgraded."""
+    salt = "00" * 16
+    legacy_hash = password_hashing._compute_hash(sample_user["password"], salt, None)
+    test_db.add(User(username=sample_user["username"], salt=salt, password=legacy_hash))
+    test_db.commit()
+
+    assert User.check_password(sample_user["username"], "wrongpassword") is False
+    assert User.check_password(sample_user["username"], sample_user["password"]) is True
+    user = test_db.query(User).filter_by(username=sample_user["username"]).first()
+    assert user.iterations == 1000
+
 def test_check_password_user_not_found(test_db):
     """Test checking password for a non-existent user."""
     with pytest.raises(ValueError, match="User nonexistentuser not found"):
@@ -85,3 +117,18 @@ def test_update_password_user_not_found(test_db):
     """Test updating the password for a non-existent user."""
     with pytest.raises(ValueError, match="User nonexistentuser not found"):
         User.update_password("nonexistentuser", "newpassword")
+
+##########################################################
+# User Lookup
+##########################################################
+
+def test_get_id_by_username(test_db, sample_user):
+    """Test looking up the id of an existing user."""
+    User.create_user(**sample_user)
+    user = test_db.query(User).filter_by(username=sample_user["username"]).first()
+    assert User.get_id_by_username(sample_user["username"]) == user.id
+
+def test_get_id_by_username_not_found(test_db):
+    """Test looking up the id of a non-existent user."""
+    with pytest.raises(ValueError, match="User nonexistentuser not found"):
+        User.get_id_by_username("nonexistentuser")